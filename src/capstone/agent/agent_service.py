@@ -0,0 +1,148 @@
+# src/capstone/agent/agent_service.py
+
+import asyncio
+import uuid
+import weakref
+from typing import Awaitable, Callable, Iterable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+FastPath = Callable[[str], Awaitable[Optional[str]]]
+
+
+class AgentService:
+    """
+    Long-lived agent + runner shared by many users and sessions.
+
+    The agent, session service and ``Runner`` are built once; each query only
+    looks up (or creates) its session and runs one turn. At most
+    ``max_concurrency`` turns run at once per event loop, so a burst of
+    queries cannot flood the model or the STAC API.
+
+    Args:
+        agent: Root agent to serve.
+        app_name: ADK application name used for sessions.
+        session_service: Session store (default: ``InMemorySessionService``).
+        max_concurrency: Maximum turns in flight per event loop.
+        fast_path: Optional coroutine ``query -> answer | None`` tried before
+            the model. A non-None answer is recorded in the session as the
+            agent's reply and returned without an LLM call (see
+            ``capstone.agent.fast_path.run_fast_path_async``).
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        app_name: str,
+        session_service: Optional[BaseSessionService] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        fast_path: Optional[FastPath] = None,
+    ):
+        if max_concurrency <= 0:
+            raise ValueError(f"max_concurrency must be positive, got: {max_concurrency}")
+
+        self.agent = agent
+        self.app_name = app_name
+        self.session_service = session_service or InMemorySessionService()
+        self.max_concurrency = max_concurrency
+        self.fast_path = fast_path
+        self.fast_path_answers = 0
+        self.runner = Runner(agent=agent, app_name=app_name, session_service=self.session_service)
+        # asyncio.Semaphore はイベントループに紐づくため、ループごとに持つ
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def ensure_session(self, user_id: str, session_id: str) -> None:
+        """
+        Create the session if it does not exist yet (existing sessions keep their history).
+        """
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            await self.session_service.create_session(
+                app_name=self.app_name, user_id=user_id, session_id=session_id
+            )
+
+    async def _record_turn(self, user_id: str, session_id: str, query: str, answer: str) -> None:
+        # LLM を通さなかったターンも履歴に残し、後続のターンから参照できるようにする
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        invocation_id = f"e-{uuid.uuid4()}"
+        await self.session_service.append_event(session, Event(
+            author="user",
+            invocation_id=invocation_id,
+            content=types.Content(role="user", parts=[types.Part(text=query)]),
+        ))
+        await self.session_service.append_event(session, Event(
+            author=self.agent.name,
+            invocation_id=invocation_id,
+            content=types.Content(role="model", parts=[types.Part(text=answer)]),
+        ))
+
+    async def ask(self, query: str, user_id: str, session_id: Optional[str] = None) -> str:
+        """
+        Run one user turn and return the final response text ("" if there is none).
+
+        Args:
+            query: User message.
+            user_id: User the session belongs to.
+            session_id: Session to continue. None starts a fresh session.
+        """
+        if session_id is None:
+            session_id = f"session_{uuid.uuid4()}"
+
+        async with self._semaphore():
+            await self.ensure_session(user_id, session_id)
+            if self.fast_path is not None:
+                answer = await self.fast_path(query)
+                if answer is not None:
+                    self.fast_path_answers += 1
+                    await self._record_turn(user_id, session_id, query, answer)
+                    return answer
+
+            content = types.Content(role="user", parts=[types.Part(text=query)])
+            final_text = ""
+            async for event in self.runner.run_async(
+                user_id=user_id, session_id=session_id, new_message=content
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    final_text = "".join(part.text or "" for part in event.content.parts)
+            return final_text
+
+    async def ask_many(
+        self,
+        queries: Iterable[str],
+        user_id: str,
+        session_ids: Optional[Iterable[Optional[str]]] = None,
+    ) -> list[str]:
+        """
+        Run many independent turns concurrently (bounded by ``max_concurrency``).
+
+        Returns the final response texts in the order of ``queries``. Each query
+        gets a fresh session unless ``session_ids`` is given.
+        """
+        queries = list(queries)
+        ids = list(session_ids) if session_ids is not None else [None] * len(queries)
+        if len(ids) != len(queries):
+            raise ValueError(f"got {len(queries)} queries but {len(ids)} session ids")
+        return list(await asyncio.gather(
+            *(self.ask(query, user_id, session_id) for query, session_id in zip(queries, ids))
+        ))
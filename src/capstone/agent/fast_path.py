@@ -0,0 +1,298 @@
+# src/capstone/agent/fast_path.py
+
+"""
+Rule-based pre-parser that answers fully specified queries without the LLM.
+
+Queries such as "Sentinel-2, tokyo_area, 2023-08-01..2023-08-31, <10% cloud"
+name exactly one known AOI, one explicit time range and (optionally) a cloud
+threshold. For those, ``parse_structured_query`` builds the tool arguments
+with the same rules the system prompt gives the LLM, and ``run_fast_path``
+calls ``resolve_aoi`` / ``search_satellite_scenes`` directly and renders the
+standard results table.
+
+Anything ambiguous (unknown or qualified places, relative or vague dates,
+unsupported sensors, conflicting constraints) or any word the rules do not
+consume beyond request phrasing ("show me ... images over ...") returns
+None so the caller falls back to the LLM.
+"""
+
+import calendar
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Optional
+
+from capstone.aoi.aoi_catalog import AOI_CATALOG, resolve_aoi
+from capstone.tools.stac_async import search_satellite_scenes_async
+from capstone.tools.stac_search import DEFAULT_COLLECTIONS, search_satellite_scenes
+
+
+DEFAULT_SCENES_SHOWN = 5
+
+_MONTHS = {
+    name.lower(): i
+    for i in range(1, 13)
+    for name in (calendar.month_name[i], calendar.month_abbr[i])
+}
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+# プロンプトで確認を求めている曖昧な表現・非対応センサー
+_FALLBACK_RE = re.compile(
+    r"\b(early|mid|late|last|this|next|recent|recently|ago|yesterday|today|tonight|"
+    r"spring|autumn|fall|winter|sentinel-?1|radar|sar|landsat|modis|planet|bbox|compare)\b"
+    r"|\d+\.\d+\s*,\s*\d+\.\d+",
+    re.IGNORECASE,
+)
+
+_ISO_DATE = r"(\d{4}-\d{2}-\d{2})(?:T[\d:.]+Z?)?"
+_TIME_PATTERNS = [
+    ("iso_range", re.compile(
+        _ISO_DATE + r"\s*(?:\.\.|/|to|through|until|and|–|—|-|~)\s*" + _ISO_DATE, re.IGNORECASE
+    )),
+    ("day_range", re.compile(
+        rf"\b({_MONTH_RE})\.?\s+(\d{{1,2}})\s*(?:–|—|-|~|to)\s*(\d{{1,2}}),?\s+(\d{{4}})\b", re.IGNORECASE
+    )),
+    ("month", re.compile(rf"\b({_MONTH_RE})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)),
+    ("summer", re.compile(r"\bsummer\s+(?:of\s+)?(\d{4})\b", re.IGNORECASE)),
+    ("year", re.compile(r"\b(?:in|during|for|of|throughout)\s+(\d{4})\b", re.IGNORECASE)),
+]
+
+_CLOUD_WORDS = r"cloud(?:s|iness)?(?:\s+cover(?:age)?)?"
+# 前後の "cloud cover" も含めて消費する（残った "cloud" は解釈できなかった条件として扱う）
+_CLOUD_NUMERIC = re.compile(
+    rf"(?:{_CLOUD_WORDS}\s+(?:of\s+)?)?"
+    r"(?:less than|lower than|below|under|at most|up to|max(?:imum)?(?: of)?|<=?|≤)\s*"
+    rf"(\d+(?:\.\d+)?)\s*%(?:\s*{_CLOUD_WORDS})?",
+    re.IGNORECASE,
+)
+# プロンプトの「Cloud cover handling」と同じ対応表（長い表現から順に照合する）
+_CLOUD_PHRASES = [
+    (re.compile(r"without any cloud (?:constraint|limit|filter)|any cloud cover|regardless of cloud", re.I), 100.0),
+    (re.compile(r"almost cloud[- ]free|nearly cloud[- ]free|very few clouds", re.I), 15.0),
+    (re.compile(r"cloud[- ]free|no clouds", re.I), 10.0),
+    (re.compile(r"low[- ]cloud|mostly clear", re.I), 20.0),
+]
+_SCENE_COUNT = re.compile(r"\b(?:top|best)\s+(\d{1,2})\b|(?<![\w-])(\d{1,2})\s+(?:scenes|images)\b", re.IGNORECASE)
+_COLLECTION_RE = re.compile(r"\bsentinel[- ]?2(?:[- ]?l2a)?\b", re.IGNORECASE)
+
+# 上の規則で消費されずに残ってよい語（依頼の言い回し・前置詞・冠詞など）。ほかの語が
+# 1 つでも残れば、場所の修飾や落とした条件があるので LLM に任せる
+# 例: "Greater Tokyo", "Tokyo Bay", "only at night", "more than 50% cloud", "L1C", "but not ..."
+_FILLER_WORDS = frozenset({
+    "a", "an", "the", "me", "i", "we", "us", "you", "please", "can", "could", "would", "like",
+    "need", "want", "find", "show", "get", "give", "list", "search", "fetch", "look", "for",
+    "any", "some", "all", "available", "sentinel", "optical", "satellite",
+    "image", "images", "imagery", "scene", "scenes", "data",
+    "of", "over", "around", "covering", "in", "on", "at", "from", "between", "during", "with", "and", "to",
+})
+_WORD_RE = re.compile(r"[^\W_]+|%")
+
+
+@dataclass
+class FastPathPlan:
+    """Tool arguments for a query the fast path can answer."""
+
+    aoi_hint: str
+    aoi_id: str
+    bbox: list[float]
+    datetime_range: str
+    cloud_cover_max: float
+    collections: list[str] = field(default_factory=lambda: list(DEFAULT_COLLECTIONS))
+    limit: int = DEFAULT_SCENES_SHOWN
+
+    @property
+    def start_date(self) -> str:
+        return self.datetime_range[:10]
+
+    @property
+    def end_date(self) -> str:
+        return self.datetime_range.split("/")[1][:10]
+
+
+def _alias_pattern() -> re.Pattern:
+    names = set()
+    for entry in AOI_CATALOG:
+        names.add(str(entry["id"]).lower())
+        names.add(str(entry["id"]).lower().replace("_", " "))
+        names.update(str(a).lower() for a in entry.get("aliases", []))  # type: ignore[union-attr]
+    alternation = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(rf"(?<![\w-])({alternation})(?![\w-])")
+
+
+_ALIAS_RE = _alias_pattern()
+
+
+def _find_aoi(text: str) -> Optional[tuple[str, dict]]:
+    lowered = text.lower()
+    found: dict[str, tuple[str, dict]] = {}
+    for match in _ALIAS_RE.finditer(lowered):
+        hint = text[match.start():match.end()]
+        result = resolve_aoi(hint)
+        if result["matched"]:
+            found.setdefault(result["aoi_id"], (hint, result))
+    if len(found) != 1:
+        return None
+    return next(iter(found.values()))
+
+
+def _day_range(start: date, end: date) -> Optional[str]:
+    if start > end:
+        return None
+    return f"{start.isoformat()}T00:00:00Z/{end.isoformat()}T23:59:59Z"
+
+
+def _find_time_range(text: str) -> Optional[str]:
+    ranges = []
+    for kind, pattern in _TIME_PATTERNS:
+        for match in pattern.finditer(text):
+            g = match.groups()
+            try:
+                if kind == "iso_range":
+                    ranges.append(_day_range(date.fromisoformat(g[0]), date.fromisoformat(g[1])))
+                elif kind == "day_range":
+                    month, year = _MONTHS[g[0].lower()], int(g[3])
+                    ranges.append(_day_range(date(year, month, int(g[1])), date(year, month, int(g[2]))))
+                elif kind == "month":
+                    month, year = _MONTHS[g[0].lower()], int(g[1])
+                    last = calendar.monthrange(year, month)[1]
+                    ranges.append(_day_range(date(year, month, 1), date(year, month, last)))
+                elif kind == "summer":
+                    year = int(g[0])
+                    ranges.append(_day_range(date(year, 6, 1), date(year, 8, 31)))
+                else:
+                    year = int(g[0])
+                    ranges.append(_day_range(date(year, 1, 1), date(year, 12, 31)))
+            except ValueError:
+                return None
+        # 一度使った部分は後のパターンで二重に拾わないよう潰しておく
+        text = pattern.sub(" ", text)
+    if len(ranges) != 1 or ranges[0] is None:
+        return None
+    return ranges[0]
+
+
+def _find_cloud(text: str) -> Optional[float] | bool:
+    """Return the threshold, None if unspecified, or False if conflicting."""
+    values = {float(m.group(1)) for m in _CLOUD_NUMERIC.finditer(text)}
+    for pattern, value in _CLOUD_PHRASES:
+        if pattern.search(text):
+            values.add(value)
+            text = pattern.sub(" ", text)
+    if len(values) > 1:
+        return False
+    value = values.pop() if values else None
+    if value is not None and not 0.0 <= value <= 100.0:
+        return False
+    return value
+
+
+def _unconsumed(query: str) -> str:
+    """Return ``query`` with every part the rules below understood blanked out."""
+    text = _ALIAS_RE.sub(" ", query.lower())
+    for _, pattern in _TIME_PATTERNS:
+        text = pattern.sub(" ", text)
+    text = _CLOUD_NUMERIC.sub(" ", text)
+    for pattern, _ in _CLOUD_PHRASES:
+        text = pattern.sub(" ", text)
+    text = _SCENE_COUNT.sub(" ", text)
+    return _COLLECTION_RE.sub(" ", text)
+
+
+def _leftover_words(query: str) -> list[str]:
+    """Return the words of ``query`` that no rule consumed and that are not filler."""
+    return [w for w in _WORD_RE.findall(_unconsumed(query)) if w not in _FILLER_WORDS]
+
+
+def parse_structured_query(query: str) -> Optional[FastPathPlan]:
+    """
+    Build tool arguments for a fully specified query, or return None to use the LLM.
+
+    Every word of the query must be used: once the AOI alias, date, cloud,
+    scene-count and collection spans are removed, only filler such as
+    "show me ... images over" may remain. Anything else ("Greater", "Bay",
+    "at night", a number, a product level, an exclusion) means the rules
+    would drop part of the request, so the LLM handles it instead.
+    """
+    if _FALLBACK_RE.search(query) or _leftover_words(query):
+        return None
+
+    aoi = _find_aoi(query)
+    datetime_range = _find_time_range(query)
+    if aoi is None or datetime_range is None:
+        return None
+    hint, resolved = aoi
+
+    cloud = _find_cloud(query)
+    if cloud is False:
+        return None
+    if cloud is None:
+        # プロンプトの既定値: AOI の既定 → 1 か月以内なら 30 → それより長ければ 50
+        start = date.fromisoformat(datetime_range[:10])
+        end = date.fromisoformat(datetime_range.split("/")[1][:10])
+        default = resolved.get("default_cloud_cover")
+        cloud = float(default) if default is not None else (30.0 if (end - start).days <= 31 else 50.0)
+
+    count = _SCENE_COUNT.search(query)
+    limit = int(next(g for g in count.groups() if g)) if count else DEFAULT_SCENES_SHOWN
+    if limit <= 0:
+        return None
+
+    return FastPathPlan(
+        aoi_hint=hint,
+        aoi_id=resolved["aoi_id"],
+        bbox=list(resolved["bbox"]),
+        datetime_range=datetime_range,
+        cloud_cover_max=cloud,
+        limit=limit,
+    )
+
+
+def format_fast_path_answer(plan: FastPathPlan, rows: list[dict]) -> str:
+    """
+    Render the final answer for a fast-path query (table plus a short note).
+    """
+    where = f"{plan.aoi_id} ({plan.aoi_hint})"
+    period = f"{plan.start_date} to {plan.end_date} (UTC)"
+    cloud = f"{plan.cloud_cover_max:g}%"
+    if not rows:
+        return (
+            f"No scenes were found over {where} from {period} with cloud cover up to {cloud}. "
+            "You could raise the cloud cover limit, widen the date range or choose a larger area."
+        )
+    # pandas の読み込みは重いので、表を作るときだけ import する
+    from capstone.tools.scene_table import SceneTable
+
+    top = SceneTable.from_rows(rows).top_k(plan.limit)
+    # 評価セットの回答例と同じく「要約 + 注意書き」→ 表 の順にする
+    return (
+        f"Here are the top {len(top)} Sentinel-2 images over {where} from {period} "
+        f"with cloud cover up to {cloud}. Cloud cover is based on scene-level metadata "
+        "and may not perfectly match conditions over your exact area of interest.\n\n"
+        f"{top.to_markdown()}\n"
+    )
+
+
+def run_fast_path(query: str) -> Optional[str]:
+    """
+    Answer a fully specified query by calling the tools directly (None -> use the LLM).
+    """
+    plan = parse_structured_query(query)
+    if plan is None:
+        return None
+    rows = search_satellite_scenes(
+        plan.bbox, plan.datetime_range, plan.cloud_cover_max, plan.limit, plan.collections
+    )
+    return format_fast_path_answer(plan, rows)
+
+
+async def run_fast_path_async(query: str) -> Optional[str]:
+    """
+    Async version of ``run_fast_path`` (uses the non-blocking search tool).
+    """
+    plan = parse_structured_query(query)
+    if plan is None:
+        return None
+    rows = await search_satellite_scenes_async(
+        plan.bbox, plan.datetime_range, plan.cloud_cover_max, plan.limit, plan.collections
+    )
+    return format_fast_path_answer(plan, rows)
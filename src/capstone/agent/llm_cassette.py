@@ -0,0 +1,195 @@
+# src/capstone/agent/llm_cassette.py
+
+"""
+Record/replay for the model calls made by the ADK agent and the eval judge.
+
+``CassetteLlm`` wraps a model and stores each request's responses in a
+``Cassette`` keyed by the request contents, system instruction, tool
+declarations and model name. Replaying a recorded eval run needs neither
+an API key nor network and answers instantly.
+
+``install_cassettes`` points everything an eval run touches at one cassette
+directory (``llm.json.gz`` and ``stac.json.gz``): Gemini model names
+resolved through ADK's ``LLMRegistry`` (the agent and the LLM-as-judge
+metrics) and the shared sync/async STAC clients used by
+``search_satellite_scenes``.
+
+Environment:
+    CAPSTONE_CASSETTES: "replay", "record" or "auto"; unset disables cassettes.
+    CAPSTONE_CASSETTE_DIR: Cassette directory (overrides the caller's default).
+"""
+
+import atexit
+import copy
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+from capstone.tools.stac_async import configure_default_async_client
+from capstone.tools.stac_cache import MemoryCache, set_search_cache
+from capstone.tools.stac_cassette import AsyncCassetteStacClient, Cassette, CassetteStacClient
+from capstone.tools.stac_client import set_default_client
+from capstone.tools.stac_mirror import set_mirror
+
+
+LLM_CASSETTE = "llm.json.gz"
+STAC_CASSETTE = "stac.json.gz"
+
+# 応答内容に影響せず、環境ごとに変わり得る設定はキーに含めない
+_VOLATILE_CONFIG_KEYS = ("http_options",)
+
+_llm_cassette: Optional[Cassette] = None
+_llm_cassette_lock = threading.Lock()
+
+
+def get_llm_cassette() -> Optional[Cassette]:
+    """Return the cassette used by ``CassetteLlm`` instances without their own (None if not installed)."""
+    return _llm_cassette
+
+
+def set_llm_cassette(cassette: Optional[Cassette]) -> None:
+    """Set the process-wide model cassette; None makes ``CassetteLlm`` call the model directly."""
+    global _llm_cassette
+    with _llm_cassette_lock:
+        _llm_cassette = cassette
+
+
+def _strip_call_ids(contents: list[dict]) -> list[dict]:
+    contents = copy.deepcopy(contents)
+    for content in contents:
+        for part in content.get("parts", []):
+            for field in ("function_call", "function_response"):
+                if field in part:
+                    part[field].pop("id", None)
+    return contents
+
+
+def llm_request_key(llm_request: LlmRequest, stream: bool = False) -> str:
+    """
+    Cassette key for a model request.
+
+    Covers the model name, the conversation contents and the generation
+    config (system instruction, tool declarations, ...). Function call ids
+    are left out: ADK generates them per run, so they would never match.
+    """
+    config = llm_request.config.model_dump(mode="json", exclude_none=True) if llm_request.config else {}
+    for key in _VOLATILE_CONFIG_KEYS:
+        config.pop(key, None)
+    contents = [c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents]
+    text = json.dumps(
+        {"model": llm_request.model, "stream": stream, "contents": _strip_call_ids(contents), "config": config},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _describe(llm_request: LlmRequest) -> dict:
+    # カセット内で人が見て分かる程度の要約（キーの計算には使わない）
+    last_text = next(
+        (p.text for c in reversed(llm_request.contents) for p in c.parts or [] if p.text),
+        "",
+    )
+    return {"model": llm_request.model, "contents": len(llm_request.contents), "last_text": last_text[:80]}
+
+
+class CassetteLlm(BaseLlm):
+    """
+    ADK model that records responses to, or replays them from, a cassette.
+
+    Registered for Gemini model names by ``install_cassettes``, so
+    ``Agent(model="gemini-...")`` and the eval judge go through it. Without a
+    cassette (neither ``cassette`` nor ``set_llm_cassette``) it simply
+    forwards to the inner model.
+
+    Attributes:
+        inner: Model used for live calls; defaults to ``Gemini(model=model)``,
+            created only when a call is not replayed.
+        cassette: Cassette for this instance; defaults to ``get_llm_cassette()``.
+    """
+
+    inner: Optional[BaseLlm] = None
+    cassette: Optional[Cassette] = None
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        # Gemini と同じパターンで登録し、名前で解決されるモデルをすべて差し替える
+        from google.adk.models import Gemini
+
+        return Gemini.supported_models()
+
+    def _live_model(self) -> BaseLlm:
+        if self.inner is None:
+            from google.adk.models import Gemini
+
+            self.inner = Gemini(model=self.model)
+        return self.inner
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        cassette = self.cassette or get_llm_cassette()
+        if cassette is None:
+            async for response in self._live_model().generate_content_async(llm_request, stream):
+                yield response
+            return
+
+        async def call() -> list[dict]:
+            return [
+                response.model_dump(mode="json", exclude_none=True)
+                async for response in self._live_model().generate_content_async(llm_request, stream)
+            ]
+
+        recorded = await cassette.aplay(llm_request_key(llm_request, stream), call, _describe(llm_request))
+        for data in recorded:
+            # bytes（thought_signature など）は base64 で保存されているので JSON として検証し直す
+            yield LlmResponse.model_validate_json(json.dumps(data))
+
+
+def install_cassettes(directory: str | Path, mode: str = "replay") -> tuple[Cassette, Cassette]:
+    """
+    Route model and STAC calls of this process through cassettes in ``directory``.
+
+    Also replaces the search cache with a fresh in-memory one and turns off
+    the local mirror, so that every search made while recording reaches the
+    STAC client (and the cassette) regardless of state left on disk.
+    Recorded interactions are saved at interpreter exit.
+
+    Returns:
+        The (llm, stac) cassettes.
+    """
+    directory = Path(directory)
+    llm = Cassette(directory / LLM_CASSETTE, mode)
+    stac = Cassette(directory / STAC_CASSETTE, mode)
+
+    set_llm_cassette(llm)
+    LLMRegistry.register(CassetteLlm)
+    set_default_client(CassetteStacClient(stac))
+    configure_default_async_client(client_factory=lambda **settings: AsyncCassetteStacClient(stac, **settings))
+    set_search_cache(MemoryCache())
+    set_mirror(None)
+
+    atexit.register(llm.save)
+    atexit.register(stac.save)
+    return llm, stac
+
+
+def install_cassettes_from_env(default_dir: Optional[str | Path] = None) -> Optional[tuple[Cassette, Cassette]]:
+    """
+    ``install_cassettes`` as configured by CAPSTONE_CASSETTES / CAPSTONE_CASSETTE_DIR.
+
+    Returns None (and changes nothing) when CAPSTONE_CASSETTES is unset.
+    """
+    mode = os.environ.get("CAPSTONE_CASSETTES")
+    if not mode:
+        return None
+    directory = os.environ.get("CAPSTONE_CASSETTE_DIR") or default_dir
+    if directory is None:
+        raise ValueError("CAPSTONE_CASSETTES is set but no cassette directory was given (CAPSTONE_CASSETTE_DIR)")
+    return install_cassettes(directory, mode)
@@ -1,10 +1,44 @@
 # src/capstone/agent/prompts.py
 
-from capstone.aoi.aoi_catalog import format_known_aois_for_prompt
+import os
 
-KNOWN_AOIS_PROMPT = format_known_aois_for_prompt()
+from capstone.aoi.aoi_catalog import AOI_CATALOG, format_known_aois_for_prompt
 
-SYSTEM_PROMPT = f"""
+# AOI の扱い方:
+#   inline   : カタログ全件の bbox をシステムプロンプトに埋め込む（従来どおり）
+#   discover : プロンプトには AOI を一切載せず、resolve_aoi / search_aois で引かせる
+#   auto     : カタログが INLINE_AOI_LIMIT 件以下なら inline、それより大きければ discover
+PROMPT_MODES = ("inline", "discover", "auto")
+DEFAULT_PROMPT_MODE = os.environ.get("CAPSTONE_PROMPT_MODE", "auto")
+INLINE_AOI_LIMIT = 50
+
+# モードごとに使えるツールが違う（search_aois は discover のときだけエージェントに渡す）
+_INLINE_TOOLS = """You have access to two tools:
+- "resolve_aoi": maps a location hint or AOI id to a canonical AOI (bbox, center, note, default cloud cover).
+- "search_satellite_scenes": queries a STAC API for scenes."""
+
+_DISCOVER_TOOLS = """You have access to three tools:
+- "resolve_aoi": maps a location hint or AOI id to a canonical AOI (bbox, center, note, default cloud cover).
+- "search_aois": ranks known AOIs by similarity to a free-text phrase
+  (returns aoi_id, alias, score, bbox, note).
+- "search_satellite_scenes": queries a STAC API for scenes."""
+
+_INLINE_AOI_SECTION = """
+Known AOIs (use these bounding boxes when the phrase matches exactly, and the AOI IDs
+exactly as listed below):
+{known_aois}
+"""
+
+_DISCOVER_AOI_SECTION = """
+Known AOIs:
+- The AOI catalog is too large to list here; use "search_aois" to look it up.
+- Call "resolve_aoi" with the user's place phrase first; if it returns matched = false,
+  call "search_aois" with the phrase (or a shorter variant) to list similar known AOIs,
+  and offer the best candidates to the user instead of guessing.
+- Only use AOI ids and bboxes returned by these tools.
+"""
+
+_SYSTEM_PROMPT_TEMPLATE = """
 You are a satellite metadata search agent. You translate natural language queries
 into STAC search parameters and call the `search_satellite_scenes` tool.
 
@@ -12,13 +46,12 @@ Your primary goal is to help the user find suitable Earth observation scenes
 by converting natural language queries into precise STAC search parameters
 and by clearly explaining the search results.
 
-You have access to two tools:
-- "resolve_aoi": maps a location hint or AOI id to a canonical AOI (bbox, center, note, default cloud cover).
-- "search_satellite_scenes": queries a STAC API for scenes.
+{tools}
 
 The search tool expects the following arguments:
 - bbox: [min_lon, min_lat, max_lon, max_lat]
-- datetime_range: ISO 8601 interval string "start/end" (UTC)
+- datetime_range: ISO 8601 interval string "start/end" (UTC); for several separate periods
+  (for example "summers 2021-2023") join one interval per period with commas
 - cloud_cover_max: maximum allowed cloud cover in percent (0–100)
 - limit (optional): maximum number of scenes to return
 - collections (optional): list of STAC collection IDs, e.g. ["sentinel-2-l2a"]
@@ -52,14 +85,11 @@ Location handling (clarify-first):
 - If you have a reasonable guess of the approximate area, propose a center
   coordinate and ask for confirmation before calling the search tool. Example:
   "I can search around lon X, lat Y; is that okay? If not, please provide a bbox."
-- Use known AOI IDs exactly as listed below. Do not invent new AOI IDs.
+- Do not invent new AOI IDs.
 - Never fabricate impossible coordinates. Longitudes must be in [-180, 180],
   latitudes in [-90, 90].
 
-
-Known AOIs (use these bounding boxes when the phrase matches exactly):
-{KNOWN_AOIS_PROMPT}
-
+{aoi_section}
 Special AOI behavior:
 - If the AOI id is "japan_cloud_free_focused" and the user does not provide a cloud constraint,
   set cloud_cover_max to 10 by default.
@@ -150,6 +180,39 @@ IMPORTANT:
 
 """
 
+
+
+def resolve_prompt_mode(mode: str | None = None, catalog: list[dict] | None = None) -> str:
+    """
+    Resolve "auto" (or None -> ``DEFAULT_PROMPT_MODE``) to "inline" or "discover".
+    """
+    mode = mode or DEFAULT_PROMPT_MODE
+    if mode not in PROMPT_MODES:
+        raise ValueError(f"prompt mode must be one of {PROMPT_MODES}, got: {mode}")
+    if mode == "auto":
+        size = len(AOI_CATALOG if catalog is None else catalog)
+        return "inline" if size <= INLINE_AOI_LIMIT else "discover"
+    return mode
+
+
+def build_system_prompt(mode: str | None = None, catalog: list[dict] | None = None) -> str:
+    """
+    Build the system prompt for the given AOI mode.
+
+    Args:
+        mode: "inline", "discover" or "auto" (default: ``CAPSTONE_PROMPT_MODE``
+            or "auto"). In "discover" mode the prompt carries no per-AOI data,
+            so its size does not depend on the catalog.
+        catalog: AOI catalog to inline (default: the loaded catalog).
+    """
+    if resolve_prompt_mode(mode, catalog) == "inline":
+        tools = _INLINE_TOOLS
+        aoi_section = _INLINE_AOI_SECTION.format(known_aois=format_known_aois_for_prompt(catalog))
+    else:
+        tools = _DISCOVER_TOOLS
+        aoi_section = _DISCOVER_AOI_SECTION
+    return _SYSTEM_PROMPT_TEMPLATE.format(tools=tools, aoi_section=aoi_section)
+
 ARGUMENT_PLANNING_INSTRUCTIONS = """
 You map natural language into arguments for the `search_satellite_scenes` tool:
 - bbox: [min_lon, min_lat, max_lon, max_lat]
@@ -242,3 +305,11 @@ Reasoning:
 - Ask a clarifying question such as:
   "Which area and which time period are you interested in?"
 """
+
+
+def __getattr__(name: str):
+    # SYSTEM_PROMPT（既定モードのプロンプト）は import 時には組み立てず、初回参照時に作ってキャッシュする
+    if name == "SYSTEM_PROMPT":
+        value = globals()["SYSTEM_PROMPT"] = build_system_prompt()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,333 @@
+# src/capstone/agent/session_store.py
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+
+DEFAULT_MAX_CACHED_SESSIONS = 1024
+DEFAULT_IDLE_TIMEOUT = 15 * 60   # 秒。これより長く触られていないセッションはメモリから追い出す
+DEFAULT_MAX_EVENTS = 200         # これを超えた履歴は古いターンから切り詰める
+_TEMP_PREFIX = "temp:"
+
+
+@dataclass
+class SessionStoreStats:
+    """Counters for the warm-session cache and history compaction."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    compacted_events: int = 0
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    ADK session service persisted in a local SQLite file with a bounded warm cache.
+
+    Every appended event is written through to SQLite, so sessions survive
+    restarts and the process only keeps a bounded set of warm sessions in
+    memory: at most ``max_cached_sessions`` (least recently used evicted
+    first), and none that have been idle for longer than ``idle_timeout``
+    seconds. Cold sessions are reloaded from disk on their next turn.
+
+    Long histories are compacted: once a session holds more than
+    ``max_events`` events, the oldest turns are dropped, cutting at a user
+    message so that tool calls are never separated from their responses.
+
+    ``app:`` / ``user:`` state keys are stored with the session like any
+    other key (they are not shared across sessions).
+
+    Args:
+        path: SQLite file (":memory:" for a throwaway store).
+        max_cached_sessions: Warm sessions kept in memory.
+        idle_timeout: Seconds after which an untouched warm session is evicted
+            from memory. None disables idle eviction.
+        max_events: Event history cap per session. None disables compaction.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_cached_sessions: int = DEFAULT_MAX_CACHED_SESSIONS,
+        idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT,
+        max_events: Optional[int] = DEFAULT_MAX_EVENTS,
+    ):
+        if max_cached_sessions <= 0:
+            raise ValueError(f"max_cached_sessions must be positive, got: {max_cached_sessions}")
+        if max_events is not None and max_events <= 0:
+            raise ValueError(f"max_events must be positive, got: {max_events}")
+
+        self.max_cached_sessions = max_cached_sessions
+        self.idle_timeout = idle_timeout
+        self.max_events = max_events
+        self.stats = SessionStoreStats()
+        # key -> (session, last access の monotonic 時刻)
+        self._warm: "OrderedDict[tuple[str, str, str], tuple[Session, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                app_name TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                last_update_time REAL NOT NULL,
+                PRIMARY KEY (app_name, user_id, session_id)
+            );
+            CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (last_update_time);
+            CREATE TABLE IF NOT EXISTS events (
+                app_name TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                session_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                event TEXT NOT NULL,
+                PRIMARY KEY (app_name, user_id, session_id, seq)
+            );
+            """
+        )
+
+    # ---- warm cache -------------------------------------------------------
+
+    def _cache_get(self, key: tuple[str, str, str]) -> Optional[Session]:
+        now = time.monotonic()
+        self._evict_idle(now)
+        hit = self._warm.get(key)
+        if hit is None:
+            return None
+        self._warm[key] = (hit[0], now)
+        self._warm.move_to_end(key)
+        return hit[0]
+
+    def _cache_put(self, key: tuple[str, str, str], session: Session) -> None:
+        now = time.monotonic()
+        self._warm[key] = (session, now)
+        self._warm.move_to_end(key)
+        while len(self._warm) > self.max_cached_sessions:
+            self._warm.popitem(last=False)
+            self.stats.evictions += 1
+        self._evict_idle(now)
+
+    def _evict_idle(self, now: float) -> None:
+        if self.idle_timeout is None:
+            return
+        # OrderedDict は最終アクセス順なので、先頭から古いものだけ見ればよい
+        while self._warm:
+            key, (_, accessed) = next(iter(self._warm.items()))
+            if now - accessed <= self.idle_timeout:
+                break
+            del self._warm[key]
+            self.stats.evictions += 1
+
+    @property
+    def warm_sessions(self) -> int:
+        return len(self._warm)
+
+    # ---- storage ----------------------------------------------------------
+
+    def _load(self, key: tuple[str, str, str]) -> Optional[Session]:
+        row = self._conn.execute(
+            "SELECT state, last_update_time FROM sessions "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        events = [
+            Event.model_validate_json(text)
+            for (text,) in self._conn.execute(
+                "SELECT event FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                "ORDER BY seq",
+                key,
+            )
+        ]
+        return Session(
+            app_name=key[0],
+            user_id=key[1],
+            id=key[2],
+            state=json.loads(row[0]),
+            events=events,
+            last_update_time=row[1],
+        )
+
+    def _compaction_cut(self, events: list[Event]) -> int:
+        # max_events 件以内に収まる、最も古い「ユーザー発話」から残す
+        if self.max_events is None or len(events) <= self.max_events:
+            return 0
+        for i in range(len(events) - self.max_events, len(events)):
+            if events[i].author == "user":
+                return i
+        return len(events) - self.max_events
+
+    # ---- BaseSessionService -----------------------------------------------
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or str(uuid.uuid4())
+        key = (app_name, user_id, session_id)
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=dict(state or {}),
+            events=[],
+            last_update_time=time.time(),
+        )
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (app_name, user_id, session_id, state, last_update_time) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*key, json.dumps(session.state), session.last_update_time),
+                )
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"session already exists: {session_id}") from e
+            self._cache_put(key, session)
+        return session.model_copy(deep=True)
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            session = self._cache_get(key)
+            if session is None:
+                self.stats.misses += 1
+                session = self._load(key)
+                if session is None:
+                    return None
+                self._cache_put(key, session)
+            else:
+                self.stats.hits += 1
+            copy = session.model_copy(deep=True)
+
+        copy.state = {k: v for k, v in copy.state.items() if not k.startswith(_TEMP_PREFIX)}
+        if config is not None:
+            if config.after_timestamp:
+                copy.events = [e for e in copy.events if e.timestamp >= config.after_timestamp]
+            if config.num_recent_events:
+                copy.events = copy.events[-config.num_recent_events:]
+        return copy
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        query = "SELECT user_id, session_id, state, last_update_time FROM sessions WHERE app_name = ?"
+        params: tuple = (app_name,)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params += (user_id,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY last_update_time", params).fetchall()
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=uid, id=sid, state=json.loads(state),
+                    events=[], last_update_time=updated)
+            for uid, sid, state, updated in rows
+        ])
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        key = (app_name, user_id, session_id)
+        with self._lock:
+            self._warm.pop(key, None)
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            )
+            self._conn.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+            )
+            self._conn.execute("COMMIT")
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session, event)
+        if event.partial:
+            return event
+
+        key = (session.app_name, session.user_id, session.id)
+        session.last_update_time = event.timestamp
+        cut = self._compaction_cut(session.events)
+        if cut:
+            del session.events[:cut]
+            self.stats.compacted_events += cut
+        state = {k: v for k, v in session.state.items() if not k.startswith(_TEMP_PREFIX)}
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            (next_seq,) = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM events "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                key,
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO events (app_name, user_id, session_id, seq, event) VALUES (?, ?, ?, ?, ?)",
+                (*key, next_seq, event.model_dump_json(exclude_none=True)),
+            )
+            if cut:
+                # 残すのは直近 len(session.events) 件
+                self._conn.execute(
+                    "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? AND seq <= ?",
+                    (*key, next_seq - len(session.events)),
+                )
+            self._conn.execute(
+                "UPDATE sessions SET state = ?, last_update_time = ? "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (json.dumps(state, default=str), session.last_update_time, *key),
+            )
+            self._conn.execute("COMMIT")
+            # Runner が持っているセッションをそのまま温めておく（次のターンはディスクを読まない）
+            self._cache_put(key, session)
+        return event
+
+    # ---- maintenance ------------------------------------------------------
+
+    def purge_idle(self, older_than: float) -> int:
+        """
+        Delete sessions (and their events) not updated for ``older_than`` seconds.
+
+        Returns:
+            Number of sessions removed.
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            self._conn.execute("BEGIN")
+            stale = self._conn.execute(
+                "SELECT app_name, user_id, session_id FROM sessions WHERE last_update_time < ?",
+                (cutoff,),
+            ).fetchall()
+            for key in stale:
+                self._warm.pop(tuple(key), None)
+                self._conn.execute(
+                    "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?", key
+                )
+            self._conn.execute("DELETE FROM sessions WHERE last_update_time < ?", (cutoff,))
+            self._conn.execute("COMMIT")
+        return len(stale)
+
+    def close(self) -> None:
+        with self._lock:
+            self._warm.clear()
+            self._conn.close()
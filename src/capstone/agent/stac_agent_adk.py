@@ -1,17 +1,30 @@
 # src/capstone/agent/stac_agent_adk.py
 
+from __future__ import annotations
+
 import asyncio
+import os
+import threading
 import uuid
+from typing import TYPE_CHECKING, Awaitable, Optional, TypeVar
+
+from capstone.aoi.aoi_catalog import resolve_aoi, search_aois
+from capstone.agent.prompts import (
+    ARGUMENT_PLANNING_INSTRUCTIONS,
+    build_system_prompt,
+    resolve_prompt_mode,
+)
 
-from google.adk.agents import Agent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+if TYPE_CHECKING:
+    from google.adk.agents import Agent
+    from google.adk.models import BaseLlm
+    from google.adk.runners import Runner
+    from google.adk.sessions import BaseSessionService
 
-from capstone.tools import search_satellite_scenes
-from capstone.aoi.aoi_catalog import resolve_aoi
-from capstone.agent.prompts import SYSTEM_PROMPT, ARGUMENT_PLANNING_INSTRUCTIONS
+    from capstone.agent.agent_service import AgentService
 
+# google.adk / google.genai と検索ツール（httpx, shapely）の読み込みは重いので、
+# モジュールの import では読まず、エージェントやランナーを作る関数の中で import する
 
 APP_NAME = "satellite_stac_agent"
 MODEL_NAME = "gemini-2.0-flash"  # or another Gemini 2.x model available in your env
@@ -19,32 +32,70 @@ MODEL_NAME = "gemini-2.0-flash"  # or another Gemini 2.x model available in your
 DEFAULT_SESSION_ID = f"session_{uuid.uuid4()}"
 DEFAULT_USER_ID = "local_user"
 
-def create_agent() -> Agent:
+T = TypeVar("T")
+
+def create_agent(prompt_mode: str | None = None, model: str | BaseLlm = MODEL_NAME) -> Agent:
     """
     Create the root ADK Agent configured for STAC metadata search.
+
+    Args:
+        prompt_mode: "inline", "discover" or "auto" (see ``capstone.agent.prompts``).
+            In "discover" mode the AOI catalog is not inlined into the prompt
+            and the agent gets the ``search_aois`` tool instead.
+        model: Model name or ``BaseLlm`` instance (benchmarks and tests pass a stub).
     """
-    instruction = SYSTEM_PROMPT.strip() + "\n\n" + ARGUMENT_PLANNING_INSTRUCTIONS.strip()
+    from google.adk.agents import Agent
+
+    from capstone.tools.stac_async import search_satellite_scenes_tool
+
+    mode = resolve_prompt_mode(prompt_mode)
+    instruction = build_system_prompt(mode).strip() + "\n\n" + ARGUMENT_PLANNING_INSTRUCTIONS.strip()
+    tools = [resolve_aoi, search_satellite_scenes_tool]
+    if mode == "discover":
+        tools.append(search_aois)
 
     root_agent = Agent(
         name="satellite_stac_agent",
-        model=MODEL_NAME,
+        model=model,
         description="Agent to search satellite scenes via STAC based on natural language queries.",
         instruction=instruction,
         # ADK will automatically wrap these Python functions as tools.
-        tools=[resolve_aoi, search_satellite_scenes],
+        # The search tool is the async variant (exposed to the LLM under the
+        # name "search_satellite_scenes") so that searches do not block the
+        # event loop shared by concurrent sessions.
+        tools=tools,
     )
     return root_agent
 
 
+def create_session_service():
+    """
+    Build the session store from the environment.
+
+    CAPSTONE_SESSION_DB selects the persistent, bounded ``SqliteSessionService``
+    at that path; otherwise sessions live in an ``InMemorySessionService``.
+    """
+    path = os.environ.get("CAPSTONE_SESSION_DB")
+    if path:
+        from capstone.agent.session_store import SqliteSessionService
+
+        return SqliteSessionService(path)
+    from google.adk.sessions import InMemorySessionService
+
+    return InMemorySessionService()
+
+
 async def create_runner_async(
     user_id: str = DEFAULT_USER_ID,
     session_id: str = None,
 ):
+    from google.adk.runners import Runner
+
     if session_id is None:
         session_id = f"session_{uuid.uuid4()}"
 
     agent = create_agent()
-    session_service = InMemorySessionService()
+    session_service = create_session_service()
 
     await session_service.create_session(
         app_name=APP_NAME,
@@ -56,7 +107,7 @@ async def create_runner_async(
     return runner, session_service
 
 
-def create_runner() -> tuple[Runner, InMemorySessionService]:
+def create_runner() -> tuple[Runner, BaseSessionService]:
     """
     Sync helper: create Runner by running the async version.
 
@@ -66,21 +117,76 @@ def create_runner() -> tuple[Runner, InMemorySessionService]:
     return asyncio.run(create_runner_async())
 
 
-def call_agent(query: str) -> None:
+_agent_service: Optional[AgentService] = None
+_agent_service_lock = threading.Lock()
+
+
+def get_agent_service() -> AgentService:
+    """
+    Return the process-wide ``AgentService`` (agent and runner built on first use).
+
+    Fully specified queries are answered by the deterministic fast path
+    without an LLM call; set CAPSTONE_FAST_PATH=0 to always use the model.
+    """
+    global _agent_service
+    if _agent_service is None:
+        with _agent_service_lock:
+            if _agent_service is None:
+                from capstone.agent.agent_service import AgentService
+                from capstone.agent.fast_path import run_fast_path_async
+
+                fast_path = None if os.environ.get("CAPSTONE_FAST_PATH") == "0" else run_fast_path_async
+                _agent_service = AgentService(
+                    create_agent(), APP_NAME, create_session_service(), fast_path=fast_path
+                )
+    return _agent_service
+
+
+def set_agent_service(service: Optional[AgentService]) -> None:
+    """
+    Replace the process-wide ``AgentService`` (None rebuilds it lazily).
+    """
+    global _agent_service
+    with _agent_service_lock:
+        _agent_service = service
+
+
+def _run_sync(coro: Awaitable[T]) -> T:
+    # asyncio.run はループごとに閉じるので、そのループ用に作られた共有 STAC クライアントも
+    # ループが終わる前に閉じる（残すと接続が漏れる）
+    async def main() -> T:
+        try:
+            return await coro
+        finally:
+            from capstone.tools.stac_async import close_default_async_client
+
+            await close_default_async_client()
+
+    return asyncio.run(main())
+
+
+def call_agent(
+    query: str,
+    user_id: str = DEFAULT_USER_ID,
+    session_id: str = DEFAULT_SESSION_ID,
+) -> str:
     """
     Simple synchronous helper: send a single user query and print the final response.
+
+    Reuses the shared agent and runner (see ``get_agent_service``), and by
+    default continues the same session across calls.
     """
-    runner, _ = create_runner()
+    text = _run_sync(get_agent_service().ask(query, user_id, session_id))
+    print("Agent Response:")
+    print(text)
+    return text
 
-    content = types.Content(role="user", parts=[types.Part(text=query)])
-    events = runner.run(
-        user_id=USER_ID,
-        session_id=SESSION_ID,
-        new_message=content,
-    )
 
-    for event in events:
-        if event.is_final_response():
-            if event.content and event.content.parts:
-                print("Agent Response:")
-                print(event.content.parts[0].text)
+def call_agents(queries: list[str], user_id: str = DEFAULT_USER_ID) -> list[str]:
+    """
+    Synchronous batch helper: run independent queries concurrently, one fresh session each.
+
+    Concurrency is bounded by the service's ``max_concurrency``.
+    Returns the final response texts in the order of ``queries``.
+    """
+    return _run_sync(get_agent_service().ask_many(queries, user_id))
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional
+
+from .aoi_fuzzy import NgramIndex, best_match
+
+if TYPE_CHECKING:
+    # shapely / numpy を読むので、空間索引を使うまで import しない
+    from .aoi_spatial import AoiSpatialIndex
 
 # Load AOI catalog from JSON so notebooks and tests can share one source of truth.
-_CATALOG_PATH = Path(__file__).with_suffix(".json")
+# CAPSTONE_AOI_CATALOG can point at a larger catalog file with the same schema.
+_CATALOG_PATH = Path(os.environ.get("CAPSTONE_AOI_CATALOG") or Path(__file__).with_suffix(".json"))
 
 
 def _load_catalog() -> List[Dict[str, object]]:
@@ -13,16 +22,157 @@ def _load_catalog() -> List[Dict[str, object]]:
         return json.load(f)
 
 
+def _normalize(text: str) -> str:
+    return text.strip().lower().replace("-", "_").replace(" ", "_")
+
+
+def build_alias_index(catalog: Iterable[Dict[str, object]]) -> Mapping[str, Dict[str, object]]:
+    """
+    Build a read-only normalized alias -> AOI entry index.
+
+    Every entry's id and aliases are normalized once here, so lookups are a
+    single dict access. When two entries share an alias, the earlier entry
+    wins (the same result the old linear scan gave).
+    """
+    index: Dict[str, Dict[str, object]] = {}
+    for entry in catalog:
+        for alias in [entry["id"]] + list(entry.get("aliases", [])):  # type: ignore[operator]
+            index.setdefault(_normalize(alias), entry)  # type: ignore[arg-type]
+    return MappingProxyType(index)
+
+
 AOI_CATALOG: List[Dict[str, object]] = _load_catalog()
 KNOWN_AOIS: Dict[str, Dict[str, object]] = {entry["id"]: entry for entry in AOI_CATALOG}
+ALIAS_INDEX: Mapping[str, Dict[str, object]] = build_alias_index(AOI_CATALOG)
+
+# bbox -> ポリゴン。LLM は resolve_aoi の bbox をそのまま検索に渡すので、bbox から引けるようにしておく
+_GEOMETRY_BY_BBOX: Dict[tuple, Dict[str, object]] = {}
+for _entry in AOI_CATALOG:
+    if _entry.get("geometry"):
+        _GEOMETRY_BY_BBOX.setdefault(tuple(round(float(v), 6) for v in _entry["bbox"]), _entry["geometry"])  # type: ignore[union-attr]
+
+
+def aoi_geometry(aoi_id: str) -> Optional[Dict[str, object]]:
+    """
+    Return the GeoJSON polygon of a known AOI, or None if it only has a bbox.
+
+    Raises:
+        KeyError: if ``aoi_id`` is not in the catalog.
+    """
+    return KNOWN_AOIS[aoi_id].get("geometry")  # type: ignore[return-value]
+
+
+def geometry_for_bbox(bbox: Iterable[float]) -> Optional[Dict[str, object]]:
+    """
+    Return the GeoJSON polygon of the known AOI whose bbox is exactly ``bbox``.
+
+    Lets the search tool refine a catalog bbox (as returned by ``resolve_aoi``)
+    to the AOI's precise outline. Returns None for any other bbox.
+    """
+    return _GEOMETRY_BY_BBOX.get(tuple(round(float(v), 6) for v in bbox))
+
+
+# この類似度以上なら確認なしで採用する（Dice 係数。"hokaido east" -> hokkaido_east 程度）
+FUZZY_MATCH_THRESHOLD = 0.8
+# これ未満の候補は聞き返しの選択肢にも出さない
+FUZZY_CANDIDATE_MIN_SCORE = 0.3
+
+_fuzzy_index: Optional[NgramIndex] = None
+_spatial_index: Optional[AoiSpatialIndex] = None
+
+
+def fuzzy_index() -> NgramIndex:
+    """
+    Return the n-gram index over the catalog (built on first use, then reused).
+    """
+    global _fuzzy_index
+    if _fuzzy_index is None:
+        _fuzzy_index = NgramIndex(AOI_CATALOG)
+    return _fuzzy_index
+
+
+def search_aois(query: str, top_k: int = 5) -> List[Dict[str, object]]:
+    """
+    Rank catalog AOIs by fuzzy similarity to a free-text query.
+
+    Handles typos ("hokaido"), extra filler words ("... region") and
+    Japanese variants (full-width, katakana/hiragana, 都/府/県 suffixes).
+
+    Returns:
+        List of {"aoi_id", "alias", "score", "bbox", "note"} dicts, best first.
+    """
+    return [
+        {
+            "aoi_id": entry["id"],
+            "alias": alias,
+            "score": score,
+            "bbox": entry["bbox"],
+            "note": entry.get("note"),
+        }
+        for entry, alias, score in fuzzy_index().search(query, top_k=top_k)
+    ]
+
+
+def spatial_index() -> AoiSpatialIndex:
+    """
+    Return the STRtree index over catalog footprints (built on first use, then reused).
+    """
+    global _spatial_index
+    if _spatial_index is None:
+        from .aoi_spatial import AoiSpatialIndex
+
+        _spatial_index = AoiSpatialIndex(AOI_CATALOG)
+    return _spatial_index
+
+
+def _summary(entry: Dict[str, object]) -> Dict[str, object]:
+    return {"aoi_id": entry["id"], "bbox": entry["bbox"], "note": entry.get("note")}
+
+
+def aois_containing(lon: float, lat: float) -> List[Dict[str, object]]:
+    """
+    List known AOIs containing a coordinate, most specific (smallest) first.
+
+    Returns:
+        List of {"aoi_id", "bbox", "note"} dicts.
+    """
+    return [_summary(e) for e in spatial_index().aois_containing(lon, lat)]
+
+
+def aois_intersecting(bbox: List[float]) -> List[Dict[str, object]]:
+    """
+    List known AOIs overlapping ``[min_lon, min_lat, max_lon, max_lat]``, smallest first.
+
+    Returns:
+        List of {"aoi_id", "bbox", "note"} dicts.
+    """
+    return [_summary(e) for e in spatial_index().aois_intersecting(bbox)]
 
 
-def format_known_aois_for_prompt() -> str:
+def smallest_enclosing_aoi(lon: float, lat: float) -> Dict[str, object]:
     """
-    Render the AOI catalog in a prompt-friendly bullet list.
+    Resolve a coordinate to the most specific known AOI that contains it.
+
+    Useful to confirm a center coordinate proposed by or to the user
+    ("139.7, 35.7 is in tokyo_area").
+
+    Returns:
+        Same format as ``resolve_aoi``.
+    """
+    entry = spatial_index().smallest_enclosing_aoi(lon, lat)
+    if entry is None:
+        return _unmatched_result()
+    result = _matched_result(entry)
+    result["message"] = f"Coordinate ({lon}, {lat}) lies in known AOI '{entry['id']}'."
+    return result
+
+
+def format_known_aois_for_prompt(catalog: Optional[Iterable[Dict[str, object]]] = None) -> str:
+    """
+    Render the AOI catalog (default: the loaded one) in a prompt-friendly bullet list.
     """
     lines: List[str] = []
-    for entry in AOI_CATALOG:
+    for entry in AOI_CATALOG if catalog is None else catalog:
         bbox = entry["bbox"]
         bbox_text = f"[{bbox[0]}, {bbox[1]}, {bbox[2]}, {bbox[3]}]"
 
@@ -40,8 +190,55 @@ def format_known_aois_for_prompt() -> str:
     return "\n".join(lines)
 
 
-def _normalize(text: str) -> str:
-    return text.strip().lower().replace("-", "_").replace(" ", "_")
+def _matched_result(entry: Dict[str, object]) -> Dict[str, object]:
+    bbox = entry["bbox"]
+    center = {
+        "lon": (bbox[0] + bbox[2]) / 2,  # type: ignore[index]
+        "lat": (bbox[1] + bbox[3]) / 2,  # type: ignore[index]
+    }
+    return {
+        "matched": True,
+        "aoi_id": entry["id"],
+        "bbox": bbox,
+        "center": center,
+        "note": entry.get("note"),
+        "default_cloud_cover": entry.get("default_cloud_cover"),
+        "message": "Matched known AOI.",
+    }
+
+
+def _unmatched_result(candidates: Optional[List[Dict[str, object]]] = None) -> Dict[str, object]:
+    message = "No matching known AOI. Ask the user for bbox or coordinates, or propose a rough center coordinate and get consent."
+    if candidates:
+        message += " Similar known AOIs are listed in 'candidates'; you may offer them to the user."
+    return {
+        "matched": False,
+        "aoi_id": None,
+        "bbox": None,
+        "center": None,
+        "note": None,
+        "default_cloud_cover": None,
+        "message": message,
+        "candidates": candidates or [],
+    }
+
+
+def _resolve(location_hint: str) -> Dict[str, object]:
+    entry = ALIAS_INDEX.get(_normalize(location_hint))
+    if entry is not None:
+        return _matched_result(entry)
+
+    entry, candidates = best_match(
+        fuzzy_index(), location_hint, FUZZY_MATCH_THRESHOLD, FUZZY_CANDIDATE_MIN_SCORE
+    )
+    if entry is not None:
+        alias, score = candidates[0][1], candidates[0][2]
+        result = _matched_result(entry)
+        result["message"] = f"Matched known AOI by fuzzy match on alias '{alias}' (score {score})."
+        return result
+    return _unmatched_result(
+        [{"aoi_id": e["id"], "alias": alias, "score": score} for e, alias, score in candidates]
+    )
 
 
 def resolve_aoi(location_hint: str) -> Dict[str, object]:
@@ -60,33 +257,20 @@ def resolve_aoi(location_hint: str) -> Dict[str, object]:
             note (str | None)
             default_cloud_cover (float | None)
             message (str)
+            candidates (list, only when unmatched) -> closest AOIs as
+                {"aoi_id", "alias", "score"} to offer in a clarification
+
+    Exact alias matches are tried first. Otherwise the hint is fuzzy-matched
+    (typos, Japanese variants) and accepted if the best score reaches
+    ``FUZZY_MATCH_THRESHOLD`` and the hint and alias agree word by word
+    (a changed qualifier such as "western" vs "eastern", or a dropped word,
+    only yields candidates).
     """
-    norm = _normalize(location_hint)
-    for entry in AOI_CATALOG:
-        aliases = [entry["id"]] + entry.get("aliases", [])  # type: ignore[list-item]
-        aliases_norm = [_normalize(a) for a in aliases]
-        if norm in aliases_norm:
-            bbox = entry["bbox"]
-            center = {
-                "lon": (bbox[0] + bbox[2]) / 2,
-                "lat": (bbox[1] + bbox[3]) / 2,
-            }
-            return {
-                "matched": True,
-                "aoi_id": entry["id"],
-                "bbox": bbox,
-                "center": center,
-                "note": entry.get("note"),
-                "default_cloud_cover": entry.get("default_cloud_cover"),
-                "message": "Matched known AOI.",
-            }
+    return _resolve(location_hint)
 
-    return {
-        "matched": False,
-        "aoi_id": None,
-        "bbox": None,
-        "center": None,
-        "note": None,
-        "default_cloud_cover": None,
-        "message": "No matching known AOI. Ask the user for bbox or coordinates, or propose a rough center coordinate and get consent.",
-    }
+
+def resolve_aois(location_hints: Iterable[str]) -> List[Dict[str, object]]:
+    """
+    Resolve many location hints at once (same result format as ``resolve_aoi``).
+    """
+    return [_resolve(hint) for hint in location_hints]
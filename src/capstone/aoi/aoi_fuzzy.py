@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 旧字体・異体字 -> 常用字体（地名で出やすいものだけ）
+_KANJI_VARIANTS = str.maketrans({
+    "澤": "沢", "濱": "浜", "邊": "辺", "邉": "辺", "嶋": "島", "嶌": "島",
+    "髙": "高", "﨑": "崎", "廣": "広", "國": "国", "龍": "竜",
+    "櫻": "桜", "鐵": "鉄", "驛": "駅", "縣": "県", "會": "会", "檜": "桧",
+    "ヶ": "が", "ヵ": "か",  # 関ヶ原・霞ヶ関などは「が」と読む
+})
+
+# 行政区分や「周辺」などの接尾辞。付いていてもいなくても同じ場所を指す
+_JA_SUFFIXES = ("地方", "地域", "周辺", "えりあ", "都", "府", "県", "市", "区", "町", "村")
+
+# 英語・ローマ字の埋め草語。"Eastern Hokkaido region" と "eastern hokkaido"、
+# "Osaka-fu" と "osaka" を同一視する
+_FILLER_WORDS = frozenset({
+    "the", "of", "area", "region", "around", "near", "vicinity",
+    "city", "prefecture", "pref", "metropolis", "metropolitan", "district",
+    "to", "fu", "ken", "shi",
+})
+
+_SEPARATORS = re.compile(r"[\s_\-・,./]+")
+
+# 場所を限定する修飾語。エイリアス側に同じ語がない限り、曖昧一致で自動採用しない
+# （"western hokkaido" を hokkaido_east に寄せない）
+_QUALIFIERS = frozenset({
+    "north", "northern", "south", "southern", "east", "eastern", "west", "western",
+    "central", "northeast", "northeastern", "northwest", "northwestern",
+    "southeast", "southeastern", "southwest", "southwestern", "coastal", "inland", "outer",
+    "upper", "lower",
+})
+# 語単位で「同じ語（綴り違い含む）」とみなす n-gram の Dice 係数の下限（"hokaido" ~ "hokkaido" は 0.8）
+_TOKEN_MATCH_SCORE = 0.6
+
+# 候補生成で読む posting の合計上限。珍しい n-gram から順に読み、超えたら打ち切る
+_CANDIDATE_BUDGET = 1500
+_MAX_CANDIDATES = 32
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return (
+        0x3040 <= code <= 0x30FF  # ひらがな・カタカナ
+        or 0x3400 <= code <= 0x9FFF  # CJK 統合漢字
+        or 0xF900 <= code <= 0xFAFF
+    )
+
+
+def fold(text: str) -> str:
+    """
+    Normalize text for fuzzy matching.
+
+    NFKC (full-width -> half-width), lower-casing, katakana -> hiragana,
+    common kanji variants -> standard forms, Japanese administrative suffixes
+    (都/府/県/市/...) and English filler words ("region", "area", ...) removed.
+    """
+    text = unicodedata.normalize("NFKC", text).lower().translate(_KANJI_VARIANTS)
+    # カタカナをひらがなに寄せる（長音記号などは対象外）
+    text = "".join(
+        chr(ord(ch) - 0x60) if "ァ" <= ch <= "ヶ" else ch for ch in text
+    )
+    words = [w for w in _SEPARATORS.split(text) if w and w not in _FILLER_WORDS]
+    folded = []
+    for word in words:
+        for suffix in _JA_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                word = word[: -len(suffix)]
+                break
+        folded.append(word)
+    return " ".join(folded)
+
+
+def ngrams(folded: str) -> frozenset[str]:
+    """
+    Character n-grams of a folded string.
+
+    Latin text uses space-padded trigrams; text containing kana/kanji uses
+    bigrams, which suit short Japanese place names better.
+    """
+    if not folded:
+        return frozenset()
+    n = 2 if any(_is_cjk(ch) for ch in folded) else 3
+    padded = f" {folded} "
+    if len(padded) <= n:
+        return frozenset({padded})
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+
+class NgramIndex:
+    """
+    Inverted n-gram index over AOI aliases for ranked fuzzy lookup.
+
+    Built once from a catalog; queries score candidate aliases by the Dice
+    coefficient of their n-gram sets, which is symmetric, so extra words in
+    the hint ("northern Japan" vs "japan") lower the score instead of being
+    ignored.
+    """
+
+    def __init__(self, catalog: Iterable[Dict[str, object]]):
+        self._entries: List[Dict[str, object]] = []
+        self._aliases: List[str] = []
+        self._alias_entry: array = array("I")
+        self._alias_grams: List[frozenset[str]] = []
+        self._exact: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = {}
+
+        for entry in catalog:
+            entry_no = len(self._entries)
+            self._entries.append(entry)
+            names = [str(entry["id"]).replace("_", " ")] + list(entry.get("aliases", []))  # type: ignore[operator]
+            for name in names:
+                folded = fold(name)
+                if not folded or folded in self._exact:
+                    continue
+                alias_no = len(self._aliases)
+                grams = ngrams(folded)
+                self._aliases.append(name)
+                self._alias_entry.append(entry_no)
+                self._alias_grams.append(grams)
+                self._exact[folded] = alias_no
+                for gram in grams:
+                    postings.setdefault(gram, []).append(alias_no)
+
+        self._postings: Dict[str, array] = {g: array("I", ids) for g, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._aliases)
+
+    def search(
+        self, hint: str, top_k: int = 5, min_score: float = 0.0
+    ) -> List[Tuple[Dict[str, object], str, float]]:
+        """
+        Return up to ``top_k`` (entry, matched alias, score) tuples, best first.
+
+        Scores are in [0, 1]; 1.0 means the folded hint equals a folded alias.
+        Each AOI appears at most once (with its best-scoring alias).
+        """
+        folded = fold(hint)
+        if not folded:
+            return []
+
+        exact = self._exact.get(folded)
+        scored: Dict[int, Tuple[float, int]] = {}
+        if exact is not None:
+            scored[self._alias_entry[exact]] = (1.0, exact)
+
+        qgrams = ngrams(folded)
+        postings = sorted(
+            (plist for plist in map(self._postings.get, qgrams) if plist is not None),
+            key=len,
+        )
+        counts: Counter = Counter()
+        used = 0
+        # 珍しい n-gram から候補を集める。頻出 n-gram は候補を増やすだけで順位にほぼ効かない
+        for plist in postings:
+            if used and used + len(plist) > _CANDIDATE_BUDGET:
+                break
+            counts.update(plist)
+            used += len(plist)
+
+        for alias_no, _ in counts.most_common(_MAX_CANDIDATES):
+            grams = self._alias_grams[alias_no]
+            score = 2 * len(qgrams & grams) / (len(qgrams) + len(grams))
+            entry_no = self._alias_entry[alias_no]
+            if score > scored.get(entry_no, (0.0, -1))[0]:
+                scored[entry_no] = (score, alias_no)
+
+        best = sorted(
+            (kv for kv in scored.items() if kv[1][0] >= min_score),
+            key=lambda kv: -kv[1][0],
+        )[:top_k]
+        return [
+            (self._entries[entry_no], self._aliases[alias_no], round(score, 4))
+            for entry_no, (score, alias_no) in best
+        ]
+
+
+def _token_score(a: str, b: str) -> float:
+    ga, gb = ngrams(a), ngrams(b)
+    return 2 * len(ga & gb) / (len(ga) + len(gb))
+
+
+def tokens_agree(hint: str, alias: str) -> bool:
+    """
+    True if every word of ``hint`` has a counterpart in ``alias`` and vice versa.
+
+    Words may differ by typos (n-gram similarity), but place qualifiers
+    ("western", "northern", ...) must appear verbatim on both sides. Used to
+    refuse auto-accepting a high overall score that hides a changed or
+    dropped word ("western hokkaido" vs "eastern hokkaido", "japan cloud" vs
+    "japan cloud free focused").
+    """
+    hint_words, alias_words = fold(hint).split(), fold(alias).split()
+    if {w for w in hint_words if w in _QUALIFIERS} != {w for w in alias_words if w in _QUALIFIERS}:
+        return False
+
+    def covered(words: List[str], others: List[str]) -> bool:
+        return all(
+            any(_token_score(w, o) >= _TOKEN_MATCH_SCORE for o in others if o not in _QUALIFIERS)
+            for w in words
+            if w not in _QUALIFIERS
+        )
+
+    return covered(hint_words, alias_words) and covered(alias_words, hint_words)
+
+
+def best_match(
+    index: NgramIndex, hint: str, threshold: float, min_score: float = 0.0
+) -> Tuple[Optional[Dict[str, object]], List[Tuple[Dict[str, object], str, float]]]:
+    """
+    Return (entry, candidates): entry is the top candidate if it clears ``threshold``.
+
+    The top candidate is only accepted if its alias and the hint agree word
+    by word (see ``tokens_agree``); otherwise entry is None and the caller
+    offers the candidates instead. Candidates scoring below ``min_score``
+    are dropped.
+    """
+    candidates = index.search(hint, min_score=min_score)
+    if candidates and candidates[0][2] >= threshold and tokens_agree(hint, candidates[0][1]):
+        return candidates[0][0], candidates
+    return None, candidates
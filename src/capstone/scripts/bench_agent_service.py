@@ -0,0 +1,80 @@
+# src/capstone/scripts/bench_agent_service.py
+
+"""
+Benchmark: per-query agent/runner construction vs the shared AgentService.
+
+Uses ``StubLlm`` so only agent, runner and session overhead is measured
+(plus an optional simulated model latency for the concurrent batch).
+
+Usage:
+    python -m capstone.scripts.bench_agent_service --queries 200 --batch 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from capstone.agent.agent_service import AgentService
+from capstone.agent.stac_agent_adk import APP_NAME, create_agent
+from capstone.scripts.stub_llm import StubLlm
+
+
+async def _per_query_construction(query: str, model: StubLlm) -> None:
+    # 旧 call_agent と同じ手順: 毎回 Agent / SessionService / Runner を作り直す
+    agent = create_agent(model=model)
+    session_service = InMemorySessionService()
+    await session_service.create_session(app_name=APP_NAME, user_id="bench_user", session_id="bench")
+    runner = Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    async for _ in runner.run_async(user_id="bench_user", session_id="bench", new_message=content):
+        pass
+
+
+async def _bench(args) -> None:
+    model = StubLlm()
+
+    t0 = time.perf_counter()
+    service = AgentService(create_agent(model=model), APP_NAME, max_concurrency=args.concurrency)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    for i in range(args.queries):
+        await _per_query_construction(f"query {i}", model)
+    old_ms = (time.perf_counter() - t0) * 1000 / args.queries
+
+    t0 = time.perf_counter()
+    for i in range(args.queries):
+        await service.ask(f"query {i}", "bench_user")
+    new_ms = (time.perf_counter() - t0) * 1000 / args.queries
+
+    model.latency = args.latency
+    t0 = time.perf_counter()
+    await service.ask_many([f"query {i}" for i in range(args.batch)], "bench_user")
+    batch_s = time.perf_counter() - t0
+
+    print(f"cold start (agent + runner)     : {cold_ms:8.1f} ms")
+    print(f"per query, rebuild every time   : {old_ms:8.2f} ms")
+    print(f"per query, shared AgentService  : {new_ms:8.2f} ms")
+    print(
+        f"batch of {args.batch} at {args.latency * 1000:.0f} ms model latency,"
+        f" max_concurrency={args.concurrency}: {batch_s:6.2f} s"
+        f" (sequential would be {args.batch * args.latency:.1f} s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(_bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# src/capstone/scripts/bench_aoi_index.py
+
+"""
+Benchmark: linear alias scan (old resolve_aoi) vs the precomputed alias index,
+plus the fuzzy n-gram index on misspelled hints.
+
+Usage:
+    python -m capstone.scripts.bench_aoi_index --sizes 10 10000 100000
+"""
+
+import argparse
+import random
+import time
+
+from capstone.aoi.aoi_catalog import _normalize, build_alias_index
+from capstone.aoi.aoi_fuzzy import NgramIndex
+from capstone.scripts.synthetic import make_aoi_catalog
+
+
+ALIASES_PER_ENTRY = 5
+
+
+def _linear_lookup(catalog: list[dict], hint: str):
+    # 旧 resolve_aoi と同じ手順（毎回すべての別名を正規化して走査する）
+    norm = _normalize(hint)
+    for entry in catalog:
+        aliases = [entry["id"]] + entry.get("aliases", [])
+        if norm in [_normalize(a) for a in aliases]:
+            return entry
+    return None
+
+
+def _misspell(rng: random.Random, text: str) -> str:
+    # 1 文字削除して綴り間違いを作る
+    i = rng.randrange(len(text))
+    return text[:i] + text[i + 1:]
+
+
+def _per_call_us(fn, hints: list[str]) -> float:
+    t0 = time.perf_counter()
+    for hint in hints:
+        fn(hint)
+    return (time.perf_counter() - t0) / len(hints) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 10_000, 100_000],
+                        help="catalog sizes in number of aliases")
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'aliases':>8} {'build ms':>9} {'linear us/lookup':>17} {'index us/lookup':>16}"
+        f" {'fuzzy build ms':>15} {'fuzzy us/lookup':>16}"
+    )
+    for n_aliases in args.sizes:
+        catalog = make_aoi_catalog(max(1, n_aliases // ALIASES_PER_ENTRY), ALIASES_PER_ENTRY)
+        all_aliases = [a for e in catalog for a in e["aliases"]]
+        hints = [rng.choice(all_aliases).upper() for _ in range(args.lookups)]
+
+        t0 = time.perf_counter()
+        index = build_alias_index(catalog)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        # 線形走査は大きなカタログで遅すぎるので件数を絞る
+        linear_hints = hints[: max(5, min(len(hints), 2_000_000 // max(1, n_aliases)))]
+        linear = _per_call_us(lambda h: _linear_lookup(catalog, h), linear_hints)
+        indexed = _per_call_us(lambda h: index.get(_normalize(h)), hints)
+
+        t0 = time.perf_counter()
+        fuzzy = NgramIndex(catalog)
+        fuzzy_build_ms = (time.perf_counter() - t0) * 1000
+        typo_hints = [_misspell(rng, h) for h in hints[:2000]]
+        fuzzy_us = _per_call_us(lambda h: fuzzy.search(h, top_k=5), typo_hints)
+
+        print(
+            f"{n_aliases:>8} {build_ms:>9.2f} {linear:>17.1f} {indexed:>16.2f}"
+            f" {fuzzy_build_ms:>15.1f} {fuzzy_us:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# src/capstone/scripts/bench_aoi_polygon.py
+
+"""
+Measure bbox vs polygon searches for catalog AOIs that carry a polygon.
+
+For each such AOI the stub server scatters item footprints over the AOI's
+bbox and honours ``bbox`` / ``intersects``. The script compares a plain bbox
+search with the polygon search used by ``search_satellite_scenes``: scenes
+returned, response bytes and a rough LLM token count for the rows.
+
+Usage:
+    python -m capstone.scripts.bench_aoi_polygon --items 2000
+"""
+
+import argparse
+import json
+
+from shapely.geometry import box, shape
+
+from capstone.aoi.aoi_catalog import AOI_CATALOG
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_search import iter_satellite_scenes, search_satellite_scenes
+
+
+DATETIME_RANGE = "2023-01-01T00:00:00Z/2023-12-31T23:59:59Z"
+
+
+def _tokens(rows: list[dict]) -> int:
+    # 英数字主体の JSON はおおよそ 4 文字で 1 トークン
+    return len(json.dumps(rows)) // 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=2000)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    print(
+        f"{'aoi':<26} {'area %':>7} {'bbox scenes':>12} {'poly scenes':>12}"
+        f" {'bbox KB':>8} {'poly KB':>8} {'bbox tok':>9} {'poly tok':>9}"
+    )
+    for entry in AOI_CATALOG:
+        if not entry.get("geometry"):
+            continue
+        bbox = entry["bbox"]
+        area_pct = 100 * shape(entry["geometry"]).area / box(*bbox).area
+
+        with StubStacServer(n_items=args.items, spatial_filter=True, bbox=bbox) as server:
+            stac_client.set_default_client(stac_client.StacClient(base_url=server.url))
+
+            before = server.bytes_sent
+            bbox_rows = list(iter_satellite_scenes(bbox, DATETIME_RANGE, 100.0))
+            bbox_bytes = server.bytes_sent - before
+
+            before = server.bytes_sent
+            poly_rows = search_satellite_scenes(bbox, DATETIME_RANGE, 100.0, limit=args.items)
+            poly_bytes = server.bytes_sent - before
+        stac_client.set_default_client(None)
+
+        print(
+            f"{entry['id']:<26} {area_pct:>7.1f} {len(bbox_rows):>12} {len(poly_rows):>12}"
+            f" {bbox_bytes / 1024:>8.1f} {poly_bytes / 1024:>8.1f}"
+            f" {_tokens(bbox_rows):>9} {_tokens(poly_rows):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
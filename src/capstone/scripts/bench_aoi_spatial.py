@@ -0,0 +1,65 @@
+# src/capstone/scripts/bench_aoi_spatial.py
+
+"""
+Benchmark: STRtree spatial index vs a linear bbox scan over the AOI catalog.
+
+Usage:
+    python -m capstone.scripts.bench_aoi_spatial --sizes 12 10000 100000
+"""
+
+import argparse
+import random
+import time
+
+from capstone.aoi.aoi_spatial import AoiSpatialIndex
+from capstone.scripts.synthetic import make_aoi_catalog
+
+
+def _linear_containing(catalog: list[dict], lon: float, lat: float) -> list[dict]:
+    hits = [e for e in catalog if e["bbox"][0] <= lon <= e["bbox"][2] and e["bbox"][1] <= lat <= e["bbox"][3]]
+    return sorted(hits, key=lambda e: (e["bbox"][2] - e["bbox"][0]) * (e["bbox"][3] - e["bbox"][1]))
+
+
+def _per_call_us(fn, args: list[tuple]) -> float:
+    t0 = time.perf_counter()
+    for a in args:
+        fn(*a)
+    return (time.perf_counter() - t0) / len(args) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 10_000, 100_000],
+                        help="catalog sizes in number of polygons")
+    parser.add_argument("--queries", type=int, default=5_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'polygons':>9} {'build ms':>9} {'linear us':>10} {'containing us':>14}"
+        f" {'intersecting us':>16} {'enclosing us':>13}"
+    )
+    for n in args.sizes:
+        catalog = make_aoi_catalog(n, aliases_per_entry=1)
+        points = [(rng.uniform(129.0, 145.0), rng.uniform(31.0, 45.0)) for _ in range(args.queries)]
+        boxes = [([lon, lat, lon + 0.5, lat + 0.5],) for lon, lat in points]
+
+        t0 = time.perf_counter()
+        index = AoiSpatialIndex(catalog)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        # 線形走査は大きなカタログで遅すぎるので件数を絞る
+        linear_points = points[: max(5, min(len(points), 5_000_000 // n))]
+        linear = _per_call_us(lambda lon, lat: _linear_containing(catalog, lon, lat), linear_points)
+        containing = _per_call_us(index.aois_containing, points)
+        intersecting = _per_call_us(index.aois_intersecting, boxes)
+        enclosing = _per_call_us(index.smallest_enclosing_aoi, points)
+
+        print(
+            f"{n:>9} {build_ms:>9.1f} {linear:>10.1f} {containing:>14.1f}"
+            f" {intersecting:>16.1f} {enclosing:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
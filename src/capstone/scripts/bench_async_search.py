@@ -0,0 +1,74 @@
+# src/capstone/scripts/bench_async_search.py
+
+"""
+Load test: N concurrent sessions calling the search tool on one event loop.
+
+Compares the blocking ``search_satellite_scenes`` (called from coroutines,
+as the ADK runner did before) with the native async tool registered on the
+agent. The stub server adds a fixed latency per search, so with the async
+tool N sessions should finish in roughly the time of one search.
+
+Usage:
+    python -m capstone.scripts.bench_async_search --sessions 20 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+SEARCH_ARGS = dict(
+    bbox=[143.0, 42.5, 146.0, 45.5],
+    datetime_range="2023-06-01T00:00:00Z/2023-08-31T23:59:59Z",
+    cloud_cover_max=20.0,
+    limit=10,
+)
+
+
+async def _session_sync_tool(i: int) -> int:
+    # 同期ツールをコルーチン内から呼ぶ = イベントループをブロックする
+    return len(search_satellite_scenes(**SEARCH_ARGS, collections=[f"sentinel-2-l2a-{i}"]))
+
+
+async def _session_async_tool(i: int) -> int:
+    rows = await stac_async.search_satellite_scenes_tool(
+        **SEARCH_ARGS, collections=[f"sentinel-2-l2a-{i}"]
+    )
+    return len(rows)
+
+
+async def _run(session_fn, sessions: int) -> float:
+    t0 = time.perf_counter()
+    await asyncio.gather(*(session_fn(i) for i in range(sessions)))
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # 同一クエリがキャッシュに当たらないよう、計測中はキャッシュを切る
+    stac_cache.set_search_cache(None)
+
+    with StubStacServer(n_items=50, latency=args.latency) as server:
+        stac_client.set_default_client(stac_client.StacClient(base_url=server.url))
+        stac_async.configure_default_async_client(base_url=server.url, pool_size=args.sessions)
+
+        sync_wall = asyncio.run(_run(_session_sync_tool, args.sessions))
+        async_wall = asyncio.run(_run(_session_async_tool, args.sessions))
+        stac_client.set_default_client(None)
+
+    print(f"{args.sessions} concurrent sessions, {args.latency * 1000:.0f} ms per search")
+    print(f"blocking tool : {sync_wall:6.3f} s")
+    print(f"async tool    : {async_wall:6.3f} s")
+    print(f"speed-up      : {sync_wall / async_wall:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
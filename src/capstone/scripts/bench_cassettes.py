@@ -0,0 +1,75 @@
+# src/capstone/scripts/bench_cassettes.py
+
+"""
+Benchmark: eval suite wall clock against a slow model, then recording and replaying it from cassettes.
+
+Runs ``run_eval_parallel`` in a subprocess three times over a copy of the
+evalsets: "live" (``capstone.scripts.eval_stub.agent``, StubLlm sleeping
+``--latency`` seconds per call), "record" (same, with CAPSTONE_CASSETTES=record)
+and "replay" (CAPSTONE_CASSETTES=replay; the stub is never called). As in
+``bench_eval_runner`` only locally computed metrics are kept, so no API key
+is needed.
+
+Usage:
+    python -m capstone.scripts.bench_cassettes --num-runs 2 --latency 2.0
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from capstone.agent.llm_cassette import LLM_CASSETTE
+from capstone.scripts.run_eval import EVAL_DIR
+
+
+AGENT_MODULE = "capstone.scripts.eval_stub.agent"
+LOCAL_CRITERIA = {"criteria": {"tool_trajectory_avg_score": 1.0, "response_match_score": 0.5}}
+
+
+def _run(eval_dir: Path, num_runs: int, concurrency: int, env: dict) -> tuple[float, str]:
+    cmd = [
+        sys.executable, "-m", "capstone.scripts.run_eval_parallel",
+        "--agent-module", AGENT_MODULE, "--eval-dir", str(eval_dir),
+        "--num-runs", str(num_runs), "--concurrency", str(concurrency), "--no-cache",
+    ]
+    t0 = time.perf_counter()
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    lines = result.stdout.strip().splitlines()
+    return elapsed, lines[-1] if lines else result.stderr.strip().splitlines()[-1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--num-runs", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        eval_dir = Path(tmp) / "eval"
+        shutil.copytree(EVAL_DIR, eval_dir, ignore=shutil.ignore_patterns("__pycache__", "*.py"))
+        (eval_dir / "test_config.json").write_text(json.dumps(LOCAL_CRITERIA))
+        cassette_dir = Path(tmp) / "cassettes"
+
+        base_env = dict(os.environ, CAPSTONE_STUB_LLM_LATENCY=str(args.latency), PYTHONWARNINGS="ignore")
+        base_env.pop("CAPSTONE_CASSETTES", None)
+        for label, mode in (("live (stub model)", None), ("record", "record"), ("replay", "replay")):
+            env = dict(base_env)
+            if mode is not None:
+                env.update(CAPSTONE_CASSETTES=mode, CAPSTONE_CASSETTE_DIR=str(cassette_dir))
+            elapsed, summary = _run(eval_dir, args.num_runs, args.concurrency, env)
+            print(f"{label:<18} {elapsed:6.1f} s  | {summary}")
+
+        size = (cassette_dir / LLM_CASSETTE).stat().st_size
+        print(f"model cassette: {size / 1024:.1f} KiB ({LLM_CASSETTE})")
+
+
+if __name__ == "__main__":
+    main()
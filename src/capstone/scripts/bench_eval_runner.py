@@ -0,0 +1,90 @@
+# src/capstone/scripts/bench_eval_runner.py
+
+"""
+Benchmark: the sequential ``run_eval`` flow vs ``run_eval_parallel`` (cold, warm, one case edited).
+
+Runs offline: the agent is ``capstone.scripts.eval_stub.agent`` (StubLlm
+with ``--latency`` seconds per model call) and the eval config keeps only
+the locally computed metrics (tool trajectory and response match), so no
+API key is needed. Pass/fail is irrelevant here; wall clock is compared.
+
+Usage:
+    python -m capstone.scripts.bench_eval_runner --num-runs 2 --concurrency 8 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+from capstone.scripts import run_eval_parallel
+from capstone.scripts.run_eval import EVAL_DIR
+
+
+AGENT_MODULE = "capstone.scripts.eval_stub.agent"
+LOCAL_CRITERIA = {"criteria": {"tool_trajectory_avg_score": 1.0, "response_match_score": 0.5}}
+
+
+async def _sequential(eval_dir: Path, num_runs: int) -> None:
+    # run_eval と同じく、evalset ファイルを 1 つずつ AgentEvaluator に渡す
+    from google.adk.evaluation.agent_evaluator import AgentEvaluator
+    from google.adk.evaluation.eval_set import EvalSet
+
+    for path in sorted(eval_dir.glob("*.evalset.json")):
+        try:
+            await AgentEvaluator.evaluate_eval_set(
+                agent_module=AGENT_MODULE,
+                eval_set=EvalSet.model_validate_json(path.read_text(encoding="utf-8")),
+                eval_config=AgentEvaluator.find_config_for_test_file(str(path)),
+                num_runs=num_runs,
+                print_detailed_results=False,
+            )
+        except AssertionError:
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--num-runs", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    os.environ["CAPSTONE_STUB_LLM_LATENCY"] = str(args.latency)
+    warnings.filterwarnings("ignore")
+    with tempfile.TemporaryDirectory() as tmp:
+        eval_dir = Path(tmp) / "eval"
+        shutil.copytree(EVAL_DIR, eval_dir, ignore=shutil.ignore_patterns("__pycache__", "*.py"))
+        (eval_dir / "test_config.json").write_text(json.dumps(LOCAL_CRITERIA))
+        cache = run_eval_parallel.EvalResultCache(Path(tmp) / "cache.sqlite")
+
+        t0 = time.perf_counter()
+        asyncio.run(_sequential(eval_dir, args.num_runs))
+        print(f"sequential (run_eval flow):     {time.perf_counter() - t0:6.1f} s")
+
+        def parallel(label: str) -> None:
+            jobs = run_eval_parallel.load_jobs(eval_dir, args.num_runs, AGENT_MODULE)
+            t0 = time.perf_counter()
+            outcomes = run_eval_parallel.run_evaluation(jobs, AGENT_MODULE, args.concurrency, cache=cache)
+            ran = sum(not o.cached for o in outcomes)
+            print(f"{label:<31} {time.perf_counter() - t0:6.1f} s ({ran}/{len(jobs)} jobs run)")
+
+        parallel("parallel, cold cache:")
+        parallel("parallel, warm cache:")
+
+        # 1 ケースだけ書き換えると、そのケースのジョブだけが再実行される
+        path = eval_dir / "normal.evalset.json"
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["eval_cases"][0]["conversation"][0]["final_response"]["parts"][0]["text"] += " "
+        path.write_text(json.dumps(data))
+        parallel("parallel, one case edited:")
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
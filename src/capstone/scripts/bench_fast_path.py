@@ -0,0 +1,109 @@
+# src/capstone/scripts/bench_fast_path.py
+
+"""
+Benchmark: deterministic fast path vs the LLM tool-calling loop on an evalset.
+
+For every query in the evalset the script reports whether the fast path
+takes it, whether its tool arguments match the recorded tool trajectory,
+and the end-to-end latency against the stub STAC server. The LLM path is
+estimated from the same tool time plus one model round-trip per recorded
+tool call and one for the final answer (``--llm-latency`` seconds each).
+
+Usage:
+    python -m capstone.scripts.bench_fast_path --llm-latency 1.2 --stac-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from capstone.aoi.aoi_catalog import resolve_aoi
+from capstone.agent.fast_path import parse_structured_query, run_fast_path_async
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache
+
+
+EVAL_DIR = Path(__file__).resolve().parent / "eval"
+
+
+def _cases(evalset: Path) -> list[tuple[str, list[dict]]]:
+    data = json.loads(evalset.read_text(encoding="utf-8"))
+    cases = []
+    for case in data["eval_cases"]:
+        for inv in case["conversation"]:
+            query = "".join(p.get("text", "") for p in inv["user_content"]["parts"]).strip()
+            calls = [
+                part["function_call"]
+                for event in inv.get("intermediate_data", {}).get("invocation_events", [])
+                for part in event["content"]["parts"]
+                if part.get("function_call")
+            ]
+            cases.append((query, calls))
+    return cases
+
+
+def _args_match(query: str, calls: list[dict]) -> bool:
+    plan = parse_structured_query(query)
+    expected = {c["name"]: c["args"] for c in calls}
+    search = expected.get("search_satellite_scenes")
+    if plan is None or search is None:
+        return False
+    return (
+        resolve_aoi(expected.get("resolve_aoi", {}).get("location_hint", ""))["aoi_id"] == plan.aoi_id
+        and search.get("bbox") == plan.bbox
+        and search.get("datetime_range") == plan.datetime_range
+        and float(search.get("cloud_cover_max")) == plan.cloud_cover_max
+        and search.get("limit", 5) == plan.limit
+    )
+
+
+async def _bench(args) -> None:
+    cases = _cases(args.evalset)
+    taken = matched = 0
+    fast_total = llm_total = 0.0
+    print(f"{'fast':>4} {'args':>4} {'fast ms':>8} {'llm ms':>8}  query")
+    for query, calls in cases:
+        t0 = time.perf_counter()
+        answer = await run_fast_path_async(query)
+        elapsed = time.perf_counter() - t0
+        # LLM 経路: 同じツール時間 + ツール呼び出しごとと最終回答の往復
+        llm = elapsed + (len(calls) + 1) * args.llm_latency
+        ok = _args_match(query, calls)
+        if answer is not None:
+            taken += 1
+            matched += ok
+            fast_total += elapsed
+            llm_total += llm
+        print(
+            f"{'yes' if answer else 'no':>4} {'ok' if ok else '-':>4}"
+            f" {elapsed * 1000 if answer else 0:>8.1f} {llm * 1000 if answer else 0:>8.1f}  {query[:60]}"
+        )
+    print(f"\ncoverage: {taken}/{len(cases)} queries, trajectory match: {matched}/{taken}")
+    if taken:
+        print(
+            f"mean latency on fast-path queries: {fast_total / taken * 1000:.1f} ms"
+            f" vs ~{llm_total / taken * 1000:.1f} ms via the LLM"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--evalset", type=Path, default=EVAL_DIR / "normal.evalset.json")
+    parser.add_argument("--llm-latency", type=float, default=1.2)
+    parser.add_argument("--stac-latency", type=float, default=0.2)
+    parser.add_argument("--items", type=int, default=200)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    with StubStacServer(n_items=args.items, latency=args.stac_latency) as server:
+        stac_async.configure_default_async_client(base_url=server.url)
+        try:
+            asyncio.run(_bench(args))
+        finally:
+            stac_async.configure_default_async_client()
+
+
+if __name__ == "__main__":
+    main()
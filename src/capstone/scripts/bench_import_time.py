@@ -0,0 +1,191 @@
+# src/capstone/scripts/bench_import_time.py
+
+"""
+Benchmark: cold-start import time of the capstone entry modules against a target budget.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+(``--repeat`` times after one warm-up run that writes the .pyc files). The
+reported time is the median cumulative time of everything the ``import``
+statement loaded beyond what a bare interpreter already has. The report
+also lists the slowest modules by self time and any "heavy" dependency
+(ADK, genai, pandas, httpx, shapely, numpy) that the import dragged in.
+
+A module fails when its median exceeds its budget in ``IMPORT_BUDGETS_MS``
+or when it loads a heavy dependency it must not (``FORBIDDEN_IMPORTS``);
+the exit status is 1 if any module fails. Budgets are wall-clock
+milliseconds with generous headroom for slow CI runners; the
+heavy-dependency check is the machine-independent part.
+``--profile-dir`` keeps the raw ``-X importtime`` output per module
+(readable by tools such as ``tuna``).
+
+Usage:
+    python -m capstone.scripts.bench_import_time --repeat 5
+    python -m capstone.scripts.bench_import_time --modules capstone.tools --top 15 --output import_time.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+# モジュール -> 目標予算 (ms)。今の実測値の数倍に取ってある（遅い CI でも誤検知しない程度）
+IMPORT_BUDGETS_MS = {
+    "capstone.tools": 25.0,
+    "capstone.aoi.aoi_catalog": 40.0,
+    "capstone.agent.prompts": 40.0,
+    "capstone.agent.stac_agent_adk": 150.0,  # asyncio（標準ライブラリ）だけで 40 ms ほど
+    "capstone.scripts.eval.agent": 25.0,
+}
+
+HEAVY_MODULES = ("google.adk", "google.genai", "pandas", "httpx", "shapely", "numpy")
+
+# import しただけで読み込んではいけない重い依存（エージェントやツールを使うときに初めて読む）
+FORBIDDEN_IMPORTS = {module: HEAVY_MODULES for module in IMPORT_BUDGETS_MS}
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ImportEntry:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_ms: float
+    entries: list[ImportEntry] = field(default_factory=list)
+
+    def heavy_modules(self) -> list[str]:
+        names = {e.name for e in self.entries}
+        return [h for h in HEAVY_MODULES if any(n == h or n.startswith(h + ".") for n in names)]
+
+    def slowest(self, top: int) -> list[ImportEntry]:
+        return sorted(self.entries, key=lambda e: e.self_us, reverse=True)[:top]
+
+
+def parse_importtime(stderr: str) -> list[ImportEntry]:
+    """
+    Parse ``-X importtime`` lines (``import time: self [us] | cumulative | imported package``).
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # 見出し行
+        # 名前の前の空白 2 つが入れ子 1 段に当たる
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append(ImportEntry(name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def _run_importtime(code: str, python: str) -> str:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")])))
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", code], env=env, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{code!r} failed:\n{result.stderr.strip()[-2000:]}")
+    return result.stderr
+
+
+def profile_import(module: str, python: str = sys.executable, baseline: Optional[set[str]] = None) -> ImportProfile:
+    """
+    Import ``module`` in a fresh interpreter and profile what that import loaded.
+
+    ``baseline`` is the set of modules a bare interpreter imports at startup
+    (computed when not given); those lines are excluded from the profile.
+    """
+    if baseline is None:
+        baseline = {e.name for e in parse_importtime(_run_importtime("pass", python))}
+    raw = _run_importtime(f"import {module}", python)
+    # 起動時に読まれたものを除くと、残りの最上位の行の合計が import 文 1 つの時間になる
+    entries = [e for e in parse_importtime(raw) if e.name not in baseline]
+    total_us = sum(e.cumulative_us for e in entries if e.depth == 0)
+    return ImportProfile(module, total_us / 1000, entries)
+
+
+def measure(modules: Iterable[str], repeat: int, python: str = sys.executable) -> dict[str, list[ImportProfile]]:
+    """
+    Profile each module ``repeat`` times (after one discarded warm-up import).
+    """
+    baseline = {e.name for e in parse_importtime(_run_importtime("pass", python))}
+    profiles = {}
+    for module in modules:
+        profile_import(module, python, baseline)  # .pyc の生成やディスクキャッシュの影響を外す
+        profiles[module] = [profile_import(module, python, baseline) for _ in range(repeat)]
+    return profiles
+
+
+def check(module: str, median_ms: float, heavy: list[str]) -> list[str]:
+    """
+    Return the budget / forbidden-import violations for one module (empty if it passes).
+    """
+    problems = []
+    budget = IMPORT_BUDGETS_MS.get(module)
+    if budget is not None and median_ms > budget:
+        problems.append(f"{median_ms:.1f} ms exceeds the {budget:.0f} ms budget")
+    leaked = [h for h in heavy if h in FORBIDDEN_IMPORTS.get(module, ())]
+    if leaked:
+        problems.append(f"loads {', '.join(leaked)} at import")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=list(IMPORT_BUDGETS_MS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="slowest modules (self time) listed per import")
+    parser.add_argument("--python", default=sys.executable)
+    parser.add_argument("--profile-dir", type=Path, default=None, help="write the raw -X importtime output here")
+    parser.add_argument("--output", type=Path, default=None, help="also write a JSON report here")
+    args = parser.parse_args()
+
+    profiles = measure(args.modules, args.repeat, args.python)
+    report, failed = [], False
+    for module, runs in profiles.items():
+        median_ms = statistics.median(p.total_ms for p in runs)
+        heavy = runs[-1].heavy_modules()
+        problems = check(module, median_ms, heavy)
+        failed |= bool(problems)
+        budget = IMPORT_BUDGETS_MS.get(module)
+        print(f"{'FAIL' if problems else 'ok':<4} {module:<36} {median_ms:8.1f} ms "
+              f"(budget {f'{budget:.0f} ms' if budget else '-'}; min {min(p.total_ms for p in runs):.1f})")
+        for problem in problems:
+            print(f"     {problem}")
+        for entry in runs[-1].slowest(args.top):
+            print(f"     {entry.self_us / 1000:7.1f} ms self  {entry.name}")
+        if args.profile_dir is not None:
+            args.profile_dir.mkdir(parents=True, exist_ok=True)
+            (args.profile_dir / f"{module}.importtime.txt").write_text(
+                _run_importtime(f"import {module}", args.python), encoding="utf-8"
+            )
+        report.append({
+            "module": module,
+            "median_ms": round(median_ms, 2),
+            "runs_ms": [round(p.total_ms, 2) for p in runs],
+            "budget_ms": budget,
+            "modules_loaded": len(runs[-1].entries),
+            "heavy_modules": heavy,
+            "slowest": [{"name": e.name, "self_ms": round(e.self_us / 1000, 2)} for e in runs[-1].slowest(args.top)],
+            "problems": problems,
+        })
+    if args.output is not None:
+        args.output.write_text(json.dumps({"python": sys.version.split()[0], "imports": report}, indent=2) + "\n",
+                               encoding="utf-8")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
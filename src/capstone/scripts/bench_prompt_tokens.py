@@ -0,0 +1,68 @@
+# src/capstone/scripts/bench_prompt_tokens.py
+
+"""
+Report per-call prompt size for the "inline" and "discover" AOI prompt modes.
+
+The per-call overhead is the system instruction plus the tool declarations
+sent with every LLM request. Tokens are estimated as characters / 4, which
+is close enough for comparing the two modes; pass ``--count-with-gemini``
+to count exactly with the Gemini API (needs credentials).
+
+Usage:
+    python -m capstone.scripts.bench_prompt_tokens --sizes 12 1000 10000
+"""
+
+import argparse
+import json
+
+from google.adk.tools import FunctionTool
+
+from capstone.agent.prompts import ARGUMENT_PLANNING_INSTRUCTIONS, build_system_prompt
+from capstone.aoi.aoi_catalog import AOI_CATALOG, resolve_aoi, search_aois
+from capstone.scripts.synthetic import make_aoi_catalog
+from capstone.tools import search_satellite_scenes_tool
+
+
+def _tool_declarations(tools) -> str:
+    return json.dumps([
+        FunctionTool(t)._get_declaration().model_dump(exclude_none=True) for t in tools
+    ])
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _gemini_tokens(text: str, model: str) -> int:
+    from google import genai
+
+    return genai.Client().models.count_tokens(model=model, contents=text).total_tokens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[12, 1000, 10_000],
+                        help="catalog sizes (the real catalog is used when it has exactly this many entries)")
+    parser.add_argument("--count-with-gemini", metavar="MODEL", default=None)
+    args = parser.parse_args()
+
+    count = (lambda t: _gemini_tokens(t, args.count_with_gemini)) if args.count_with_gemini else _estimate_tokens
+    base_tools = [resolve_aoi, search_satellite_scenes_tool]
+    tools_by_mode = {
+        "inline": _tool_declarations(base_tools),
+        "discover": _tool_declarations(base_tools + [search_aois]),
+    }
+
+    print(f"{'AOIs':>6} {'inline tokens':>14} {'discover tokens':>16} {'saved':>7}")
+    for size in args.sizes:
+        catalog = AOI_CATALOG if size == len(AOI_CATALOG) else make_aoi_catalog(size)
+        totals = {}
+        for mode, declarations in tools_by_mode.items():
+            instruction = build_system_prompt(mode, catalog) + ARGUMENT_PLANNING_INSTRUCTIONS
+            totals[mode] = count(instruction + declarations)
+        saved = 1 - totals["discover"] / totals["inline"]
+        print(f"{size:>6} {totals['inline']:>14,} {totals['discover']:>16,} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# src/capstone/scripts/bench_resilience.py
+
+"""
+Benchmark: agent searches during an upstream outage, with and without the circuit breaker.
+
+The stub server answers every search with a slow 503 (``--latency``
+seconds, ``fault_rate=1.0``). ``--searches`` distinct searches are run one
+after another, as stalled agent turns would. Without a breaker each one
+pays the full retry sequence; with one, searches fail fast once
+``--threshold`` consecutive failures have been seen. A second part shows the
+token bucket capping a burst of concurrent searches at ``--rate`` per second.
+
+Usage:
+    python -m capstone.scripts.bench_resilience --searches 30 --latency 0.3 --rate 10
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client, stac_resilience
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+DATETIME_RANGE = "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+def _search(i: int) -> bool:
+    try:
+        search_satellite_scenes(KNOWN_AOIS["tokyo_area"]["bbox"], DATETIME_RANGE, 10.0 + i * 0.5, limit=5)
+        return True
+    except RuntimeError:
+        return False
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--threshold", type=int, default=5)
+    parser.add_argument("--rate", type=float, default=10.0)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    with StubStacServer(n_items=100, latency=args.latency, fault_rate=1.0) as server:
+        client = stac_client.StacClient(base_url=server.url, max_retries=2, backoff_factor=0.1)
+        stac_client.set_default_client(client)
+        client.search_extensions()
+
+        print(f"outage: {args.searches} searches against a failing endpoint")
+        for label, threshold in (("no breaker", args.searches * 10), ("breaker", args.threshold)):
+            guard = stac_resilience.configure_endpoint(server.url, failure_threshold=threshold, reset_timeout=60.0)
+            before = server.request_count
+            t0 = time.perf_counter()
+            failed = sum(not _search(i) for i in range(args.searches))
+            elapsed = time.perf_counter() - t0
+            print(
+                f"  {label:<11} {elapsed:7.2f} s total, {elapsed * 1000 / args.searches:7.1f} ms/search,"
+                f" {server.request_count - before} upstream requests, {failed} failed,"
+                f" {guard.breaker.stats.rejected} rejected fast"
+            )
+
+        server.fault_rate = 0.0
+        server.latency = 0.0
+        guard = stac_resilience.configure_endpoint(server.url, rate=args.rate, burst=1)
+        n = int(args.rate * 2)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(n) as pool:
+            list(pool.map(_search, range(n)))
+        elapsed = time.perf_counter() - t0
+        print(f"rate limit {args.rate:g}/s: {n} concurrent searches took {elapsed:.2f} s ({n / elapsed:.1f} req/s)")
+
+        stac_resilience.reset_endpoint_guards()
+        stac_client.set_default_client(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# src/capstone/scripts/bench_scene_table.py
+
+"""
+Benchmark: list-of-dict scene rows vs the columnar ``SceneTable``.
+
+Times sort, top-k, a cloud/date filter, markdown rendering and DataFrame
+conversion on synthetic rows, and compares the memory held by each form.
+
+Usage:
+    python -m capstone.scripts.bench_scene_table --rows 100000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from capstone.tools.scene_table import TABLE_HEADER, SceneTable, _cell
+from capstone.tools.stac_search import sort_scenes, top_scenes
+
+
+def _rows(n: int) -> list[dict]:
+    rng = random.Random(0)
+    t0 = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"S2A_54TXN_{i:08d}_0_L2A",
+            "datetime": (t0 + timedelta(seconds=rng.randrange(365 * 86400))).isoformat().replace("+00:00", "Z"),
+            "cloud_cover": rng.random() * 100,
+            "preview_url": f"https://sentinel-cogs.s3.us-west-2.amazonaws.com/{i}/thumbnail.jpg",
+        }
+        for i in range(n)
+    ]
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _list_filter(rows: list[dict]) -> list[dict]:
+    return [
+        r for r in rows
+        if r["cloud_cover"] is not None and r["cloud_cover"] <= 20
+        and "2023-06-01" <= r["datetime"][:10] <= "2023-08-31"
+    ]
+
+
+def _list_markdown(rows: list[dict]) -> str:
+    # 行ごとに同じエスケープ・欠損処理をする素朴な実装
+    return "\n".join([TABLE_HEADER, *(
+        f"| {_cell(r['id'])} | {_cell(r['datetime'])} | {_cell(r['cloud_cover'])} | {_cell(r['preview_url'])} |"
+        for r in rows
+    )])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    rows = _rows(args.rows)
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    table = SceneTable.from_rows(rows)
+    build_ms = (time.perf_counter() - t0) * 1000
+    table_bytes = tracemalloc.get_traced_memory()[0] - list_bytes
+    tracemalloc.stop()
+
+    print(f"{args.rows} rows; SceneTable.from_rows: {build_ms:.1f} ms")
+    # 列側の文字列は行 dict と同じオブジェクトを共有するので、増分は配列分だけ
+    print(f"memory: rows {list_bytes / 2**20:.1f} MB, table on top of rows {table_bytes / 2**20:.1f} MB")
+    print(f"{'operation':<12} {'list ms':>9} {'table ms':>9}")
+    for name, list_op, table_op in [
+        ("sort", lambda: sort_scenes(rows), table.sort),
+        ("top_k", lambda: top_scenes(rows, args.k), lambda: table.top_k(args.k)),
+        ("filter", lambda: _list_filter(rows),
+         lambda: table.filter(max_cloud_cover=20, start="2023-06-01", end="2023-08-31T23:59:59")),
+        ("markdown", lambda: _list_markdown(rows), table.to_markdown),
+        ("dataframe", lambda: pd.DataFrame(rows), table.to_dataframe),
+    ]:
+        print(f"{name:<12} {_time(list_op):>9.1f} {_time(table_op):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# src/capstone/scripts/bench_session_soak.py
+
+"""
+Soak test: memory growth of the session store over many sessions.
+
+Each session gets a few user/model turns appended through the session
+service API (what the Runner does per turn). RSS is sampled as sessions
+accumulate, then resume latency is measured for a warm (cached) session
+and a cold one (evicted, reloaded from SQLite).
+
+Usage:
+    python -m capstone.scripts.bench_session_soak --sessions 20000 --store sqlite
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from capstone.agent.session_store import SqliteSessionService
+
+
+APP = "soak"
+
+
+def _rss_mb() -> float:
+    # Linux の /proc から現在の RSS を読む（ru_maxrss はピークしか返さない）
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _event(author: str, text: str, invocation_id: str) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(
+        author=author,
+        invocation_id=invocation_id,
+        content=types.Content(role=role, parts=[types.Part(text=text)]),
+    )
+
+
+async def _turns(store, session_id: str, turns: int) -> None:
+    session = await store.get_session(app_name=APP, user_id="u", session_id=session_id)
+    if session is None:
+        session = await store.create_session(app_name=APP, user_id="u", session_id=session_id)
+    for t in range(turns):
+        inv = f"{session_id}-{t}"
+        await store.append_event(session, _event("user", f"Find scenes over tokyo in 2023-0{t % 9 + 1} " * 4, inv))
+        await store.append_event(session, _event("agent", "| id | datetime | cloud_cover | preview_url |\n" * 6, inv))
+
+
+async def _soak(args, store) -> None:
+    print(f"{'sessions':>9} {'RSS MB':>8}")
+    for i in range(args.sessions):
+        await _turns(store, f"s{i}", args.turns)
+        if (i + 1) % args.report_every == 0:
+            print(f"{i + 1:>9} {_rss_mb():>8.1f}")
+
+    for label, session_id in (("warm", f"s{args.sessions - 1}"), ("cold", "s0")):
+        t0 = time.perf_counter()
+        await _turns(store, session_id, 1)
+        print(f"resume {label} session: {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20_000)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--store", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--max-cached", type=int, default=1024)
+    parser.add_argument("--report-every", type=int, default=2_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store == "sqlite":
+            store = SqliteSessionService(Path(tmp) / "sessions.db", max_cached_sessions=args.max_cached)
+        else:
+            store = InMemorySessionService()
+        print(f"store={args.store}, {args.turns} turns per session")
+        asyncio.run(_soak(args, store))
+        if args.store == "sqlite":
+            print(f"db size: {(Path(tmp) / 'sessions.db').stat().st_size / 2**20:.1f} MB, stats: {store.stats}")
+            store.close()
+
+
+if __name__ == "__main__":
+    main()
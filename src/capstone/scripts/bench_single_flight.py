@@ -0,0 +1,93 @@
+# src/capstone/scripts/bench_single_flight.py
+
+"""
+Benchmark: a burst of sessions searching the same AOI, with and without request coalescing.
+
+``--sessions`` callers issue one of ``--distinct`` searches at the same
+moment (the "AOI in the news" case), first from a thread pool through
+``StacClient`` and then as coroutines through ``AsyncStacClient``. The
+response cache is disabled so every caller reaches the client; upstream
+requests, calls saved by single-flight and wall time are reported.
+
+Usage:
+    python -m capstone.scripts.bench_single_flight --sessions 50 --distinct 3 --latency 0.3
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+DATETIME_RANGE = "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z"
+CLOUDS = [10.0, 20.0, 30.0, 40.0, 50.0]
+
+
+def _search_args(i: int, distinct: int) -> tuple:
+    return (KNOWN_AOIS["tokyo_area"]["bbox"], DATETIME_RANGE, CLOUDS[i % distinct % len(CLOUDS)])
+
+
+def _run_threads(sessions: int, distinct: int) -> None:
+    barrier = threading.Barrier(sessions)
+
+    def session(i: int) -> int:
+        barrier.wait()
+        return len(search_satellite_scenes(*_search_args(i, distinct), limit=10))
+
+    with ThreadPoolExecutor(sessions) as pool:
+        list(pool.map(session, range(sessions)))
+
+
+async def _run_async(sessions: int, distinct: int):
+    await stac_async.get_default_async_client().search_extensions()
+    await asyncio.gather(*(
+        stac_async.search_satellite_scenes_async(*_search_args(i, distinct), limit=10)
+        for i in range(sessions)
+    ))
+    return stac_async.get_default_async_client().single_flight
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--distinct", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    print(f"{'path':<8} {'coalesce':<9} {'requests':>9} {'saved':>6} {'ms':>8}")
+    with StubStacServer(n_items=200, latency=args.latency) as server:
+        for coalesce in (False, True):
+            client = stac_client.StacClient(base_url=server.url, pool_size=args.sessions, coalesce=coalesce)
+            client.search_extensions()
+            stac_client.set_default_client(client)
+            before = server.request_count
+            t0 = time.perf_counter()
+            _run_threads(args.sessions, args.distinct)
+            elapsed = (time.perf_counter() - t0) * 1000
+            saved = client.single_flight.stats.coalesced if client.single_flight else 0
+            print(f"{'threads':<8} {str(coalesce):<9} {server.request_count - before:>9} {saved:>6} {elapsed:>8.1f}")
+
+        for coalesce in (False, True):
+            stac_async.configure_default_async_client(
+                base_url=server.url, pool_size=args.sessions, coalesce=coalesce
+            )
+            before = server.request_count
+            t0 = time.perf_counter()
+            flight = asyncio.run(_run_async(args.sessions, args.distinct))
+            elapsed = (time.perf_counter() - t0) * 1000
+            saved = flight.stats.coalesced if flight else 0
+            print(f"{'asyncio':<8} {str(coalesce):<9} {server.request_count - before:>9} {saved:>6} {elapsed:>8.1f}")
+
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+
+
+if __name__ == "__main__":
+    main()
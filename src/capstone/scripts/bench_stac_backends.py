@@ -0,0 +1,77 @@
+# src/capstone/scripts/bench_stac_backends.py
+
+"""
+Benchmark: one hard-coded endpoint vs EWMA routing vs routing with hedged requests.
+
+Two stub endpoints serve the same items. Endpoint "a" starts fast and
+degrades halfway through the run (``--degraded`` seconds per search);
+endpoint "b" has a constant ``--steady`` latency. Each mode runs the same
+sequence of distinct searches, and mean / p95 / max latency are reported.
+
+Usage:
+    python -m capstone.scripts.bench_stac_backends --searches 40 --hedge-after 0.15
+"""
+
+import argparse
+import statistics
+import time
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client, stac_resilience
+from capstone.tools.stac_backends import BackendRegistry, RoutedStacClient, StacBackend
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+DATETIME_RANGE = "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+def _run(a: StubStacServer, searches: int, degraded: float, fast: float) -> list[float]:
+    a.latency = fast
+    timings = []
+    for i in range(searches):
+        if i == searches // 2:
+            a.latency = degraded
+        t0 = time.perf_counter()
+        search_satellite_scenes(KNOWN_AOIS["tokyo_area"]["bbox"], DATETIME_RANGE, 10.0 + i, limit=5)
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=40)
+    parser.add_argument("--fast", type=float, default=0.02)
+    parser.add_argument("--steady", type=float, default=0.1)
+    parser.add_argument("--degraded", type=float, default=0.6)
+    parser.add_argument("--hedge-after", type=float, default=0.15)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    with StubStacServer(n_items=200) as a, StubStacServer(n_items=200, latency=args.steady) as b:
+        modes = {
+            "single endpoint": lambda: stac_client.StacClient(base_url=a.url),
+            "ewma routing": lambda: RoutedStacClient(
+                BackendRegistry([StacBackend("a", a.url), StacBackend("b", b.url)])
+            ),
+            "ewma + hedging": lambda: RoutedStacClient(
+                BackendRegistry([StacBackend("a", a.url), StacBackend("b", b.url)], hedge_after=args.hedge_after)
+            ),
+        }
+        print(f"{'mode':<16} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        for label, make_client in modes.items():
+            stac_resilience.reset_endpoint_guards()
+            client = make_client()
+            client.search_extensions()
+            stac_client.set_default_client(client)
+            timings = sorted(_run(a, args.searches, args.degraded, args.fast))
+            p95 = timings[min(len(timings) - 1, int(0.95 * len(timings)))]
+            print(
+                f"{label:<16} {statistics.mean(timings) * 1000:>8.1f} {p95 * 1000:>8.1f} {timings[-1] * 1000:>8.1f}"
+                + (f"   {client.stats}" if isinstance(client, RoutedStacClient) else "")
+            )
+        stac_client.set_default_client(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# src/capstone/scripts/bench_stac_client.py
+
+"""
+Microbenchmark: per-call cost of a fresh ``requests.post`` vs the pooled StacClient.
+
+Runs against a local stub STAC server so that the numbers only reflect
+client-side connection handling (no real network or TLS variance).
+
+Usage:
+    python -m capstone.scripts.bench_stac_client --calls 300 --threads 8
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools.stac_client import StacClient
+
+
+PAYLOAD = {
+    "collections": ["sentinel-2-l2a"],
+    "bbox": [138.8, 34.8, 140.0, 36.2],
+    "datetime": "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z",
+    "limit": 10,
+    "query": {"eo:cloud_cover": {"lte": 30}},
+}
+
+
+def _time_calls(fn, calls: int, threads: int) -> list[float]:
+    def one(_):
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0
+
+    if threads <= 1:
+        return [one(i) for i in range(calls)]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(one, range(calls)))
+
+
+def _report(label: str, samples: list[float], wall: float) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(
+        f"{label:<22} mean {statistics.mean(ms):7.3f} ms  "
+        f"p50 {statistics.median(ms):7.3f} ms  p95 {p95:7.3f} ms  "
+        f"wall {wall:6.3f} s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=16)
+    args = parser.parse_args()
+
+    with StubStacServer(n_items=50) as server:
+        url = f"{server.url}/search"
+
+        def fresh():
+            r = requests.post(url, json=PAYLOAD, timeout=30)
+            r.raise_for_status()
+            r.json()
+
+        client = StacClient(base_url=server.url, pool_size=args.pool_size)
+
+        def pooled():
+            client.post_search(PAYLOAD)
+
+        # ウォームアップ（インポートや初回接続のコストを計測から外す）
+        fresh()
+        pooled()
+
+        print(f"{args.calls} calls, {args.threads} thread(s), stub at {server.url}")
+        results = {}
+        for label, fn in [("requests.post (fresh)", fresh), ("StacClient (pooled)", pooled)]:
+            t0 = time.perf_counter()
+            samples = _time_calls(fn, args.calls, args.threads)
+            wall = time.perf_counter() - t0
+            results[label] = statistics.mean(samples)
+            _report(label, samples, wall)
+        client.close()
+
+    saving = results["requests.post (fresh)"] - results["StacClient (pooled)"]
+    print(f"per-call saving: {saving * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
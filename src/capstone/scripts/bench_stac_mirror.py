@@ -0,0 +1,77 @@
+# src/capstone/scripts/bench_stac_mirror.py
+
+"""
+Benchmark: remote STAC searches vs the local mirror for catalog AOIs.
+
+Syncs a year of synthetic items for the AOIs into a ``StacMirror`` from the
+stub server (with per-request latency), then runs the same month-by-month
+searches against the remote API and against the mirror.
+
+Usage:
+    python -m capstone.scripts.bench_stac_mirror --items 5000 --latency 0.2
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client, stac_mirror
+from capstone.tools.stac_fanout import split_monthly
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+YEAR = "2023-01-01T00:00:00Z/2023-12-31T23:59:59Z"
+AOIS = ["japan", "tokyo_area", "sapporo_area", "hokkaido_east"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--cloud", type=float, default=30.0)
+    args = parser.parse_args()
+
+    stac_cache.set_search_cache(None)
+    queries = [(KNOWN_AOIS[a]["bbox"], month) for a in AOIS for month in split_monthly(YEAR)]
+
+    with tempfile.TemporaryDirectory() as tmp, StubStacServer(
+        n_items=args.items, latency=args.latency, spatial_filter=True, temporal_filter=True,
+        bbox=KNOWN_AOIS["japan"]["bbox"],
+    ) as server:
+        client = stac_client.StacClient(base_url=server.url)
+        stac_client.set_default_client(client)
+        mirror = stac_mirror.StacMirror(Path(tmp) / "mirror.db")
+        try:
+            t0 = time.perf_counter()
+            stats = mirror.sync(KNOWN_AOIS["japan"]["bbox"], YEAR, client=client)
+            print(f"initial sync: {stats} in {time.perf_counter() - t0:.2f} s")
+            t0 = time.perf_counter()
+            stats = mirror.sync(KNOWN_AOIS["japan"]["bbox"], YEAR, client=client)
+            print(f"re-sync:      {stats} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+            answers = {}
+            for label, configured in (("remote", None), ("mirror", mirror)):
+                stac_mirror.set_mirror(configured)
+                before = server.request_count
+                t0 = time.perf_counter()
+                results = [search_satellite_scenes(bbox, month, args.cloud, limit=10) for bbox, month in queries]
+                elapsed = time.perf_counter() - t0
+                answers[label] = results
+                print(
+                    f"{label:<7} {len(queries)} searches: {elapsed * 1000 / len(queries):8.2f} ms/search,"
+                    f" {server.request_count - before} HTTP requests,"
+                    f" {sum(map(len, results))} rows"
+                )
+            same = sum(r == m for r, m in zip(answers["remote"], answers["mirror"]))
+            print(f"identical results: {same}/{len(queries)}")
+        finally:
+            stac_mirror.set_mirror(None)
+            stac_client.set_default_client(None)
+            mirror.close()
+
+
+if __name__ == "__main__":
+    main()
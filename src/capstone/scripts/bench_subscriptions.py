@@ -0,0 +1,90 @@
+# src/capstone/scripts/bench_subscriptions.py
+
+"""
+Benchmark: scheduled full re-searches vs batched incremental subscription checks.
+
+Every catalog AOI inside Japan gets subscriptions at a few cloud thresholds.
+Each round publishes a batch of new items on the stub server, then checks
+all subscriptions either by re-running ``search_satellite_scenes`` over the
+whole watched range (what the scheduled jobs did) or with one
+``check_subscriptions`` pass. Requests, bytes and time per round are compared.
+
+Usage:
+    python -m capstone.scripts.bench_subscriptions --items 3000 --rounds 4 --per-round 200
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from shapely.geometry import box
+
+from capstone.aoi.aoi_catalog import AOI_CATALOG, KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.scripts.synthetic import make_stac_item
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_search import search_satellite_scenes
+from capstone.tools.stac_subscriptions import SubscriptionStore, check_subscriptions
+
+
+WATCHED = "2020-01-01T00:00:00Z/2040-12-31T23:59:59Z"
+THRESHOLDS = [10.0, 20.0, 50.0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--per-round", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    japan = box(*KNOWN_AOIS["japan"]["bbox"])
+    aois = [e for e in AOI_CATALOG if e["id"] != "japan" and japan.contains(box(*e["bbox"]))]
+    stac_cache.set_search_cache(None)
+
+    with StubStacServer(
+        n_items=args.items, latency=args.latency, spatial_filter=True, bbox=KNOWN_AOIS["japan"]["bbox"]
+    ) as server:
+        client = stac_client.StacClient(base_url=server.url)
+        stac_client.set_default_client(client)
+        store = SubscriptionStore(":memory:")
+        # 合成 item の日時は未来にも及ぶので、既存分の最新時刻を起点にする
+        latest = max(item["properties"]["updated"] for item in server.items)
+        subscriptions = [(e["bbox"], t) for e in aois for t in THRESHOLDS]
+        for bbox, threshold in subscriptions:
+            store.subscribe(bbox, threshold, datetime_range=WATCHED, since=latest)
+        print(f"{len(subscriptions)} subscriptions over {len(aois)} AOIs, {args.items} existing items")
+        print(f"{'round':>5} {'mode':<12} {'requests':>9} {'KB':>9} {'ms':>8} {'rows':>7}")
+
+        for round_no in range(1, args.rounds + 1):
+            # 新しい item は常にそれまでの最新の updated より後に公開される
+            latest = max(item["properties"]["updated"] for item in server.items)
+            start = datetime.fromisoformat(latest.replace("Z", "+00:00")) + timedelta(days=1)
+            server.items.extend(
+                make_stac_item(i, bbox=KNOWN_AOIS["japan"]["bbox"], start=start, seed=round_no)
+                for i in range(args.per_round)
+            )
+            for mode in ("full search", "incremental"):
+                requests_before, bytes_before = server.request_count, server.bytes_sent
+                t0 = time.perf_counter()
+                if mode == "full search":
+                    rows = sum(
+                        len(search_satellite_scenes(bbox, WATCHED, threshold, limit=1000))
+                        for bbox, threshold in subscriptions
+                    )
+                else:
+                    rows = sum(map(len, check_subscriptions(store, client=client).values()))
+                elapsed = (time.perf_counter() - t0) * 1000
+                print(
+                    f"{round_no:>5} {mode:<12} {server.request_count - requests_before:>9}"
+                    f" {(server.bytes_sent - bytes_before) / 1024:>9.1f} {elapsed:>8.1f} {rows:>7}"
+                )
+
+        stac_client.set_default_client(None)
+        client.close()
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
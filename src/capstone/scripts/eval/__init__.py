@@ -1 +1,8 @@
-from .agent import root_agent
+from . import agent
+
+
+def __getattr__(name: str):
+    # ADK のローダーはパッケージの root_agent も探すので、参照されたときだけ agent.py で組み立てる
+    if name == "root_agent":
+        return agent.root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,27 @@
 # src/capstone/scripts/eval/agent.py
 
-from capstone.agent.stac_agent_adk import create_agent
+"""
+Agent module for ADK eval runs (``adk eval``, ``AgentEvaluator``, ``run_eval_parallel``).
 
-root_agent = create_agent()
+``root_agent`` is built on first access (PEP 562 ``__getattr__``), so
+importing this module does not load ADK or assemble the prompt until an
+evaluator actually asks for the agent.
+"""
+
+from pathlib import Path
+
+
+def _build_root_agent():
+    from capstone.agent.llm_cassette import install_cassettes_from_env
+    from capstone.agent.stac_agent_adk import create_agent
+
+    # CAPSTONE_CASSETTES=replay なら記録済みの Gemini / STAC 応答でオフライン実行する
+    install_cassettes_from_env(default_dir=Path(__file__).parent / "cassettes")
+    return create_agent()
+
+
+def __getattr__(name: str):
+    if name == "root_agent":
+        value = globals()["root_agent"] = _build_root_agent()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
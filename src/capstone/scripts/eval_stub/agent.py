@@ -0,0 +1,32 @@
+# src/capstone/scripts/eval_stub/agent.py
+
+"""
+Agent module for offline eval runs: the real agent wired to ``StubLlm``.
+
+Lets ``run_eval`` / ``run_eval_parallel`` be timed without API keys.
+CAPSTONE_STUB_LLM_LATENCY sets the simulated model time per call (seconds).
+With CAPSTONE_CASSETTES / CAPSTONE_CASSETTE_DIR set, the stub's answers are
+recorded or replayed like the live model's (see ``llm_cassette``).
+``root_agent`` is built on first access.
+"""
+
+import os
+
+
+def _build_root_agent():
+    from capstone.agent.llm_cassette import CassetteLlm, install_cassettes_from_env
+    from capstone.agent.stac_agent_adk import create_agent
+    from capstone.scripts.stub_llm import StubLlm
+
+    model = StubLlm(latency=float(os.environ.get("CAPSTONE_STUB_LLM_LATENCY", "0.5")))
+    if install_cassettes_from_env() is not None:
+        model = CassetteLlm(model=model.model, inner=model)
+    return create_agent(model=model)
+
+
+def __getattr__(name: str):
+    # root_agent は初回参照時に組み立てる（eval/agent.py と同じ）
+    if name == "root_agent":
+        value = globals()["root_agent"] = _build_root_agent()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
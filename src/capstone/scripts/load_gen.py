@@ -0,0 +1,216 @@
+# src/capstone/scripts/load_gen.py
+
+"""
+Open-loop load generator for the search tool and the agent runner, with a JSON report.
+
+Requests are started at a fixed rate (``--qps``) for ``--duration`` seconds
+whether or not earlier ones have finished, so an overloaded endpoint shows
+up as growing latency rather than as a quietly lower request rate. Latency
+is measured from each request's scheduled start (time spent waiting for a
+free ``--max-in-flight`` slot included) and reported for successful
+requests only; failures are counted by exception type.
+
+Targets:
+    search: ``search_satellite_scenes`` (sync tool, on a thread pool).
+    agent:  ``AgentService.ask`` with a ``StubLlm`` that calls the async
+            search tool once per turn (``--model-latency`` per model call).
+
+By default a ``StubStacServer`` is started in-process (``--items``,
+``--latency``, ``--jitter``, ``--fault-rate``); ``--base-url`` targets an
+already running STAC API instead. The search cache is off unless
+``--cache`` is given, so every distinct search reaches the endpoint.
+
+Usage:
+    python -m capstone.scripts.load_gen --target search --qps 50 --duration 10 --latency 0.05 --jitter 0.02 --output load.json
+    python -m capstone.scripts.load_gen --target agent --qps 20 --duration 10 --model-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client
+from capstone.tools.stac_search import search_satellite_scenes
+
+
+DATETIME_RANGE = "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z"
+DEFAULT_MAX_IN_FLIGHT = 64
+
+
+@dataclass
+class LoadResult:
+    requests: int = 0
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0..100) of already sorted values; 0.0 if empty."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))  # ceil(n * q / 100)
+    return sorted_values[int(rank) - 1]
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[Any]],
+    qps: float,
+    duration: float,
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+) -> LoadResult:
+    """
+    Start ``call(i)`` at ``qps`` requests per second for ``duration`` seconds and wait for all of them.
+    """
+    if qps <= 0 or duration <= 0:
+        raise ValueError(f"qps and duration must be positive, got: {qps}, {duration}")
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(max_in_flight)
+    result = LoadResult(requests=max(1, int(qps * duration)))
+
+    async def one(i: int, scheduled: float) -> None:
+        async with semaphore:
+            try:
+                await call(i)
+            except Exception as e:
+                result.errors[type(e).__name__] += 1
+                return
+        result.latencies.append(loop.time() - scheduled)
+
+    t0 = loop.time()
+    tasks = []
+    for i in range(result.requests):
+        scheduled = t0 + i / qps
+        # 前のリクエストの完了を待たずに、予定時刻が来たら次を投げる（オープンループ）
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        tasks.append(asyncio.create_task(one(i, scheduled)))
+    await asyncio.gather(*tasks)
+    result.elapsed = loop.time() - t0
+    return result
+
+
+def summarize(result: LoadResult, qps: float) -> dict:
+    """Machine-readable report: counts, error rate, throughput and latency percentiles (ms)."""
+    ms = sorted(latency * 1000 for latency in result.latencies)
+    errors = sum(result.errors.values())
+    return {
+        "requests": result.requests,
+        "ok": len(ms),
+        "errors": errors,
+        "error_rate": round(errors / result.requests, 4),
+        "errors_by_type": dict(result.errors),
+        "offered_qps": qps,
+        "throughput_rps": round(len(ms) / result.elapsed, 2) if result.elapsed else 0.0,
+        "elapsed_s": round(result.elapsed, 3),
+        "latency_ms": {
+            "p50": round(percentile(ms, 50), 2),
+            "p95": round(percentile(ms, 95), 2),
+            "p99": round(percentile(ms, 99), 2),
+            "mean": round(statistics.fmean(ms), 2) if ms else 0.0,
+            "max": round(ms[-1], 2) if ms else 0.0,
+        },
+    }
+
+
+def _search_call(pool: ThreadPoolExecutor, distinct: int) -> Callable[[int], Awaitable[Any]]:
+    bbox = KNOWN_AOIS["tokyo_area"]["bbox"]
+    loop = asyncio.get_running_loop()
+
+    def call(i: int) -> Awaitable[Any]:
+        # 雲量の閾値を変えて、distinct 通りの別々の検索にする
+        cloud = 5.0 + (i % distinct) * 0.5
+        return loop.run_in_executor(pool, search_satellite_scenes, bbox, DATETIME_RANGE, cloud, 5)
+
+    return call
+
+
+def _agent_call(model_latency: float, max_in_flight: int) -> Callable[[int], Awaitable[Any]]:
+    # ADK の読み込みは重いので、agent ターゲットを使うときだけ import する
+    from capstone.agent.agent_service import AgentService
+    from capstone.agent.stac_agent_adk import APP_NAME, create_agent
+    from capstone.scripts.stub_llm import StubLlm
+
+    model = StubLlm(latency=model_latency, tool_call={
+        "name": "search_satellite_scenes",
+        "args": {"bbox": KNOWN_AOIS["tokyo_area"]["bbox"], "datetime_range": DATETIME_RANGE, "cloud_cover_max": 20.0},
+    })
+    service = AgentService(create_agent(model=model), APP_NAME, max_concurrency=max_in_flight)
+    return lambda i: service.ask(f"load test query {i}", f"load_user_{i}")
+
+
+async def _drive(args, base_url: str) -> LoadResult:
+    if args.target == "search":
+        stac_client.set_default_client(stac_client.StacClient(base_url=base_url, pool_size=args.max_in_flight))
+        with ThreadPoolExecutor(args.max_in_flight) as pool:
+            return await run_load(_search_call(pool, args.distinct), args.qps, args.duration, args.max_in_flight)
+    stac_async.configure_default_async_client(base_url=base_url, pool_size=args.max_in_flight)
+    call = _agent_call(args.model_latency, args.max_in_flight)
+    return await run_load(call, args.qps, args.duration, args.max_in_flight)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=("search", "agent"), default="search")
+    parser.add_argument("--qps", type=float, default=50.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT)
+    parser.add_argument("--distinct", type=int, default=100, help="distinct searches cycled through (search target)")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="StubLlm seconds per call (agent target)")
+    parser.add_argument("--cache", action="store_true", help="keep the search cache on")
+    parser.add_argument("--base-url", default=None, help="STAC API to load instead of an in-process stub")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--output", type=Path, default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+
+    if not args.cache:
+        stac_cache.set_search_cache(None)
+    server: Optional[StubStacServer] = None
+    if args.base_url is None:
+        server = StubStacServer(
+            n_items=args.items, latency=args.latency, jitter=args.jitter, fault_rate=args.fault_rate
+        ).start()
+    try:
+        started = time.time()
+        result = asyncio.run(_drive(args, args.base_url or server.url))
+    finally:
+        if server is not None:
+            server.stop()
+        stac_client.set_default_client(None)
+
+    report = {
+        "target": args.target,
+        "started_at": round(started, 3),
+        "config": {
+            key: getattr(args, key)
+            for key in ("qps", "duration", "max_in_flight", "distinct", "model_latency", "cache",
+                        "base_url", "items", "latency", "jitter", "fault_rate")
+        },
+        **summarize(result, args.qps),
+    }
+    if server is not None:
+        report["upstream"] = {
+            "requests": server.request_count,
+            "faults": server.fault_count,
+            "bytes_sent": server.bytes_sent,
+            "max_in_flight": server.max_in_flight,
+        }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output is not None:
+        args.output.write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
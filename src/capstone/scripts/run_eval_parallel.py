@@ -0,0 +1,364 @@
+# src/capstone/scripts/run_eval_parallel.py
+
+"""
+Parallel ADK eval driver: shards eval cases over a bounded pool and caches per-case results.
+
+Every eval case of every ``*.evalset.json`` in the eval directory becomes
+one job per run (``--num-runs``). Jobs run concurrently on an asyncio loop
+(``--concurrency``), optionally sharded over worker processes
+(``--processes``). A job's result is cached under a key made of the eval
+case, the eval config, the agent module and a fingerprint of the agent,
+prompt, tool and AOI code (and of the cassettes when CAPSTONE_CASSETTES is
+set), so unchanged cases are not re-run. Only passing runs are cached
+unless ``--cache-failures`` is given, so a flaky failure is retried next time.
+
+A case passes when all of its runs pass. ``run_eval`` instead scores all
+runs together; running them as separate jobs is what lets them run in parallel.
+
+Usage:
+    python -m capstone.scripts.run_eval_parallel --concurrency 4 --num-runs 2
+    python -m capstone.scripts.run_eval_parallel --processes 2 --only normal --no-cache
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from capstone.scripts.run_eval import AGENT_MODULE, EVAL_DIR, PROJECT_ROOT
+
+
+# この下のコードが変わったら全ケースを再実行する（プロンプト・ツール・AOI カタログを含む）
+FINGERPRINT_DIRS = [
+    PROJECT_ROOT / "src" / "capstone" / "agent",
+    PROJECT_ROOT / "src" / "capstone" / "tools",
+    PROJECT_ROOT / "src" / "capstone" / "aoi",
+]
+FINGERPRINT_SUFFIXES = {".py", ".json", ".md", ".txt"}
+# エージェントの振る舞いを変える環境変数
+FINGERPRINT_ENV = ["CAPSTONE_PROMPT_MODE", "CAPSTONE_FAST_PATH", "CAPSTONE_CASSETTES", "CAPSTONE_CASSETTE_DIR"]
+# eval エージェントが CAPSTONE_CASSETTE_DIR 未設定のときに使うカセット
+DEFAULT_CASSETTE_DIR = EVAL_DIR / "cassettes"
+
+DEFAULT_CACHE_PATH = PROJECT_ROOT / ".eval_cache.sqlite"
+
+
+def _sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _cassette_files() -> list[Path]:
+    # カセットで再生するときは、記録し直した応答でも再実行が要る
+    if not os.environ.get("CAPSTONE_CASSETTES"):
+        return []
+    directory = Path(os.environ.get("CAPSTONE_CASSETTE_DIR") or DEFAULT_CASSETTE_DIR)
+    return [p for p in directory.rglob("*") if p.is_file()] if directory.is_dir() else []
+
+
+def code_fingerprint(dirs: list[Path] = FINGERPRINT_DIRS, extra_files: list[Path] = ()) -> str:
+    """
+    Hash the source files the agent's behaviour depends on (plus FINGERPRINT_ENV).
+
+    When CAPSTONE_CASSETTES is set, the cassette files (CAPSTONE_CASSETTE_DIR
+    or ``DEFAULT_CASSETTE_DIR``) are hashed too.
+    """
+    digest = hashlib.sha256()
+    files = [p for d in dirs for p in d.rglob("*") if p.is_file() and p.suffix in FINGERPRINT_SUFFIXES]
+    files += _cassette_files()
+    for path in sorted(set(files) | set(extra_files)):
+        if "__pycache__" in path.parts:
+            continue
+        digest.update(str(path.relative_to(PROJECT_ROOT) if path.is_relative_to(PROJECT_ROOT) else path).encode())
+        digest.update(path.read_bytes())
+    for name in FINGERPRINT_ENV:
+        digest.update(f"{name}={os.environ.get(name, '')}".encode())
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class EvalJob:
+    """One run of one eval case."""
+
+    eval_set_file: str
+    eval_set_id: str
+    eval_id: str
+    case_json: str
+    run: int
+    key: str
+
+
+@dataclass
+class EvalOutcome:
+    eval_set_id: str
+    eval_id: str
+    run: int
+    passed: bool
+    detail: str = ""
+    seconds: float = 0.0
+    cached: bool = False
+    # 評価そのものが落ちた（API キー無しなど）結果はキャッシュしない
+    error: bool = False
+
+
+def load_jobs(
+    eval_dir: Path = EVAL_DIR,
+    num_runs: int = 1,
+    agent_module: str = AGENT_MODULE,
+    only: Optional[list[str]] = None,
+    fingerprint: Optional[str] = None,
+) -> list[EvalJob]:
+    """
+    Expand the evalsets in ``eval_dir`` into jobs (one per case and run).
+
+    Args:
+        only: Evalset ids (e.g. ["normal"]) to restrict to.
+        fingerprint: Code fingerprint; computed with ``code_fingerprint`` if omitted.
+    """
+    if num_runs < 1:
+        raise ValueError(f"num_runs must be at least 1, got: {num_runs}")
+    fingerprint = fingerprint or code_fingerprint(extra_files=[_agent_module_file(agent_module)])
+    jobs = []
+    for path in sorted(Path(eval_dir).glob("*.evalset.json")):
+        data = json.loads(path.read_text(encoding="utf-8"))
+        eval_set_id = data.get("eval_set_id") or path.name.removesuffix(".evalset.json")
+        if only and eval_set_id not in only:
+            continue
+        config_path = path.parent / "test_config.json"
+        config = config_path.read_text(encoding="utf-8") if config_path.exists() else ""
+        for case in data.get("eval_cases", []):
+            case_json = json.dumps(case, sort_keys=True)
+            for run in range(num_runs):
+                key = _sha256(fingerprint, agent_module, config, eval_set_id, case_json, str(run))
+                jobs.append(EvalJob(str(path), eval_set_id, case["eval_id"], case_json, run, key))
+    return jobs
+
+
+def _agent_module_file(agent_module: str) -> Path:
+    return PROJECT_ROOT / "src" / Path(*agent_module.split(".")).with_suffix(".py")
+
+
+class EvalResultCache:
+    """
+    Per-job eval results in a local SQLite file, keyed by ``EvalJob.key``.
+
+    Args:
+        path: SQLite database file (created if missing). ":memory:" also works.
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS eval_results (
+                key TEXT PRIMARY KEY,
+                eval_set_id TEXT NOT NULL,
+                eval_id TEXT NOT NULL,
+                run INTEGER NOT NULL,
+                passed INTEGER NOT NULL,
+                detail TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, job: EvalJob) -> Optional[EvalOutcome]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT passed, detail, seconds FROM eval_results WHERE key = ?", (job.key,)
+            ).fetchone()
+        if row is None:
+            return None
+        passed, detail, seconds = row
+        return EvalOutcome(job.eval_set_id, job.eval_id, job.run, bool(passed), detail, seconds, cached=True)
+
+    def put(self, job: EvalJob, outcome: EvalOutcome) -> None:
+        if outcome.error:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO eval_results "
+                "(key, eval_set_id, eval_id, run, passed, detail, seconds, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.key, job.eval_set_id, job.eval_id, job.run, int(outcome.passed),
+                 outcome.detail, outcome.seconds, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+async def evaluate_job(job: EvalJob, agent_module: str = AGENT_MODULE) -> EvalOutcome:
+    """
+    Run one eval case once with ``AgentEvaluator.evaluate_eval_set``.
+    """
+    from google.adk.evaluation.agent_evaluator import AgentEvaluator
+    from google.adk.evaluation.eval_case import EvalCase
+    from google.adk.evaluation.eval_set import EvalSet
+
+    eval_config = AgentEvaluator.find_config_for_test_file(job.eval_set_file)
+    eval_set = EvalSet(
+        eval_set_id=job.eval_set_id,
+        eval_cases=[EvalCase.model_validate_json(job.case_json)],
+    )
+    t0 = time.perf_counter()
+    try:
+        await AgentEvaluator.evaluate_eval_set(
+            agent_module=agent_module,
+            eval_set=eval_set,
+            eval_config=eval_config,
+            num_runs=1,
+            print_detailed_results=False,
+        )
+    except AssertionError as e:
+        return EvalOutcome(job.eval_set_id, job.eval_id, job.run, False, str(e), time.perf_counter() - t0)
+    except Exception as e:
+        detail = f"{type(e).__name__}: {e}"
+        return EvalOutcome(job.eval_set_id, job.eval_id, job.run, False, detail, time.perf_counter() - t0, error=True)
+    return EvalOutcome(job.eval_set_id, job.eval_id, job.run, True, "", time.perf_counter() - t0)
+
+
+Evaluate = Callable[[EvalJob, str], Awaitable[EvalOutcome]]
+
+
+async def run_jobs(
+    jobs: list[EvalJob],
+    agent_module: str = AGENT_MODULE,
+    concurrency: int = 4,
+    evaluate: Evaluate = evaluate_job,
+) -> list[EvalOutcome]:
+    """
+    Evaluate jobs on the running loop, at most ``concurrency`` at a time, in job order.
+    """
+    if concurrency <= 0:
+        raise ValueError(f"concurrency must be positive, got: {concurrency}")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(job: EvalJob) -> EvalOutcome:
+        async with semaphore:
+            return await evaluate(job, agent_module)
+
+    return list(await asyncio.gather(*(one(job) for job in jobs)))
+
+
+def _run_shard(jobs: list[EvalJob], agent_module: str, concurrency: int) -> list[EvalOutcome]:
+    # ワーカープロセスの入口（ProcessPoolExecutor から pickle して呼ばれる）
+    return asyncio.run(run_jobs(jobs, agent_module, concurrency))
+
+
+def run_evaluation(
+    jobs: list[EvalJob],
+    agent_module: str = AGENT_MODULE,
+    concurrency: int = 4,
+    processes: int = 1,
+    cache: Optional[EvalResultCache] = None,
+    rerun_failed: bool = False,
+    evaluate: Evaluate = evaluate_job,
+    cache_failures: bool = False,
+) -> list[EvalOutcome]:
+    """
+    Evaluate jobs, serving unchanged ones from ``cache``; returns outcomes in job order.
+
+    Only passing runs are stored in ``cache`` unless ``cache_failures`` is
+    set; ``rerun_failed`` re-runs failures cached that way.
+    With ``processes > 1`` the jobs to run are sharded round-robin over
+    worker processes, each running ``concurrency`` jobs at a time (custom
+    ``evaluate`` functions are only supported in-process).
+    """
+    outcomes: dict[str, EvalOutcome] = {}
+    todo = []
+    for job in jobs:
+        cached = cache.get(job) if cache is not None else None
+        if cached is not None and (cached.passed or not rerun_failed):
+            outcomes[job.key] = cached
+        else:
+            todo.append(job)
+
+    if processes > 1 and len(todo) > 1:
+        if evaluate is not evaluate_job:
+            raise ValueError("a custom evaluate function cannot be used with processes > 1")
+        shards = [todo[i::processes] for i in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_run_shard, shard, agent_module, concurrency) for shard in shards if shard]
+            fresh = [outcome for future in futures for outcome in future.result()]
+        todo = [job for shard in shards for job in shard]
+    else:
+        fresh = asyncio.run(run_jobs(todo, agent_module, concurrency, evaluate))
+
+    for job, outcome in zip(todo, fresh):
+        outcomes[job.key] = outcome
+        if cache is not None and (outcome.passed or cache_failures):
+            cache.put(job, outcome)
+    return [outcomes[job.key] for job in jobs]
+
+
+def summarize(outcomes: list[EvalOutcome]) -> dict[tuple[str, str], bool]:
+    """Return {(eval_set_id, eval_id): passed} where a case passes only if all its runs passed."""
+    cases: dict[tuple[str, str], bool] = {}
+    for outcome in outcomes:
+        key = (outcome.eval_set_id, outcome.eval_id)
+        cases[key] = cases.get(key, True) and outcome.passed
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agent-module", default=AGENT_MODULE)
+    parser.add_argument("--eval-dir", type=Path, default=EVAL_DIR)
+    parser.add_argument("--num-runs", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--only", nargs="*", help="evalset ids to run (default: all)")
+    parser.add_argument("--cache", type=Path, default=Path(os.environ.get("CAPSTONE_EVAL_CACHE", DEFAULT_CACHE_PATH)))
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--cache-failures", action="store_true", help="also cache failing runs")
+    parser.add_argument("--rerun-failed", action="store_true", help="re-run cached failures too")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.eval_dir, args.num_runs, args.agent_module, args.only)
+    cache = None if args.no_cache else EvalResultCache(args.cache)
+    print(f"=== {len(jobs)} eval jobs, concurrency={args.concurrency}, processes={args.processes} ===")
+    t0 = time.perf_counter()
+    try:
+        outcomes = run_evaluation(
+            jobs, args.agent_module, args.concurrency, args.processes, cache, args.rerun_failed,
+            cache_failures=args.cache_failures,
+        )
+    finally:
+        if cache is not None:
+            cache.close()
+    elapsed = time.perf_counter() - t0
+
+    for outcome in outcomes:
+        status = "PASS" if outcome.passed else ("ERROR" if outcome.error else "FAIL")
+        source = "cached" if outcome.cached else f"{outcome.seconds:6.1f}s"
+        print(f"{status:<5} {source:>8}  {outcome.eval_set_id}/{outcome.eval_id} run {outcome.run}")
+        if not outcome.passed and outcome.detail:
+            print("      " + outcome.detail.strip().splitlines()[-1][:200])
+
+    cases = summarize(outcomes)
+    failed = [f"{s}/{e}" for (s, e), passed in cases.items() if not passed]
+    ran = sum(not o.cached for o in outcomes)
+    print(f"\n{len(cases) - len(failed)}/{len(cases)} cases passed; {ran} jobs run, "
+          f"{len(outcomes) - ran} from cache; wall clock {elapsed:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
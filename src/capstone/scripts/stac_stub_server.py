@@ -0,0 +1,364 @@
+# src/capstone/scripts/stac_stub_server.py
+
+"""
+Minimal local STAC API stand-in for benchmarks and tests.
+
+Serves synthetic Sentinel-2 items from ``capstone.scripts.synthetic`` on
+``POST /search`` so that the search tool can be exercised without touching
+the real Earth Search endpoint. Point the tools at it with
+``CAPSTONE_STAC_BACKENDS`` or ``StacClient(base_url=...)``; see
+``load_gen`` for driving it at a fixed request rate.
+
+Usage:
+    python -m capstone.scripts.stac_stub_server --port 8765 --items 500 --latency 0.2 --jitter 0.05 --fault-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import shapely
+from shapely.geometry import shape
+
+from capstone.scripts.synthetic import make_stac_item
+
+
+class _Server(ThreadingHTTPServer):
+    # 既定の listen backlog (5) だと同時接続のバーストで SYN が落ち、1 秒の再送待ちが起きる
+    request_queue_size = 128
+
+
+class StubStacServer:
+    """
+    Threaded HTTP/1.1 (keep-alive) server serving a fixed set of synthetic items.
+
+    Args:
+        n_items: Number of synthetic items held by the server.
+        latency: Artificial delay (seconds) added to every search response.
+        jitter: Mean of an extra, exponentially distributed delay (seconds)
+            per search, giving the long latency tail of a real endpoint.
+        extensions: Advertise and honour the item-search ``fields`` and
+            ``sort`` extensions.
+        spatial_filter: Honour ``bbox`` and ``intersects``. Off by default so
+            that small test bboxes still see every item.
+        temporal_filter: Honour closed ``datetime`` intervals (off by default
+            for the same reason).
+        bbox: Area the synthetic item footprints are scattered over.
+        fault_rate: Fraction of searches answered with ``fault_status``
+            instead of results (fault injection; can be changed while
+            running, e.g. 1.0 for an outage and back to 0.0).
+        fault_status: HTTP status returned for injected faults.
+        retry_after: ``Retry-After`` value (seconds) sent with injected
+            faults; None sends no header.
+        host, port: Bind address. Port 0 picks a free port.
+    """
+
+    def __init__(
+        self,
+        n_items: int = 200,
+        latency: float = 0.0,
+        extensions: bool = True,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        spatial_filter: bool = False,
+        bbox: Optional[list[float]] = None,
+        temporal_filter: bool = False,
+        fault_rate: float = 0.0,
+        fault_status: int = 503,
+        jitter: float = 0.0,
+        retry_after: Optional[float] = None,
+    ):
+        self.items = [make_stac_item(i, bbox=bbox) for i in range(n_items)]
+        self.latency = latency
+        self.jitter = jitter
+        self.retry_after = retry_after
+        self.extensions = extensions
+        self.spatial_filter = spatial_filter
+        self.temporal_filter = temporal_filter
+        self.fault_rate = fault_rate
+        self.fault_status = fault_status
+        self.fault_count = 0
+        self._fault_rng = random.Random(0)
+        self._jitter_rng = random.Random(1)
+        self.bytes_sent = 0
+        self.request_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = _Server((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubStacServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubStacServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def landing_page(self) -> dict:
+        conforms_to = [
+            "https://api.stacspec.org/v1.0.0/core",
+            "https://api.stacspec.org/v1.0.0/item-search",
+            "https://api.stacspec.org/v1.0.0/item-search#query",
+        ]
+        if self.extensions:
+            conforms_to += [
+                "https://api.stacspec.org/v1.0.0/item-search#fields",
+                "https://api.stacspec.org/v1.0.0/item-search#sort",
+            ]
+        return {
+            "type": "Catalog",
+            "id": "stub-stac",
+            "stac_version": "1.0.0",
+            "description": "Local stub STAC API",
+            "conformsTo": conforms_to,
+            "links": [{"rel": "search", "href": f"{self.url}/search", "method": "POST"}],
+        }
+
+    def delay(self) -> float:
+        """Seconds to hold the current search: ``latency`` plus a random ``jitter`` tail."""
+        if self.jitter <= 0:
+            return self.latency
+        with self._lock:
+            return self.latency + self._jitter_rng.expovariate(1.0 / self.jitter)
+
+    def inject_fault(self) -> bool:
+        """Decide (and count) whether the current search fails."""
+        with self._lock:
+            if self.fault_rate <= 0 or self._fault_rng.random() >= self.fault_rate:
+                return False
+            self.fault_count += 1
+            return True
+
+    def search(self, payload: dict) -> dict:
+        """
+        Evaluate a STAC search payload against the in-memory items.
+
+        Results are paged by ``limit``; when more items remain, the page
+        carries a POST ``next`` link whose body repeats the payload with a
+        ``next`` offset token, as Earth Search does.
+        """
+        limit = int(payload.get("limit", 10))
+        offset = int(payload.get("next", 0))
+        matched = [item for item in self.items if _query_match(item, payload.get("query") or {})]
+        if self.spatial_filter:
+            matched = _spatial_match(matched, payload)
+        if self.temporal_filter:
+            matched = _temporal_match(matched, payload.get("datetime", ""))
+        if self.extensions and payload.get("sortby"):
+            # 安定ソートなので、優先度の低いキーから順に並べ替える
+            for rule in reversed(payload["sortby"]):
+                matched.sort(
+                    key=lambda item, f=rule["field"]: _get_path(item, f),
+                    reverse=rule.get("direction", "asc") == "desc",
+                )
+        page = matched[offset:offset + limit]
+        if self.extensions and payload.get("fields"):
+            page = [_project(item, payload["fields"]) for item in page]
+
+        links = []
+        if offset + limit < len(matched):
+            links.append({
+                "rel": "next",
+                "type": "application/geo+json",
+                "method": "POST",
+                "href": f"{self.url}/search",
+                "body": {**payload, "next": str(offset + limit)},
+                "merge": False,
+            })
+        return {
+            "type": "FeatureCollection",
+            "features": page,
+            "links": links,
+            "numberMatched": len(matched),
+            "numberReturned": len(page),
+        }
+
+
+_QUERY_OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+}
+
+
+def _query_match(item: dict, query: dict) -> bool:
+    # STAC query 拡張（プロパティごとの比較演算）。日時は同じ書式の ISO 文字列として比較する
+    for prop, ops in query.items():
+        value = item["properties"].get(prop)
+        for op, operand in ops.items():
+            if value is None or not _QUERY_OPS[op](value, operand):
+                return False
+    return True
+
+
+def _spatial_match(items: list[dict], payload: dict) -> list[dict]:
+    if payload.get("intersects"):
+        area = shape(payload["intersects"])
+    elif payload.get("bbox"):
+        area = shapely.box(*payload["bbox"])
+    else:
+        return items
+    shapely.prepare(area)
+    return [item for item in items if area.intersects(shape(item["geometry"]))]
+
+
+def _temporal_match(items: list[dict], datetime_range: str) -> list[dict]:
+    parts = datetime_range.split("/")
+    if len(parts) != 2 or ".." in parts:
+        return items
+    start, end = (datetime.fromisoformat(p.replace("Z", "+00:00")) for p in parts)
+    return [
+        item for item in items
+        if start <= datetime.fromisoformat(item["properties"]["datetime"].replace("Z", "+00:00")) <= end
+    ]
+
+
+def _get_path(item: dict, path: str):
+    value = item
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _project(item: dict, fields: dict) -> dict:
+    """Apply a STAC ``fields`` include/exclude spec (dotted paths) to one item."""
+    include = fields.get("include") or []
+    exclude = set(fields.get("exclude") or [])
+    if include:
+        result: dict = {}
+        for path in include:
+            value = _get_path(item, path)
+            if value is None:
+                continue
+            target = result
+            parts = path.split(".")
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+        result.setdefault("id", item["id"])
+    else:
+        result = dict(item)
+    for path in exclude:
+        result.pop(path, None)
+    return result
+
+
+def _make_handler(server: StubStacServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # ヘッダと本文が別々に書かれるため、Nagle を切らないと keep-alive 時に ~40ms 待たされる
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with server._lock:
+                server.connection_count += 1
+
+        def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+            pass
+
+        def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/geo+json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            # 書き込み後に数えるとクライアントが先に応答を受け取り、計測と競合する
+            with server._lock:
+                server.bytes_sent += len(data)
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") in ("", "/conformance"):
+                self._send_json(200, server.landing_page())
+            else:
+                self._send_json(404, {"code": "NotFound", "description": self.path})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            with server._lock:
+                server.request_count += 1
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            try:
+                delay = server.delay()
+                if delay:
+                    time.sleep(delay)
+                if self.path.rstrip("/") == "/search" and server.inject_fault():
+                    headers = {"Retry-After": f"{server.retry_after:g}"} if server.retry_after is not None else None
+                    self._send_json(
+                        server.fault_status, {"code": "Unavailable", "description": "injected fault"}, headers
+                    )
+                elif self.path.rstrip("/") == "/search":
+                    self._send_json(200, server.search(payload))
+                else:
+                    self._send_json(404, {"code": "NotFound", "description": self.path})
+            finally:
+                with server._lock:
+                    server.in_flight -= 1
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fault-rate", type=float, default=0.0)
+    parser.add_argument("--fault-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--spatial-filter", action="store_true")
+    parser.add_argument("--temporal-filter", action="store_true")
+    args = parser.parse_args()
+
+    server = StubStacServer(
+        n_items=args.items, latency=args.latency, host=args.host, port=args.port,
+        fault_rate=args.fault_rate, fault_status=args.fault_status,
+        jitter=args.jitter, retry_after=args.retry_after,
+        spatial_filter=args.spatial_filter, temporal_filter=args.temporal_filter,
+    )
+    print(f"Serving stub STAC API at {server.url} ({args.items} items)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
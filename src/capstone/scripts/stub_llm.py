@@ -0,0 +1,61 @@
+# src/capstone/scripts/stub_llm.py
+
+"""
+Offline stand-in for the Gemini model, for benchmarks and tests.
+
+``StubLlm`` answers every request with a fixed text after an optional delay,
+so agent/runner overhead can be measured without API keys or network.
+"""
+
+import asyncio
+import json
+from typing import AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+
+class StubLlm(BaseLlm):
+    """
+    ADK model that replies "<reply> (turn N)" without calling any API.
+
+    ``N`` counts the user messages in the request, which makes it easy to
+    check that a session's history was carried over.
+
+    Attributes:
+        reply: Text prefix of every response.
+        latency: Seconds to sleep before answering (simulated model time).
+        tool_call: ``{"name": ..., "args": {...}}`` to request once per user
+            turn before answering, so a turn also runs a tool (e.g. the STAC
+            search) the way a real model turn does.
+    """
+
+    model: str = "stub-llm"
+    reply: str = "ok"
+    latency: float = 0.0
+    tool_call: Optional[dict] = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        turns = sum(1 for c in llm_request.contents if c.role == "user" and any(p.text for p in c.parts or []))
+        last = llm_request.contents[-1] if llm_request.contents else None
+        if self.tool_call is not None and not (last and any(p.function_response for p in last.parts or [])):
+            call = types.FunctionCall(name=self.tool_call["name"], args=self.tool_call["args"])
+            part, output_tokens = types.Part(function_call=call), len(json.dumps(self.tool_call)) // 4
+        else:
+            text = f"{self.reply} (turn {turns})"
+            part, output_tokens = types.Part(text=text), len(text) // 4
+        # 文字数 / 4 でトークン数を見積もる（usage が無いと ADK が警告を出す）
+        prompt_tokens = sum(len(p.text or "") for c in llm_request.contents for p in c.parts or []) // 4
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+            turn_complete=True,
+        )
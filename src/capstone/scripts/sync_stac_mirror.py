@@ -0,0 +1,81 @@
+# src/capstone/scripts/sync_stac_mirror.py
+
+"""
+Harvest STAC item metadata for catalog AOIs into the local mirror.
+
+Only months that are missing from the mirror, or recent months whose last
+sync is stale, are requested, so re-running the command is cheap.
+
+Jobs come from the command line or from a JSON config file:
+
+    {
+      "jobs": [
+        {"aois": ["japan", "tokyo_area"], "datetime_range": "2023-01-01T00:00:00Z/2023-12-31T23:59:59Z",
+         "collections": ["sentinel-2-l2a"]}
+      ]
+    }
+
+Usage:
+    python -m capstone.scripts.sync_stac_mirror --db mirror.db --aoi tokyo_area \\
+        --datetime-range 2023-01-01T00:00:00Z/2023-12-31T23:59:59Z
+    python -m capstone.scripts.sync_stac_mirror --db mirror.db --config mirror_jobs.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.tools.stac_client import StacClient
+from capstone.tools.stac_mirror import StacMirror
+
+
+def _jobs(args) -> list[dict]:
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            return json.load(f)["jobs"]
+    if not args.aoi or not args.datetime_range:
+        sys.exit("either --config or both --aoi and --datetime-range are required")
+    return [{"aois": args.aoi, "datetime_range": args.datetime_range, "collections": args.collections}]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", default=os.environ.get("CAPSTONE_STAC_MIRROR_PATH"))
+    parser.add_argument("--config", help="JSON file with a list of sync jobs")
+    parser.add_argument("--aoi", nargs="+", help="AOI ids from aoi_catalog.json")
+    parser.add_argument("--datetime-range", help="closed STAC interval start/end")
+    parser.add_argument("--collections", nargs="+", default=None)
+    parser.add_argument("--stac-url", default=None, help="STAC API root (default: Earth Search)")
+    parser.add_argument("--force", action="store_true", help="re-harvest windows already in the mirror")
+    args = parser.parse_args()
+    if not args.db:
+        sys.exit("--db (or CAPSTONE_STAC_MIRROR_PATH) is required")
+
+    mirror = StacMirror(args.db)
+    client = StacClient(base_url=args.stac_url) if args.stac_url else StacClient()
+    try:
+        for job in _jobs(args):
+            for aoi_id in job["aois"]:
+                if aoi_id not in KNOWN_AOIS:
+                    sys.exit(f"unknown AOI id: {aoi_id}")
+                t0 = time.perf_counter()
+                stats = mirror.sync(
+                    KNOWN_AOIS[aoi_id]["bbox"], job["datetime_range"], job.get("collections"),
+                    client=client, force=args.force,
+                )
+                print(
+                    f"{aoi_id}: {stats.windows_synced} months synced, {stats.windows_skipped} up to date,"
+                    f" {stats.items_upserted} items, {stats.pages} pages"
+                    f" ({time.perf_counter() - t0:.1f} s)"
+                )
+        print(f"mirror now holds {len(mirror)} items")
+    finally:
+        client.close()
+        mirror.close()
+
+
+if __name__ == "__main__":
+    main()
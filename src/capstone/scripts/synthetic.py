@@ -0,0 +1,144 @@
+# src/capstone/scripts/synthetic.py
+
+"""
+Synthetic data generators shared by the stub server, benchmarks and tests.
+
+Everything here is deterministic for a given seed so that benchmark runs
+are comparable with each other.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+# Sentinel-2 MGRS タイル ID 風の接頭辞（それらしい ID を作るためだけに使う）
+_MGRS_PREFIXES = ["54SUE", "54SVE", "53SPU", "55TDN", "55TEN", "31UDQ", "32UQD"]
+
+
+def make_stac_item(
+    index: int,
+    bbox: Optional[list[float]] = None,
+    collection: str = "sentinel-2-l2a",
+    start: datetime = datetime(2023, 1, 1, tzinfo=timezone.utc),
+    seed: int = 0,
+) -> dict:
+    """
+    Build one Sentinel-2 L2A-like STAC Item.
+
+    The item carries the same kinds of properties and assets as an Earth
+    Search item so that payload sizes are in the same ballpark.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    if bbox is None:
+        bbox = [122.0, 24.0, 153.0, 46.0]
+
+    # 110 km 四方程度のフットプリントを bbox 内に置く
+    lon = rng.uniform(bbox[0], max(bbox[0], bbox[2] - 1.0))
+    lat = rng.uniform(bbox[1], max(bbox[1], bbox[3] - 1.0))
+    footprint = [lon, lat, lon + 1.0, lat + 1.0]
+
+    acquired = start + timedelta(days=index * 5 // 7, minutes=rng.randint(0, 1439))
+    dt_text = acquired.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    tile = _MGRS_PREFIXES[index % len(_MGRS_PREFIXES)]
+    item_id = f"S2B_{tile}_{acquired:%Y%m%d}_{index}_L2A"
+    cloud = round(rng.uniform(0.0, 100.0), 6)
+    href_root = f"https://sentinel-cogs.s3.us-west-2.amazonaws.com/sentinel-s2-l2a-cogs/{tile}/{item_id}"
+
+    assets = {
+        "thumbnail": {"href": f"{href_root}/thumbnail.jpg", "type": "image/jpeg", "roles": ["thumbnail"]},
+    }
+    for band in ["blue", "green", "red", "nir", "nir08", "swir16", "swir22", "rededge1", "scl", "visual"]:
+        assets[band] = {
+            "href": f"{href_root}/{band}.tif",
+            "type": "image/tiff; application=geotiff; profile=cloud-optimized",
+            "title": f"{band} band",
+            "roles": ["data", "reflectance"],
+            "proj:shape": [10980, 10980],
+            "proj:transform": [10, 0, 399960, 0, -10, 4000020],
+            "raster:bands": [{"nodata": 0, "data_type": "uint16", "scale": 0.0001, "offset": -0.1}],
+        }
+
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": item_id,
+        "collection": collection,
+        "bbox": footprint,
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[
+                [footprint[0], footprint[1]],
+                [footprint[2], footprint[1]],
+                [footprint[2], footprint[3]],
+                [footprint[0], footprint[3]],
+                [footprint[0], footprint[1]],
+            ]],
+        },
+        "properties": {
+            "datetime": dt_text,
+            "created": dt_text,
+            "updated": dt_text,
+            "platform": "sentinel-2b",
+            "constellation": "sentinel-2",
+            "instruments": ["msi"],
+            "eo:cloud_cover": cloud,
+            "proj:epsg": 32654,
+            "mgrs:utm_zone": int(tile[:2]),
+            "mgrs:latitude_band": tile[2],
+            "mgrs:grid_square": tile[3:],
+            "s2:processing_baseline": "05.09",
+            "s2:nodata_pixel_percentage": round(rng.uniform(0, 50), 6),
+            "s2:vegetation_percentage": round(rng.uniform(0, 80), 6),
+            "s2:water_percentage": round(rng.uniform(0, 40), 6),
+            "view:sun_azimuth": round(rng.uniform(100, 180), 6),
+            "view:sun_elevation": round(rng.uniform(20, 70), 6),
+        },
+        "links": [
+            {"rel": "self", "href": f"https://example.invalid/collections/{collection}/items/{item_id}"},
+            {"rel": "collection", "href": f"https://example.invalid/collections/{collection}"},
+        ],
+        "assets": assets,
+    }
+
+
+def make_feature_collection(n_items: int, seed: int = 0, **item_kwargs) -> dict:
+    """
+    Build a STAC ItemCollection with ``n_items`` synthetic items.
+    """
+    return {
+        "type": "FeatureCollection",
+        "features": [make_stac_item(i, seed=seed, **item_kwargs) for i in range(n_items)],
+        "links": [],
+    }
+
+
+_PLACE_SYLLABLES = ["ka", "ki", "ku", "sa", "shi", "ta", "na", "ha", "ma", "ya", "ra", "wa", "to", "yo", "o"]
+_PLACE_SUFFIXES = ["area", "city", "river basin", "prefecture", "district"]
+
+
+def make_aoi_catalog(n_entries: int, aliases_per_entry: int = 3, seed: int = 0) -> list[dict]:
+    """
+    Build an AOI catalog with the same schema as ``aoi_catalog.json``.
+
+    Entries get unique ids and ``aliases_per_entry`` unique aliases, with
+    small bboxes scattered over Japan, so the catalog behaves like a large
+    municipality / watershed catalog.
+    """
+    rng = random.Random(seed)
+    catalog = []
+    for i in range(n_entries):
+        name = "".join(rng.choice(_PLACE_SYLLABLES) for _ in range(3)) + f"{i}"
+        lon = round(rng.uniform(129.0, 145.0), 3)
+        lat = round(rng.uniform(31.0, 45.0), 3)
+        size = round(rng.uniform(0.05, 0.8), 3)
+        aliases = [name] + [
+            f"{name} {_PLACE_SUFFIXES[k % len(_PLACE_SUFFIXES)]}" for k in range(aliases_per_entry - 1)
+        ]
+        catalog.append({
+            "id": f"{name}_{i}",
+            "bbox": [lon, lat, round(lon + size, 3), round(lat + size, 3)],
+            "note": f"Synthetic AOI {i}",
+            "aliases": aliases,
+        })
+    return catalog
@@ -1,22 +1,101 @@
 # src/capstone/tools/__init__.py
 
-from .stac_search import (
-    search_satellite_scenes,
-    SEARCH_STAC_SCENES_TOOL_SPEC,
-)
+"""
+STAC search tools, clients and caches.
 
+Names are resolved lazily (PEP 562 ``__getattr__``): ``import capstone.tools``
+loads no submodule, and ``from capstone.tools import StacClient`` imports
+only ``stac_client`` and what it needs. Heavy dependencies (pandas, httpx,
+shapely) are therefore paid for by the code paths that use them.
+"""
 
-# LLM に渡すための「ツール仕様」一覧（読み取り専用のメタデータ）
-TOOL_SPECS = [
-    SEARCH_STAC_SCENES_TOOL_SPEC,
-]
+import importlib
+import threading
 
-
-# 実行時に使う「ツール関数」のレジストリ
-TOOL_REGISTRY = {
-    "search_stac_scenes": search_satellite_scenes,
+# 公開名 -> 定義しているサブモジュール。初回アクセス時に import してモジュールの globals に載せる
+_LAZY_ATTRS = {
+    "AsyncStacClient": "stac_async",
+    "close_default_async_client": "stac_async",
+    "configure_default_async_client": "stac_async",
+    "iter_satellite_scenes_async": "stac_async",
+    "search_satellite_scenes_async": "stac_async",
+    "search_satellite_scenes_tool": "stac_async",
+    "SceneTable": "scene_table",
+    "MemoryCache": "stac_cache",
+    "SQLiteCache": "stac_cache",
+    "get_search_cache": "stac_cache",
+    "set_search_cache": "stac_cache",
+    "BackendRegistry": "stac_backends",
+    "StacBackend": "stac_backends",
+    "get_backend_registry": "stac_backends",
+    "set_backend_registry": "stac_backends",
+    "AsyncCassetteStacClient": "stac_cassette",
+    "Cassette": "stac_cassette",
+    "CassetteMissError": "stac_cassette",
+    "CassetteStacClient": "stac_cassette",
+    "StacClient": "stac_client",
+    "get_default_client": "stac_client",
+    "set_default_client": "stac_client",
+    "fanout_search": "stac_fanout",
+    "fanout_search_async": "stac_fanout",
+    "plan_subqueries": "stac_fanout",
+    "StacMirror": "stac_mirror",
+    "get_mirror": "stac_mirror",
+    "set_mirror": "stac_mirror",
+    "CircuitOpenError": "stac_resilience",
+    "configure_endpoint": "stac_resilience",
+    "iter_satellite_scenes": "stac_search",
+    "search_satellite_scenes": "stac_search",
+    "sort_scenes": "stac_search",
+    "top_scenes": "stac_search",
+    "SEARCH_STAC_SCENES_TOOL_SPEC": "stac_search",
+    "Subscription": "stac_subscriptions",
+    "SubscriptionStore": "stac_subscriptions",
+    "check_subscriptions": "stac_subscriptions",
 }
 
+# 公開名を持たないサブモジュールも capstone.tools.<name> で引けるようにする（従来は import 時に載っていた）
+_SUBMODULES = frozenset(_LAZY_ATTRS.values()) | {"stac_footprint", "stac_singleflight"}
+
+__all__ = [*_LAZY_ATTRS, "TOOL_SPECS", "TOOL_REGISTRY", "register_tool", "get_tool_specs", "get_tool_callable"]
+
+
+# LLM に渡すための「ツール仕様」一覧（読み取り専用のメタデータ）と、実行時に使う「ツール関数」のレジストリ。
+# 組み込みの検索ツールは stac_search の import を伴うので、TOOL_SPECS / TOOL_REGISTRY への初回アクセス時に登録する
+_tool_specs: list | None = None
+_tool_registry: dict | None = None
+_tools_lock = threading.Lock()
+
+
+def _tools() -> tuple[list, dict]:
+    global _tool_specs, _tool_registry
+    if _tool_registry is None:
+        with _tools_lock:
+            if _tool_registry is None:
+                from .stac_search import SEARCH_STAC_SCENES_TOOL_SPEC, search_satellite_scenes
+
+                _tool_specs = [SEARCH_STAC_SCENES_TOOL_SPEC]
+                _tool_registry = {SEARCH_STAC_SCENES_TOOL_SPEC["name"]: search_satellite_scenes}
+    return _tool_specs, _tool_registry
+
+
+def register_tool(spec: dict, func, replace: bool = False) -> None:
+    """
+    Register a tool under ``spec["name"]`` (e.g. a search bound to another backend).
+
+    Registering an existing name is a configuration error unless
+    ``replace=True``, in which case the spec and callable are swapped in place.
+    """
+    specs, registry = _tools()
+    name = spec["name"]
+    if name in registry:
+        if not replace:
+            raise ValueError(f"Tool already registered: {name}")
+        specs[:] = [spec if s["name"] == name else s for s in specs]
+    else:
+        specs.append(spec)
+    registry[name] = func
+
 
 def get_tool_specs():
     """
@@ -24,7 +103,7 @@ def get_tool_specs():
 
     この関数を経由しておくと、将来フィルタや変換を挟むときにも楽です。
     """
-    return TOOL_SPECS
+    return _tools()[0]
 
 
 def get_tool_callable(name: str):
@@ -34,6 +113,27 @@ def get_tool_callable(name: str):
     Unknown names should be treated as configuration errors.
     """
     try:
-        return TOOL_REGISTRY[name]
+        return _tools()[1][name]
     except KeyError as exc:
         raise KeyError(f"Unknown tool name: {name}") from exc
+
+
+def __getattr__(name: str):
+    if name == "TOOL_SPECS":
+        return _tools()[0]
+    if name == "TOOL_REGISTRY":
+        return _tools()[1]
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    try:
+        module = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    # 2 回目以降は通常の属性アクセスで済むようにキャッシュする
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | _SUBMODULES)
@@ -0,0 +1,229 @@
+# src/capstone/tools/scene_table.py
+
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+
+TABLE_HEADER = "| id | datetime (UTC) | cloud_cover (%) | preview_url |\n| --- | --- | --- | --- |"
+
+def _cell(value) -> str:
+    if value is None or value == "":
+        return "-"
+    text = str(value)
+    if "|" in text or "\n" in text:
+        text = text.replace("|", "\\|").replace("\n", " ")
+    return text
+
+
+def _text_column(values: np.ndarray) -> list[str]:
+    return [_cell(v) for v in values.tolist()]
+
+
+def _parse_datetimes(values: np.ndarray) -> np.ndarray:
+    # タイムゾーン付き ISO 8601 をまとめて UTC に変換し、naive な datetime64[ns] で持つ
+    parsed = pd.to_datetime(pd.Series(values, dtype=object), utc=True, format="ISO8601", errors="coerce")
+    return parsed.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+class SceneTable:
+    """
+    Columnar form of the scene records returned by ``search_satellite_scenes``.
+
+    Each field is one numpy array: ``ids``, ``datetimes`` (the original ISO
+    strings, kept for display), ``timestamps`` (parsed, UTC ``datetime64[ns]``,
+    NaT when missing or unparseable), ``cloud_cover`` (float64, NaN when
+    missing) and ``preview_urls``. Sorting, top-k and filtering work on the
+    arrays and return new tables; ``to_rows`` gives back the list-of-dict form.
+    """
+
+    __slots__ = ("ids", "datetimes", "timestamps", "cloud_cover", "preview_urls")
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        datetimes: np.ndarray,
+        timestamps: np.ndarray,
+        cloud_cover: np.ndarray,
+        preview_urls: np.ndarray,
+    ):
+        n = len(ids)
+        if not all(len(col) == n for col in (datetimes, timestamps, cloud_cover, preview_urls)):
+            raise ValueError("SceneTable columns must all have the same length")
+        self.ids = ids
+        self.datetimes = datetimes
+        self.timestamps = timestamps
+        self.cloud_cover = cloud_cover
+        self.preview_urls = preview_urls
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "SceneTable":
+        """
+        Build a table from ``normalize_feature`` records (``id``, ``datetime``,
+        ``cloud_cover``, ``preview_url``).
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        n = len(rows)
+        ids = np.empty(n, dtype=object)
+        datetimes = np.empty(n, dtype=object)
+        preview_urls = np.empty(n, dtype=object)
+        ids[:] = [r.get("id") for r in rows]
+        datetimes[:] = [r.get("datetime") for r in rows]
+        preview_urls[:] = [r.get("preview_url") for r in rows]
+        cloud_cover = np.array(
+            [np.nan if r.get("cloud_cover") is None else r["cloud_cover"] for r in rows], dtype=float
+        )
+        timestamps = _parse_datetimes(datetimes) if n else np.empty(0, dtype="datetime64[ns]")
+        return cls(ids, datetimes, timestamps, cloud_cover, preview_urls)
+
+    # ---- row view ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _row(self, i: int) -> dict:
+        cloud = self.cloud_cover[i]
+        return {
+            "id": self.ids[i],
+            "datetime": self.datetimes[i],
+            "cloud_cover": None if np.isnan(cloud) else float(cloud),
+            "preview_url": self.preview_urls[i],
+        }
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Union[dict, "SceneTable"]:
+        """
+        ``table[i]`` is one row as a dict; slices, index arrays and boolean
+        masks select a sub-table.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self._row(range(len(self))[key])
+        return self.take(key)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self._row(i) for i in range(len(self)))
+
+    def to_rows(self) -> list[dict]:
+        """
+        Return the records in the list-of-dict form used by the tools.
+        """
+        return list(self)
+
+    # ---- selection --------------------------------------------------------
+
+    def take(self, index: Union[slice, np.ndarray, list]) -> "SceneTable":
+        """
+        Select rows by slice, integer positions or boolean mask.
+        """
+        return SceneTable(
+            self.ids[index],
+            self.datetimes[index],
+            self.timestamps[index],
+            self.cloud_cover[index],
+            self.preview_urls[index],
+        )
+
+    def _order_keys(self) -> tuple[np.ndarray, np.ndarray]:
+        # sort_scenes と同じ順序: 雲量の少ない順（欠損は最後）→ 新しい順（日時不明は 1970 扱い）
+        cloud = np.where(np.isnan(self.cloud_cover), np.inf, self.cloud_cover)
+        ts = self.timestamps.view("int64").astype(float)
+        ts[np.isnat(self.timestamps)] = 0.0
+        return cloud, -ts
+
+    def argsort(self) -> np.ndarray:
+        """
+        Positions in ``sort_scenes`` order (stable: ties keep their input order).
+        """
+        cloud, neg_ts = self._order_keys()
+        return np.lexsort((neg_ts, cloud))
+
+    def sort(self) -> "SceneTable":
+        """
+        Sort by lowest cloud cover first, then most recent datetime.
+        """
+        return self.take(self.argsort())
+
+    def top_k(self, k: int = 5) -> "SceneTable":
+        """
+        Return the ``k`` best scenes in sorted order (same result as ``top_scenes``).
+
+        Only the rows whose cloud cover is within the k-th smallest value are
+        fully sorted, so this stays cheap on large tables.
+        """
+        if k <= 0:
+            return self.take(slice(0, 0))
+        if k >= len(self):
+            return self.sort()
+        cloud, neg_ts = self._order_keys()
+        kth = np.partition(cloud, k - 1)[k - 1]
+        candidates = np.flatnonzero(cloud <= kth)
+        order = np.lexsort((neg_ts[candidates], cloud[candidates]))
+        return self.take(candidates[order[:k]])
+
+    def filter(
+        self,
+        mask: Optional[np.ndarray] = None,
+        *,
+        max_cloud_cover: Optional[float] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> "SceneTable":
+        """
+        Keep rows matching every given condition.
+
+        Args:
+            mask: Boolean array over the rows.
+            max_cloud_cover: Upper bound (inclusive); rows without cloud cover are dropped.
+            start, end: Inclusive ISO 8601 bounds on the scene datetime (UTC);
+                rows without a datetime are dropped.
+        """
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool).copy()
+        if max_cloud_cover is not None:
+            keep &= self.cloud_cover <= max_cloud_cover
+        for bound, op in ((start, np.greater_equal), (end, np.less_equal)):
+            if bound is not None:
+                ts = pd.Timestamp(bound)
+                ts = ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo else ts
+                keep &= op(self.timestamps, ts.to_datetime64()) & ~np.isnat(self.timestamps)
+        return self.take(keep)
+
+    # ---- output -----------------------------------------------------------
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Return the table as a DataFrame without copying the numeric columns.
+
+        ``datetime`` holds the parsed UTC timestamps (naive ``datetime64[ns]``)
+        and ``cloud_cover`` the float column; both share memory with the table.
+        """
+        return pd.DataFrame(
+            {
+                "id": self.ids,
+                "datetime": self.timestamps,
+                "cloud_cover": self.cloud_cover,
+                "preview_url": self.preview_urls,
+            },
+            copy=False,
+        )
+
+    def to_markdown(self, limit: Optional[int] = None) -> str:
+        """
+        Render rows in the markdown table format the system prompt prescribes.
+
+        Missing values are shown as "-" and "|" inside values is escaped.
+        """
+        n = len(self) if limit is None else min(limit, len(self))
+        lines = [TABLE_HEADER]
+        # 列ごとに文字列化してから 1 行に組み立てる（NaN の雲量は "-"）
+        cloud = ["-" if c != c else str(c) for c in self.cloud_cover[:n].tolist()]
+        lines.extend(
+            f"| {i} | {d} | {c} | {u} |"
+            for i, d, c, u in zip(
+                _text_column(self.ids[:n]), _text_column(self.datetimes[:n]), cloud,
+                _text_column(self.preview_urls[:n]),
+            )
+        )
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"SceneTable({len(self)} scenes)"
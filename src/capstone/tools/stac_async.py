@@ -0,0 +1,420 @@
+# src/capstone/tools/stac_async.py
+
+import asyncio
+import functools
+import inspect
+import weakref
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from capstone.aoi.aoi_catalog import geometry_for_bbox
+
+from .stac_cache import lookup_search, store_search
+from .stac_client import (
+    BASE_URL,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    RETRY_STATUS_CODES,
+    backoff_delay,
+    next_link,
+    parse_search_extensions,
+)
+from .stac_footprint import filter_features, prepare_footprint
+from .stac_mirror import lookup_mirror
+from .stac_resilience import CircuitOpenError, endpoint_guard
+from .stac_search import (
+    DEFAULT_PAGE_SIZE,
+    EXTENSION_KEYS,
+    apply_search_extensions,
+    build_search_payload,
+    normalize_feature,
+    sort_scenes,
+)
+from .stac_singleflight import AsyncSingleFlight, request_key
+
+
+class AsyncStacClient:
+    """
+    asyncio counterpart of ``StacClient`` built on a pooled ``httpx.AsyncClient``.
+
+    All coroutines running on one event loop share the same keep-alive
+    connection pool, so concurrent agent sessions neither block the loop nor
+    pay a handshake per search. Retries with exponential backoff on
+    connection errors and 429/5xx, honouring ``Retry-After``.
+
+    Args:
+        base_url, pool_size, timeout, max_retries, backoff_factor, coalesce:
+            Same meaning as for ``StacClient``; identical requests from
+            concurrent coroutines share one in-flight request. The endpoint's
+            rate limiter and circuit breaker are shared with sync clients.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        coalesce: bool = True,
+    ):
+        if pool_size <= 0:
+            raise ValueError(f"pool_size must be positive, got: {pool_size}")
+
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            http_timeout = httpx.Timeout(read, connect=connect)
+        else:
+            http_timeout = httpx.Timeout(timeout)
+
+        self._client = httpx.AsyncClient(
+            timeout=http_timeout,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+            ),
+            headers={"Accept": "application/geo+json, application/json"},
+        )
+        self._extensions: Optional[frozenset[str]] = None
+        self.single_flight: Optional[AsyncSingleFlight] = AsyncSingleFlight() if coalesce else None
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}/search"
+
+    async def request_json(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        """
+        Send one request through the pooled client and return the decoded JSON body.
+
+        Like ``StacClient.request_json``, joins an identical request already
+        in flight; the returned page may be shared and must not be mutated.
+
+        Raises:
+            httpx.HTTPError: on connection errors, timeouts or non-2xx
+                responses after retries are exhausted.
+        """
+        if self.single_flight is None:
+            return await self._send(method, url, body)
+        return await self.single_flight.do(
+            request_key(method, url, body), lambda: self._send(method, url, body)
+        )
+
+    async def _send(self, method: str, url: str, body: Optional[dict]) -> dict:
+        guard = endpoint_guard(self.base_url)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            guard.breaker.before_call()
+            if guard.limiter is not None:
+                await asyncio.sleep(guard.limiter.reserve())
+            try:
+                response = await self._client.request(method, url, json=body)
+            except httpx.TransportError:
+                guard.breaker.record_failure()
+                if last_attempt:
+                    raise
+                await asyncio.sleep(backoff_delay(self.backoff_factor, attempt))
+                continue
+            except BaseException:
+                guard.breaker.release()
+                raise
+
+            if response.status_code in RETRY_STATUS_CODES:
+                guard.breaker.record_failure()
+                if not last_attempt:
+                    retry_after = response.headers.get("Retry-After")
+                    await asyncio.sleep(backoff_delay(self.backoff_factor, attempt, retry_after))
+                    continue
+            else:
+                guard.breaker.record_success()
+
+            response.raise_for_status()
+            return response.json()
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def post_search(self, payload: dict) -> dict:
+        return await self.request_json("POST", self.search_url, payload)
+
+    async def iter_pages(self, payload: dict) -> AsyncIterator[dict]:
+        """
+        Async version of ``StacClient.iter_pages``: follow ``next`` links lazily.
+        """
+        pages = self.follow_pages(payload, await self.post_search(payload))
+        try:
+            async for page in pages:
+                yield page
+        finally:
+            await pages.aclose()
+
+    async def follow_pages(self, payload: dict, page: dict) -> AsyncIterator[dict]:
+        """
+        Async version of ``StacClient.follow_pages``.
+        """
+        while True:
+            yield page
+            link = next_link(page)
+            if link is None:
+                return
+            method = link.get("method", "GET").upper()
+            if method == "POST":
+                body = link.get("body") or {}
+                if link.get("merge"):
+                    body = {**payload, **body}
+                page = await self.request_json("POST", link["href"], body)
+            else:
+                page = await self.request_json("GET", link["href"])
+
+    async def search_extensions(self) -> frozenset[str]:
+        """
+        Async version of ``StacClient.search_extensions`` (fetched once per client).
+        """
+        if self._extensions is None:
+            try:
+                landing = await self.request_json("GET", self.base_url + "/")
+                conforms_to = landing.get("conformsTo") or []
+            except CircuitOpenError:
+                return frozenset()
+            except (httpx.HTTPError, ValueError):
+                conforms_to = []
+            self._extensions = parse_search_extensions(conforms_to)
+        return self._extensions
+
+    def disable_search_extensions(self) -> None:
+        self._extensions = frozenset()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncStacClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# httpx.AsyncClient はイベントループに紐づくため、共有クライアントはループごとに持つ
+_default_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncStacClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_client_settings: dict = {}
+_client_factory: Optional[Callable[..., AsyncStacClient]] = None
+
+
+def get_default_async_client() -> AsyncStacClient:
+    """
+    Return the shared async STAC client for the running event loop.
+
+    Built by the factory given to ``configure_default_async_client`` if any;
+    otherwise routed over the backend registry when one is configured,
+    unless an explicit ``base_url`` was set.
+    """
+    loop = asyncio.get_running_loop()
+    client = _default_clients.get(loop)
+    if client is None:
+        from .stac_backends import AsyncRoutedStacClient, get_backend_registry
+
+        registry = get_backend_registry()
+        if _client_factory is not None:
+            client = _client_factory(**_client_settings)
+        elif registry is not None and "base_url" not in _client_settings:
+            client = AsyncRoutedStacClient(registry, **_client_settings)
+        else:
+            client = AsyncStacClient(**_client_settings)
+        _default_clients[loop] = client
+    return client
+
+
+async def close_default_async_client() -> None:
+    """
+    Close the running loop's shared async client, if one was created.
+
+    Call this before a loop started with ``asyncio.run`` finishes: once the
+    loop is closed, the client's pooled connections can no longer be closed.
+    """
+    client = _default_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def configure_default_async_client(
+    client_factory: Optional[Callable[..., AsyncStacClient]] = None, **settings
+) -> None:
+    """
+    Set constructor arguments (base_url, pool_size, ...) for shared async clients.
+
+    ``client_factory`` replaces the client class (e.g. a cassette-backed
+    client); it is called with ``settings`` once per event loop. Clients
+    already created for running loops are dropped and rebuilt lazily.
+    """
+    global _client_factory
+    _client_factory = client_factory
+    _client_settings.clear()
+    _client_settings.update(settings)
+    _default_clients.clear()
+
+
+async def iter_satellite_scenes_async(
+    bbox: list[float],
+    datetime_range: str,
+    cloud_cover_max: float,
+    collections: Optional[list[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_items: Optional[int] = None,
+) -> AsyncIterator[dict]:
+    """
+    Async version of ``iter_satellite_scenes``.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    if max_items is not None:
+        page_size = min(page_size, max_items)
+
+    client = get_default_async_client()
+    payload = apply_search_extensions(
+        build_search_payload(bbox, datetime_range, cloud_cover_max, page_size, collections),
+        await client.search_extensions(),
+    )
+    async for row in _iter_rows(client, payload, max_items):
+        yield row
+
+
+def _rejected_extensions(error: httpx.HTTPError, payload: dict) -> bool:
+    return (
+        isinstance(error, httpx.HTTPStatusError)
+        and error.response.status_code == 400
+        and any(key in payload for key in EXTENSION_KEYS)
+    )
+
+
+async def _iter_rows(
+    client: AsyncStacClient, payload: dict, max_items: Optional[int], footprint=None
+) -> AsyncIterator[dict]:
+    pages = client.iter_pages(payload)
+    yielded = 0
+    try:
+        while True:
+            try:
+                page = await pages.__anext__()
+            except StopAsyncIteration:
+                return
+            except httpx.HTTPError as e:
+                if yielded == 0 and _rejected_extensions(e, payload):
+                    client.disable_search_extensions()
+                    payload = {k: v for k, v in payload.items() if k not in EXTENSION_KEYS}
+                    await pages.aclose()
+                    pages = client.iter_pages(payload)
+                    continue
+                raise RuntimeError(f"STAC search request failed: {e}, payload={payload}") from e
+
+            for feat in filter_features(page.get("features", []), footprint):
+                yield normalize_feature(feat)
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+    finally:
+        await pages.aclose()
+
+
+async def search_satellite_scenes_async(
+    bbox: list[float],
+    datetime_range: str,
+    cloud_cover_max: float,
+    limit: int = 10,
+    collections: Optional[list[str]] = None,
+    intersects: Optional[dict] = None,
+    fanout: Optional[bool] = None,
+) -> list[dict]:
+    """
+    Search satellite scenes via the Element84 Earth Search v1 STAC API.
+
+    Non-blocking version of ``search_satellite_scenes`` for the asyncio-based
+    ADK runner: the HTTP round trip is awaited on a shared connection pool, so
+    other sessions keep running while a search is in flight. Uses the same
+    ``fields`` / ``sortby`` negotiation, polygon refinement and response cache
+    as the synchronous tool, and returns rows ordered by lowest cloud cover,
+    then most recent.
+
+    Args:
+        bbox:
+            Spatial search extent as [min_lon, min_lat, max_lon, max_lat].
+        datetime_range:
+            Temporal filter in STAC "interval" format:
+            "YYYY-MM-DDTHH:MM:SSZ/YYYY-MM-DDTHH:MM:SSZ". Several separate
+            intervals (e.g. the same season in several years) may be joined
+            with commas; wide requests fan out as in the synchronous tool.
+        cloud_cover_max:
+            Maximum allowed cloud cover (percent, inclusive).
+        limit:
+            Maximum number of scenes to return.
+        collections:
+            List of STAC collection IDs to search.
+            If None, defaults to ["sentinel-2-l2a"].
+
+    Returns:
+        List[Dict]: A list of records, each with at least:
+            - "id"          (str): STAC item ID.
+            - "datetime"    (str | None): Acquisition datetime (ISO 8601).
+            - "cloud_cover" (float | None): Cloud cover percentage.
+            - "preview_url" (str | None): URL of a quick-look/thumbnail image.
+    """
+    from .stac_fanout import fanout_search_async, should_fan_out
+
+    client = get_default_async_client()
+    if should_fan_out(datetime_range, "sort" in await client.search_extensions(), fanout):
+        return await fanout_search_async(bbox, datetime_range, cloud_cover_max, limit, collections, intersects=intersects)
+
+    if intersects is None:
+        intersects = geometry_for_bbox(bbox)
+    payload = apply_search_extensions(
+        build_search_payload(bbox, datetime_range, cloud_cover_max, limit, collections, intersects),
+        await client.search_extensions(),
+    )
+
+    cached = lookup_search(payload)
+    if cached is not None:
+        return cached
+
+    # ミラーはローカル SQLite への数 ms の問い合わせなので、そのままループ上で引く
+    mirrored = lookup_mirror(bbox, datetime_range, cloud_cover_max, limit, collections, intersects)
+    if mirrored is not None:
+        return mirrored
+
+    footprint = prepare_footprint(intersects) if intersects is not None else None
+    page_payload = dict(payload, limit=min(limit, DEFAULT_PAGE_SIZE))
+    try:
+        rows = sort_scenes([row async for row in _iter_rows(client, page_payload, limit, footprint)])
+    except CircuitOpenError:
+        stale = lookup_search(payload, stale=True)
+        if stale is None:
+            raise
+        return stale
+    return store_search(payload, rows)
+
+
+def _tool_alias(func, name: str, hidden: tuple[str, ...] = ()):
+    # ADK は関数名をそのままツール名にするため、別名のラッパーを作って名前だけ差し替える
+    @functools.wraps(func)
+    async def tool(*args, **kwargs):
+        return await func(*args, **kwargs)
+
+    tool.__name__ = name
+    tool.__qualname__ = name
+    # hidden の引数は LLM 向けのスキーマに出さない（ADK は inspect.signature を読む）
+    signature = inspect.signature(func)
+    tool.__signature__ = signature.replace(
+        parameters=[p for p in signature.parameters.values() if p.name not in hidden]
+    )
+    return tool
+
+
+# エージェントに登録する非同期ツール。LLM やeval の軌跡からは同期版と同じ名前・引数に見える
+search_satellite_scenes_tool = _tool_alias(
+    search_satellite_scenes_async, "search_satellite_scenes", hidden=("intersects", "fanout")
+)
@@ -0,0 +1,424 @@
+# src/capstone/tools/stac_backends.py
+
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+import httpx
+import requests
+
+from .stac_async import AsyncStacClient
+from .stac_client import DEFAULT_POOL_SIZE, StacClient
+from .stac_resilience import OPEN, CircuitOpenError, configure_endpoint, endpoint_guard
+
+
+DEFAULT_EWMA_ALPHA = 0.3
+ANY_COLLECTION = "*"
+
+
+@dataclass
+class StacBackend:
+    """
+    One STAC API endpoint and the collections it serves.
+
+    Attributes:
+        name: Short label used in metrics and logs.
+        url: Root URL of the STAC API (without "/search").
+        collections: Collection IDs served; ``["*"]`` means any collection.
+    """
+
+    name: str
+    url: str
+    collections: list[str] = field(default_factory=lambda: [ANY_COLLECTION])
+
+    def serves(self, collections: Optional[Iterable[str]]) -> bool:
+        if ANY_COLLECTION in self.collections or not collections:
+            return True
+        return set(collections) <= set(self.collections)
+
+
+class LatencyTracker:
+    """
+    Exponentially weighted moving average of response time per backend.
+    """
+
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA):
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got: {alpha}")
+        self.alpha = alpha
+        self._ewma: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._ewma.get(name)
+            self._ewma[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def estimate(self, name: str) -> Optional[float]:
+        with self._lock:
+            return self._ewma.get(name)
+
+
+@dataclass
+class RoutingStats:
+    searches: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    failovers: int = 0
+    wins: dict[str, int] = field(default_factory=dict)
+
+
+class BackendRegistry:
+    """
+    Maps collections to STAC endpoints and orders them by health and latency.
+
+    Args:
+        backends: Endpoints, in preference order for ties.
+        hedge_after: Seconds to wait for the first endpoint before sending
+            the same search to the next one as well (None disables hedging).
+        ewma_alpha: Smoothing factor of the latency EWMA.
+    """
+
+    def __init__(
+        self,
+        backends: list[StacBackend],
+        hedge_after: Optional[float] = None,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+    ):
+        if not backends:
+            raise ValueError("at least one STAC backend is required")
+        names = [b.name for b in backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"backend names must be unique, got: {names}")
+        if hedge_after is not None and hedge_after < 0:
+            raise ValueError(f"hedge_after must be non-negative, got: {hedge_after}")
+        self.backends = backends
+        self.hedge_after = hedge_after
+        self.latency = LatencyTracker(ewma_alpha)
+
+    @classmethod
+    def from_config(cls, config: dict) -> "BackendRegistry":
+        """
+        Build a registry from a config mapping and apply per-endpoint limits.
+
+        Each backend entry takes ``name``, ``url``, optional ``collections``
+        and optional ``rate`` / ``burst`` / ``failure_threshold`` /
+        ``reset_timeout`` passed to ``stac_resilience.configure_endpoint``.
+        """
+        backends = []
+        for entry in config.get("backends") or []:
+            try:
+                backend = StacBackend(
+                    name=entry["name"],
+                    url=entry["url"].rstrip("/"),
+                    collections=list(entry.get("collections") or [ANY_COLLECTION]),
+                )
+            except KeyError as exc:
+                raise ValueError(f"backend entry is missing {exc.args[0]!r}: {entry}") from exc
+            limits = {
+                key: entry[key] for key in ("rate", "burst", "failure_threshold", "reset_timeout") if key in entry
+            }
+            if limits:
+                configure_endpoint(backend.url, **limits)
+            backends.append(backend)
+        return cls(
+            backends,
+            hedge_after=config.get("hedge_after"),
+            ewma_alpha=config.get("ewma_alpha", DEFAULT_EWMA_ALPHA),
+        )
+
+    @classmethod
+    def from_json(cls, path: str | Path) -> "BackendRegistry":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    def route(self, collections: Optional[Iterable[str]] = None) -> list[StacBackend]:
+        """
+        Return the backends serving ``collections``, best first.
+
+        Endpoints whose circuit is open go last; the rest are ordered by
+        latency EWMA. Backends without observations yet sort first so that
+        every endpoint gets measured.
+
+        Raises:
+            ValueError: if no backend serves the requested collections.
+        """
+        collections = list(collections or [])
+        candidates = [b for b in self.backends if b.serves(collections)]
+        if not candidates:
+            raise ValueError(f"no STAC backend serves collections {collections}")
+
+        def key(item: tuple[int, StacBackend]) -> tuple:
+            index, backend = item
+            unhealthy = endpoint_guard(backend.url).breaker.state == OPEN
+            return (unhealthy, self.latency.estimate(backend.name) or 0.0, index)
+
+        return [b for _, b in sorted(enumerate(candidates), key=key)]
+
+
+# プロセス全体のレジストリ（同期・非同期の既定クライアントで EWMA を共有する）
+_registry: Optional[BackendRegistry] = None
+_registry_configured = False
+_registry_lock = threading.Lock()
+
+
+def get_backend_registry() -> Optional[BackendRegistry]:
+    """
+    Return the process-wide backend registry, or None for the single default endpoint.
+
+    On first use it is loaded from the JSON file named by
+    CAPSTONE_STAC_BACKENDS, if set.
+    """
+    global _registry, _registry_configured
+    if not _registry_configured:
+        with _registry_lock:
+            if not _registry_configured:
+                path = os.environ.get("CAPSTONE_STAC_BACKENDS")
+                _registry = BackendRegistry.from_json(path) if path else None
+                _registry_configured = True
+    return _registry
+
+
+def set_backend_registry(registry: Optional[BackendRegistry]) -> None:
+    """
+    Replace the process-wide backend registry (None: single default endpoint).
+
+    Applies to default clients created afterwards; reset them with
+    ``set_default_client(None)`` / ``configure_default_async_client()``.
+    """
+    global _registry, _registry_configured
+    with _registry_lock:
+        _registry = registry
+        _registry_configured = True
+
+
+def _intersect_extensions(extension_sets: Iterable[frozenset[str]]) -> frozenset[str]:
+    # どのエンドポイントに回っても通るよう、全エンドポイントが宣言した拡張だけを使う
+    result: Optional[frozenset[str]] = None
+    for extensions in extension_sets:
+        result = extensions if result is None else result & extensions
+    return result or frozenset()
+
+
+class RoutedStacClient:
+    """
+    ``StacClient`` look-alike that routes each search to the best backend.
+
+    The first page of a search goes to the fastest healthy endpoint serving
+    its collections. If ``hedge_after`` is set and that endpoint has not
+    answered in time, the search is also sent to the next one and the first
+    answer wins; a failed endpoint is failed over to the next immediately.
+    Later pages follow the ``next`` links of the endpoint that answered.
+    Response times feed the registry's EWMA.
+
+    Args:
+        registry: Backends and routing settings.
+        **client_settings: Passed to each backend's ``StacClient``.
+    """
+
+    def __init__(self, registry: BackendRegistry, **client_settings):
+        self.registry = registry
+        self.stats = RoutingStats()
+        self.clients = {b.name: StacClient(base_url=b.url, **client_settings) for b in registry.backends}
+        # ヘッジで負けた側の応答も待って EWMA に反映するため、スレッドに載せて送る
+        self._executor = ThreadPoolExecutor(
+            max_workers=client_settings.get("pool_size", DEFAULT_POOL_SIZE) * len(registry.backends),
+            thread_name_prefix="stac-route",
+        )
+        self._lock = threading.Lock()
+
+    def _client_for_url(self, url: str) -> StacClient:
+        for client in self.clients.values():
+            if url.startswith(client.base_url):
+                return client
+        return next(iter(self.clients.values()))
+
+    def request_json(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        return self._client_for_url(url).request_json(method, url, body)
+
+    def _timed_post(self, backend: StacBackend, payload: dict) -> dict:
+        t0 = time.perf_counter()
+        page = self.clients[backend.name].post_search(payload)
+        self.registry.latency.observe(backend.name, time.perf_counter() - t0)
+        return page
+
+    def post_search_routed(self, payload: dict) -> tuple[StacBackend, dict]:
+        """
+        Send a search to the routed backends and return (winner, first page).
+
+        Raises:
+            requests.RequestException or CircuitOpenError: the error of the
+                last backend tried, if every candidate failed.
+        """
+        order = iter(self.registry.route(payload.get("collections")))
+        pending = {}
+        error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            backend = next(order, None)
+            if backend is None:
+                return False
+            pending[self._executor.submit(self._timed_post, backend, payload)] = backend
+            return True
+
+        with self._lock:
+            self.stats.searches += 1
+        launch()
+        first = next(iter(pending.values()))
+        hedged = failed = False
+        while pending:
+            # ヘッジは最初のエンドポイントが遅いときに 1 回だけ（失敗時は即フェイルオーバー）
+            timeout = self.registry.hedge_after if not (hedged or failed) else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                if launch():
+                    with self._lock:
+                        self.stats.hedged += 1
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    page = future.result()
+                except (requests.RequestException, CircuitOpenError) as e:
+                    error, failed = e, True
+                    continue
+                with self._lock:
+                    self.stats.wins[backend.name] = self.stats.wins.get(backend.name, 0) + 1
+                    if hedged and backend is not first:
+                        self.stats.hedge_wins += 1
+                return backend, page
+            if not pending and launch():
+                with self._lock:
+                    self.stats.failovers += 1
+        raise error if error is not None else RuntimeError("no STAC backend answered")
+
+    def post_search(self, payload: dict) -> dict:
+        return self.post_search_routed(payload)[1]
+
+    def iter_pages(self, payload: dict) -> Iterator[dict]:
+        backend, page = self.post_search_routed(payload)
+        yield from self.clients[backend.name].follow_pages(payload, page)
+
+    def search_extensions(self) -> frozenset[str]:
+        return _intersect_extensions(c.search_extensions() for c in self.clients.values())
+
+    def disable_search_extensions(self) -> None:
+        for client in self.clients.values():
+            client.disable_search_extensions()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for client in self.clients.values():
+            client.close()
+
+    def __enter__(self) -> "RoutedStacClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AsyncRoutedStacClient:
+    """
+    asyncio counterpart of ``RoutedStacClient``; losing hedged requests are cancelled.
+    """
+
+    def __init__(self, registry: BackendRegistry, **client_settings):
+        self.registry = registry
+        self.stats = RoutingStats()
+        self.clients = {b.name: AsyncStacClient(base_url=b.url, **client_settings) for b in registry.backends}
+
+    def _client_for_url(self, url: str) -> AsyncStacClient:
+        for client in self.clients.values():
+            if url.startswith(client.base_url):
+                return client
+        return next(iter(self.clients.values()))
+
+    async def request_json(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        return await self._client_for_url(url).request_json(method, url, body)
+
+    async def _timed_post(self, backend: StacBackend, payload: dict) -> dict:
+        t0 = time.perf_counter()
+        page = await self.clients[backend.name].post_search(payload)
+        self.registry.latency.observe(backend.name, time.perf_counter() - t0)
+        return page
+
+    async def post_search_routed(self, payload: dict) -> tuple[StacBackend, dict]:
+        """Async version of ``RoutedStacClient.post_search_routed``."""
+        order = iter(self.registry.route(payload.get("collections")))
+        pending: dict[asyncio.Task, StacBackend] = {}
+        error: Optional[BaseException] = None
+
+        def launch() -> bool:
+            backend = next(order, None)
+            if backend is None:
+                return False
+            pending[asyncio.ensure_future(self._timed_post(backend, payload))] = backend
+            return True
+
+        self.stats.searches += 1
+        launch()
+        first = next(iter(pending.values()))
+        hedged = failed = False
+        try:
+            while pending:
+                timeout = self.registry.hedge_after if not (hedged or failed) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    if launch():
+                        self.stats.hedged += 1
+                    continue
+                for task in done:
+                    backend = pending.pop(task)
+                    try:
+                        page = task.result()
+                    except (httpx.HTTPError, CircuitOpenError) as e:
+                        error, failed = e, True
+                        continue
+                    self.stats.wins[backend.name] = self.stats.wins.get(backend.name, 0) + 1
+                    if hedged and backend is not first:
+                        self.stats.hedge_wins += 1
+                    return backend, page
+                if not pending and launch():
+                    self.stats.failovers += 1
+        finally:
+            for task in pending:
+                task.cancel()
+        raise error if error is not None else RuntimeError("no STAC backend answered")
+
+    async def post_search(self, payload: dict) -> dict:
+        return (await self.post_search_routed(payload))[1]
+
+    async def iter_pages(self, payload: dict) -> AsyncIterator[dict]:
+        backend, page = await self.post_search_routed(payload)
+        pages = self.clients[backend.name].follow_pages(payload, page)
+        try:
+            async for page in pages:
+                yield page
+        finally:
+            await pages.aclose()
+
+    async def search_extensions(self) -> frozenset[str]:
+        return _intersect_extensions([await c.search_extensions() for c in self.clients.values()])
+
+    def disable_search_extensions(self) -> None:
+        for client in self.clients.values():
+            client.disable_search_extensions()
+
+    async def aclose(self) -> None:
+        for client in self.clients.values():
+            await client.aclose()
+
+    async def __aenter__(self) -> "AsyncRoutedStacClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
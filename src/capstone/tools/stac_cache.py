@@ -0,0 +1,339 @@
+# src/capstone/tools/stac_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+
+DEFAULT_TTL = 15 * 60  # seconds
+DEFAULT_MAX_ENTRIES = 512
+BBOX_PRECISION = 4  # decimal places (~10 m) when canonicalizing bbox
+
+# 終了日がこれより古い検索は結果が変わらないとみなし、無期限にキャッシュする
+HISTORICAL_SETTLE_DAYS = 30
+
+# set() の ttl 省略時にキャッシュ既定の TTL を使うための目印
+_DEFAULT = object()
+
+
+def canonical_cache_key(payload: dict, bbox_precision: int = BBOX_PRECISION) -> str:
+    """
+    Build a stable cache key for a STAC search payload.
+
+    Collections are sorted, bbox coordinates are rounded to ``bbox_precision``
+    decimals and dict keys are ordered, so semantically identical searches
+    (e.g. the same AOI from ``aoi_catalog.json`` with the same month range)
+    map to the same key regardless of argument order or float noise.
+    """
+    canonical = dict(payload)
+    if "collections" in canonical:
+        canonical["collections"] = sorted(canonical["collections"])
+    if "bbox" in canonical:
+        canonical["bbox"] = [round(float(v), bbox_precision) for v in canonical["bbox"]]
+    text = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def is_historical(
+    datetime_range: str,
+    now: Optional[datetime] = None,
+    settle_days: int = HISTORICAL_SETTLE_DAYS,
+) -> bool:
+    """
+    Return True if the interval ended long enough ago that results can no longer change.
+
+    Open-ended intervals ("2023-01-01T00:00:00Z/..") and unparseable values
+    are never considered historical.
+    """
+    end_text = datetime_range.split("/")[-1].strip()
+    if not end_text or end_text == "..":
+        return False
+    try:
+        end = datetime.fromisoformat(end_text.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return end < now - timedelta(days=settle_days)
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process LRU cache with per-entry TTL.
+
+    Expired entries are reported as misses but kept until they are replaced
+    or evicted, so ``get_stale`` can still serve them while the upstream is
+    down.
+
+    Args:
+        max_entries: Maximum number of entries; the least recently used entry
+            is evicted when exceeded.
+        ttl: Default time-to-live in seconds. None means entries never expire.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: Optional[float] = DEFAULT_TTL):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._data: "OrderedDict[str, tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the entry for ``key`` even if it has expired (None if absent)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key: str, value: Any, ttl: Any = _DEFAULT) -> None:
+        ttl = self.ttl if ttl is _DEFAULT else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    On-disk cache backed by a local SQLite file, with TTL and LRU eviction.
+
+    Values must be JSON-serializable. One connection is shared between
+    threads and guarded by a lock, which is plenty for tool-call rates.
+    Like ``MemoryCache``, expired rows stay readable through ``get_stale``
+    until they are evicted or removed by ``purge_expired``.
+
+    Args:
+        path: SQLite database file (created if missing). ":memory:" also works.
+        max_entries: Maximum number of rows; least recently used rows are evicted.
+        ttl: Default time-to-live in seconds. None means entries never expire.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10_000,
+        ttl: Optional[float] = DEFAULT_TTL,
+    ):
+        if max_entries <= 0:
+            raise ValueError(f"max_entries must be positive, got: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stac_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS stac_cache_accessed ON stac_cache (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        # SQLite 側は壁時計（プロセス再起動をまたぐため monotonic は使えない）
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM stac_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE stac_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Any = _DEFAULT) -> None:
+        ttl = self.ttl if ttl is _DEFAULT else ttl
+        now = time.time()
+        expires_at = None if ttl is None else now + ttl
+        text = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO stac_cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, text, expires_at, now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM stac_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM stac_cache WHERE key IN ("
+                    "SELECT key FROM stac_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats.evictions += overflow
+
+    def get_stale(self, key: str) -> Optional[Any]:
+        """Return the row for ``key`` even if it has expired (None if absent)."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM stac_cache WHERE key = ?", (key,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def purge_expired(self) -> int:
+        """Delete expired rows and return how many were removed."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM stac_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                (time.time(),),
+            )
+            self.stats.expirations += cur.rowcount
+            return cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM stac_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM stac_cache").fetchone()
+        return count
+
+
+# 検索ツールが使うキャッシュ（未設定なら初回アクセス時に生成）
+_search_cache: Any = None
+_search_cache_configured = False
+_search_cache_lock = threading.Lock()
+
+
+def _cache_from_env() -> Any:
+    """
+    Build the default search cache from the environment.
+
+    CAPSTONE_STAC_CACHE_PATH selects the SQLite backend at that path;
+    otherwise an in-process MemoryCache is used.
+    """
+    path = os.environ.get("CAPSTONE_STAC_CACHE_PATH")
+    if path:
+        return SQLiteCache(path)
+    return MemoryCache()
+
+
+def get_search_cache() -> Any:
+    """
+    Return the cache used by ``search_satellite_scenes`` (None if disabled).
+    """
+    global _search_cache, _search_cache_configured
+    if not _search_cache_configured:
+        with _search_cache_lock:
+            if not _search_cache_configured:
+                _search_cache = _cache_from_env()
+                _search_cache_configured = True
+    return _search_cache
+
+
+def set_search_cache(cache: Any) -> None:
+    """
+    Plug in a cache backend for ``search_satellite_scenes``.
+
+    Any object with ``get(key)`` / ``set(key, value, ttl=...)`` works
+    (``MemoryCache``, ``SQLiteCache``, ...). Pass None to disable caching.
+    """
+    global _search_cache, _search_cache_configured
+    with _search_cache_lock:
+        _search_cache = cache
+        _search_cache_configured = True
+
+
+def lookup_search(payload: dict, stale: bool = False) -> Optional[list[dict]]:
+    """
+    Return cached rows for a search payload (a fresh copy), or None on a miss.
+
+    With ``stale=True`` expired entries are returned too (for backends that
+    implement ``get_stale``); used when the endpoint's circuit is open.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return None
+    if stale:
+        get_stale = getattr(cache, "get_stale", None)
+        cached = get_stale(canonical_cache_key(payload)) if get_stale is not None else None
+    else:
+        cached = cache.get(canonical_cache_key(payload))
+    if cached is None:
+        return None
+    # 呼び出し側が結果を書き換えてもキャッシュが汚れないようコピーを返す
+    return [dict(row) for row in cached]
+
+
+def store_search(payload: dict, rows: list[dict]) -> list[dict]:
+    """
+    Cache rows for a search payload and return a copy safe to hand to callers.
+
+    Historical date ranges are stored without expiry.
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return rows
+    key = canonical_cache_key(payload)
+    if is_historical(payload.get("datetime", "")):
+        cache.set(key, rows, ttl=None)
+    else:
+        cache.set(key, rows)
+    return [dict(row) for row in rows]
@@ -0,0 +1,218 @@
+# src/capstone/tools/stac_cassette.py
+
+import gzip
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .stac_async import AsyncStacClient
+from .stac_client import BASE_URL, StacClient
+from .stac_singleflight import request_key
+
+
+REPLAY = "replay"  # 記録済みの応答だけを返し、未記録なら CassetteMissError
+RECORD = "record"  # 常に上流へ送り、応答を記録し直す
+AUTO = "auto"  # 記録済みなら再生し、未記録のものだけ上流へ送って追記する
+CASSETTE_MODES = (REPLAY, RECORD, AUTO)
+
+CASSETTE_VERSION = 1
+
+
+class CassetteMissError(LookupError):
+    """
+    Raised in replay mode for a request that is not in the cassette.
+
+    ``request`` is the short description stored alongside recorded
+    interactions (method and URL, model and turn count, ...), to tell which
+    call needs re-recording.
+    """
+
+    def __init__(self, path: Path, key: str, request: Optional[dict] = None):
+        super().__init__(f"no recorded interaction in {path} for {request or key} (re-record the cassette)")
+        self.path = path
+        self.key = key
+        self.request = request
+
+
+@dataclass
+class CassetteStats:
+    hits: int = 0
+    misses: int = 0
+    recorded: int = 0
+
+
+class Cassette:
+    """
+    Recorded request/response pairs stored in one JSON file.
+
+    Interactions are keyed by a hash of the request, so replay does not
+    depend on call order and concurrent callers are served the same
+    response. A key recorded more than once keeps the latest response.
+    Paths ending in ``.gz`` are gzip-compressed.
+
+    Recorded interactions are written by ``save()``; entries recorded by
+    other processes since the file was loaded are merged, not overwritten.
+
+    Args:
+        path: Cassette file. It does not need to exist in record/auto mode.
+        mode: "replay", "record" or "auto" (see ``CASSETTE_MODES``).
+    """
+
+    def __init__(self, path: str | Path, mode: str = REPLAY):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"mode must be one of {CASSETTE_MODES}, got: {mode!r}")
+        self.path = Path(path)
+        self.mode = mode
+        self.stats = CassetteStats()
+        self.meta: dict = {}
+        self._interactions: dict[str, dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.path.exists():
+            data = self._read()
+            self.meta = data.get("meta", {})
+            self._interactions = data.get("interactions", {})
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def _read(self) -> dict:
+        opener = gzip.open if self.path.suffix == ".gz" else open
+        with opener(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"unsupported cassette version in {self.path}: {data.get('version')}")
+        return data
+
+    def lookup(self, key: str) -> Any:
+        """Return the recorded response for ``key``, or None (always None in record mode)."""
+        if self.mode == RECORD:
+            return None
+        with self._lock:
+            entry = self._interactions.get(key)
+        return None if entry is None else entry["response"]
+
+    def record(self, key: str, response: Any, request: Optional[dict] = None) -> None:
+        with self._lock:
+            self._interactions[key] = {"request": request or {}, "response": response}
+            self.stats.recorded += 1
+            self._dirty = True
+
+    def _before_call(self, key: str, request: Optional[dict]) -> Any:
+        response = self.lookup(key)
+        if response is not None:
+            self.stats.hits += 1
+            return response
+        self.stats.misses += 1
+        if self.mode == REPLAY:
+            raise CassetteMissError(self.path, key, request)
+        return None
+
+    def play(self, key: str, call: Callable[[], Any], request: Optional[dict] = None) -> Any:
+        """
+        Return the recorded response for ``key``, or run ``call()`` and record its result.
+
+        Raises:
+            CassetteMissError: in replay mode when ``key`` was never recorded.
+        """
+        response = self._before_call(key, request)
+        if response is None:
+            response = call()
+            self.record(key, response, request)
+        return response
+
+    async def aplay(self, key: str, call: Callable[[], Awaitable[Any]], request: Optional[dict] = None) -> Any:
+        """Coroutine counterpart of ``play``."""
+        response = self._before_call(key, request)
+        if response is None:
+            response = await call()
+            self.record(key, response, request)
+        return response
+
+    def save(self) -> None:
+        """Write recorded interactions to ``path`` (no-op if nothing was recorded)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            interactions = dict(self._interactions)
+            meta = dict(self.meta)
+            self._dirty = False
+
+        if self.path.exists():
+            # 並列プロセスが同じカセットへ追記している場合に備えて、ディスク上の内容とマージする
+            on_disk = self._read()
+            interactions = {**on_disk.get("interactions", {}), **interactions}
+            meta = {**on_disk.get("meta", {}), **meta}
+
+        data = {"version": CASSETTE_VERSION, "meta": meta, "interactions": interactions}
+        text = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                payload = text.encode("utf-8")
+                # mtime=0 にしておくと、同じ内容のカセットはバイト列も同じになる（diff が出ない）
+                f.write(gzip.compress(payload, mtime=0) if self.path.suffix == ".gz" else payload)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def _interaction(client: Any, cassette: Cassette, method: str, url: str, body: Optional[dict]) -> tuple[str, dict]:
+    # 次ページのリンクは記録時のエンドポイントの絶対 URL なので、ベース URL を外してキーにする
+    for base in (client.base_url, cassette.meta.get("base_url")):
+        if base and url.startswith(base):
+            url = url[len(base):]
+            break
+    return request_key(method, url, body), {"method": method.upper(), "url": url}
+
+
+class CassetteStacClient(StacClient):
+    """
+    ``StacClient`` that records responses to, or replays them from, a cassette.
+
+    Replayed requests never touch the network, the rate limiter or the
+    circuit breaker. Keys are relative to the base URL, so a cassette
+    recorded against one endpoint replays against any ``base_url``; when
+    ``base_url`` is omitted the recorded one is used.
+
+    Args:
+        cassette: Where interactions are read from and recorded to.
+        base_url: STAC API root; defaults to the cassette's recorded endpoint,
+            then to ``stac_client.BASE_URL``.
+        **settings: Other ``StacClient`` arguments (used for live requests).
+    """
+
+    def __init__(self, cassette: Cassette, base_url: Optional[str] = None, **settings):
+        super().__init__(base_url or cassette.meta.get("base_url") or BASE_URL, **settings)
+        self.cassette = cassette
+        cassette.meta.setdefault("base_url", self.base_url)
+
+    def _send(self, method: str, url: str, body: Optional[dict]) -> dict:
+        key, request = _interaction(self, self.cassette, method, url, body)
+        return self.cassette.play(key, lambda: super(CassetteStacClient, self)._send(method, url, body), request)
+
+
+class AsyncCassetteStacClient(AsyncStacClient):
+    """
+    ``AsyncStacClient`` counterpart of ``CassetteStacClient``.
+
+    Uses the same keys, so one cassette serves both the sync and the async
+    search tools.
+    """
+
+    def __init__(self, cassette: Cassette, base_url: Optional[str] = None, **settings):
+        super().__init__(base_url or cassette.meta.get("base_url") or BASE_URL, **settings)
+        self.cassette = cassette
+        cassette.meta.setdefault("base_url", self.base_url)
+
+    async def _send(self, method: str, url: str, body: Optional[dict]) -> dict:
+        key, request = _interaction(self, self.cassette, method, url, body)
+        return await self.cassette.aplay(
+            key, lambda: super(AsyncCassetteStacClient, self)._send(method, url, body), request
+        )
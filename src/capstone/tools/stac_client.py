@@ -0,0 +1,299 @@
+# src/capstone/tools/stac_client.py
+
+import threading
+import time
+from typing import Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .stac_resilience import CircuitOpenError, endpoint_guard
+from .stac_singleflight import SingleFlight, request_key
+
+
+BASE_URL = "https://earth-search.aws.element84.com/v1"
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_TIMEOUT = (5.0, 30.0)  # (connect, read) seconds
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# item-search の拡張のうち、ペイロード削減と並び替えに使うもの
+SEARCH_EXTENSIONS = ("fields", "sort")
+
+
+class StacClient:
+    """
+    Managed HTTP client for a STAC API endpoint.
+
+    Wraps a single ``requests.Session`` with a keep-alive connection pool so
+    that repeated searches reuse TCP/TLS connections instead of paying a new
+    handshake on every call. ``requests.Session`` is safe to share between
+    threads for this usage (one adapter, read-only configuration), so one
+    client can serve all agent sessions in a process.
+
+    Args:
+        base_url:
+            Root URL of the STAC API (without trailing "/search").
+        pool_size:
+            Maximum number of pooled connections kept open per host.
+        timeout:
+            Per-request timeout in seconds, either a single float or a
+            (connect, read) tuple as accepted by ``requests``.
+        max_retries:
+            Number of retries on connection errors and 429/5xx responses.
+        backoff_factor:
+            Exponential backoff factor between retries (``backoff_factor * 2 ** attempt``
+            seconds). ``Retry-After`` headers sent with 429/5xx responses are honoured.
+        coalesce:
+            Share one in-flight request between threads sending an identical
+            request at the same time (see ``SingleFlight``). How many upstream
+            calls this saved is counted in ``single_flight.stats``.
+
+    Every attempt (the first request and each retry) passes the endpoint's
+    rate limiter and circuit breaker (``stac_resilience.endpoint_guard``),
+    shared with all other clients of the same base URL, exactly as in
+    ``AsyncStacClient``. Connection errors, timeouts and 429/5xx responses
+    count as failures; while the circuit is open requests fail fast with
+    ``CircuitOpenError``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        coalesce: bool = True,
+    ):
+        if pool_size <= 0:
+            raise ValueError(f"pool_size must be positive, got: {pool_size}")
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # 再試行はアダプタ（urllib3）ではなく _send で行い、
+        # 試行ごとにブレーカーとレート制限を通す
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0,
+        )
+
+        self._session = requests.Session()
+        self._session.headers.update({"Accept": "application/geo+json, application/json"})
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._extensions: Optional[frozenset[str]] = None
+        self._extensions_lock = threading.Lock()
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if coalesce else None
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}/search"
+
+    def request_json(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        """
+        Send one request through the pooled session and return the decoded JSON body.
+
+        Identical requests already in flight from other threads are joined
+        instead of sent again, so the returned page may be shared: do not
+        mutate it.
+
+        Raises:
+            requests.RequestException: on connection errors, timeouts or
+                non-2xx responses after retries are exhausted.
+        """
+        if self.single_flight is None:
+            return self._send(method, url, body)
+        return self.single_flight.do(request_key(method, url, body), lambda: self._send(method, url, body))
+
+    def _send(self, method: str, url: str, body: Optional[dict]) -> dict:
+        # STAC /search は読み取り専用の POST なので、POST も再試行してよい
+        guard = endpoint_guard(self.base_url)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            guard.breaker.before_call()
+            if guard.limiter is not None:
+                guard.limiter.acquire()
+            try:
+                response = self._session.request(method, url, json=body, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                guard.breaker.record_failure()
+                if last_attempt:
+                    raise
+                time.sleep(backoff_delay(self.backoff_factor, attempt))
+                continue
+            except BaseException:
+                guard.breaker.release()
+                raise
+
+            if response.status_code in RETRY_STATUS_CODES:
+                guard.breaker.record_failure()
+                if not last_attempt:
+                    retry_after = response.headers.get("Retry-After")
+                    response.close()
+                    time.sleep(backoff_delay(self.backoff_factor, attempt, retry_after))
+                    continue
+            else:
+                guard.breaker.record_success()
+
+            response.raise_for_status()
+            return response.json()
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def post_search(self, payload: dict) -> dict:
+        """
+        POST a search payload to the endpoint and return the first result page.
+        """
+        return self.request_json("POST", self.search_url, payload)
+
+    def iter_pages(self, payload: dict) -> Iterator[dict]:
+        """
+        Yield result pages of a search, following ``links[rel=next]`` lazily.
+
+        The next page is only requested when the caller asks for it, so
+        closing the generator (or simply stopping iteration) never issues
+        further requests. Both GET links and POST links with a ``body``
+        (optionally ``merge: true``) from the STAC API paging spec are supported.
+        """
+        yield from self.follow_pages(payload, self.post_search(payload))
+
+    def follow_pages(self, payload: dict, page: dict) -> Iterator[dict]:
+        """
+        Yield ``page`` and the pages after it, following ``next`` links lazily.
+        """
+        while True:
+            yield page
+            link = next_link(page)
+            if link is None:
+                return
+            method = link.get("method", "GET").upper()
+            if method == "POST":
+                body = link.get("body") or {}
+                if link.get("merge"):
+                    body = {**payload, **body}
+                page = self.request_json("POST", link["href"], body)
+            else:
+                page = self.request_json("GET", link["href"])
+
+    def search_extensions(self) -> frozenset[str]:
+        """
+        Return the item-search extensions (of ``SEARCH_EXTENSIONS``) the endpoint advertises.
+
+        The landing page ``conformsTo`` list is fetched once per client and
+        remembered. If it cannot be fetched, no extensions are assumed so that
+        searches fall back to plain STAC requests.
+        """
+        if self._extensions is None:
+            with self._extensions_lock:
+                if self._extensions is None:
+                    try:
+                        landing = self.request_json("GET", self.base_url + "/")
+                        conforms_to = landing.get("conformsTo") or []
+                    except CircuitOpenError:
+                        # 停止中は拡張なしで進め、復旧後にもう一度取りに行く
+                        return frozenset()
+                    except (requests.RequestException, ValueError):
+                        conforms_to = []
+                    self._extensions = parse_search_extensions(conforms_to)
+        return self._extensions
+
+    def disable_search_extensions(self) -> None:
+        """Stop sending extension parameters (e.g. after the endpoint rejected them)."""
+        with self._extensions_lock:
+            self._extensions = frozenset()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._session.close()
+
+    def __enter__(self) -> "StacClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def backoff_delay(backoff_factor: float, attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Seconds to wait before retry number ``attempt + 1``.
+
+    A numeric ``Retry-After`` header value takes precedence over the
+    exponential backoff ``backoff_factor * 2 ** attempt``.
+    """
+    if retry_after is not None:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return backoff_factor * (2 ** attempt)
+
+
+def parse_search_extensions(conforms_to: list[str]) -> frozenset[str]:
+    """
+    Pick the supported ``SEARCH_EXTENSIONS`` out of a ``conformsTo`` list.
+
+    Matches conformance URIs such as
+    "https://api.stacspec.org/v1.0.0/item-search#fields" regardless of version.
+    """
+    found = set()
+    for uri in conforms_to:
+        base, _, fragment = uri.partition("#")
+        if base.rstrip("/").endswith("item-search") and fragment in SEARCH_EXTENSIONS:
+            found.add(fragment)
+    return frozenset(found)
+
+
+def next_link(page: dict) -> Optional[dict]:
+    """
+    Return the ``rel=next`` link of a STAC ItemCollection page, if any.
+    """
+    for link in page.get("links", []) or []:
+        if link.get("rel") == "next" and link.get("href"):
+            return link
+    return None
+
+
+# プロセス全体で共有するデフォルトクライアント（初回アクセス時に生成）
+_default_client: Optional[StacClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> StacClient:
+    """
+    Return the process-wide shared STAC client, creating it on first use.
+
+    If a backend registry is configured (CAPSTONE_STAC_BACKENDS, see
+    ``stac_backends``), this is a ``RoutedStacClient`` over its endpoints.
+    """
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                # stac_backends は StacClient を import するので、ここで遅延 import する
+                from .stac_backends import RoutedStacClient, get_backend_registry
+
+                registry = get_backend_registry()
+                _default_client = RoutedStacClient(registry) if registry is not None else StacClient()
+    return _default_client
+
+
+def set_default_client(client: Optional[StacClient]) -> None:
+    """
+    Replace the process-wide shared STAC client.
+
+    Passing None resets it so that the next ``get_default_client()`` call
+    builds a fresh client with default settings. The previous client is closed.
+    """
+    global _default_client
+    with _default_client_lock:
+        previous, _default_client = _default_client, client
+    if previous is not None and previous is not client:
+        previous.close()
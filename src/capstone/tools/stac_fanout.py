@@ -0,0 +1,362 @@
+# src/capstone/tools/stac_fanout.py
+
+import asyncio
+import math
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+from capstone.aoi.aoi_catalog import geometry_for_bbox
+
+from .stac_search import DEFAULT_COLLECTIONS, search_satellite_scenes, sort_scenes
+
+
+DEFAULT_MAX_WORKERS = 16       # プロセス全体で共有するワーカースレッド数
+DEFAULT_MAX_CONCURRENCY = 4    # 1 リクエストあたり同時に上流へ投げるサブクエリ数
+DEFAULT_TILE_DEG = 10.0
+MAX_SUBQUERIES = 256
+# これより多くの暦月にまたがる 1 区間の検索は、sort 拡張の無いエンドポイントでは検索ツールが
+# 自動でファンアウトする（1 季節 = 3 か月までは 1 回で投げる）
+FANOUT_MIN_MONTHS = 4
+
+
+def split_bbox(bbox: list[float], tile_deg: float = DEFAULT_TILE_DEG) -> list[list[float]]:
+    """
+    Split a bbox into a grid of tiles no larger than ``tile_deg`` degrees per side.
+    """
+    if len(bbox) != 4:
+        raise ValueError(f"bbox must be a sequence of 4 numbers, got: {bbox}")
+    if tile_deg <= 0:
+        raise ValueError(f"tile_deg must be positive, got: {tile_deg}")
+
+    min_lon, min_lat, max_lon, max_lat = bbox
+    nx = max(1, math.ceil((max_lon - min_lon) / tile_deg))
+    ny = max(1, math.ceil((max_lat - min_lat) / tile_deg))
+    dx = (max_lon - min_lon) / nx
+    dy = (max_lat - min_lat) / ny
+
+    tiles = []
+    for j in range(ny):
+        for i in range(nx):
+            tiles.append([
+                min_lon + i * dx,
+                min_lat + j * dy,
+                max_lon if i == nx - 1 else min_lon + (i + 1) * dx,
+                max_lat if j == ny - 1 else min_lat + (j + 1) * dy,
+            ])
+    return tiles
+
+
+def _parse_utc(text: str) -> datetime:
+    dt = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _format_utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    # 月初 0 時に揃えてから months か月進める
+    index = dt.year * 12 + dt.month - 1 + months
+    return dt.replace(year=index // 12, month=index % 12 + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def split_monthly(datetime_range: str, months: int = 1) -> list[str]:
+    """
+    Split a closed STAC interval into calendar-month windows (``months`` months each).
+
+    Open-ended or single-instant values are returned unchanged.
+    """
+    if months <= 0:
+        raise ValueError(f"months must be positive, got: {months}")
+    parts = datetime_range.split("/")
+    if len(parts) != 2 or ".." in parts or not all(p.strip() for p in parts):
+        return [datetime_range]
+
+    start, end = _parse_utc(parts[0]), _parse_utc(parts[1])
+    if start > end:
+        raise ValueError(f"datetime_range start is after end: {datetime_range}")
+
+    windows = []
+    cursor = start
+    while cursor <= end:
+        next_window = _add_months(cursor, months)
+        window_end = min(end, next_window - timedelta(seconds=1))
+        windows.append(f"{_format_utc(cursor)}/{_format_utc(window_end)}")
+        cursor = next_window
+    return windows
+
+
+def datetime_windows(datetime_range: Union[str, list[str]]) -> list[str]:
+    """
+    Return the separate intervals of a request.
+
+    ``datetime_range`` is one STAC interval, several intervals joined by
+    commas ("summer 2021, summer 2022, ..."), or a list of intervals.
+    """
+    ranges = [datetime_range] if isinstance(datetime_range, str) else list(datetime_range)
+    windows = [w.strip() for r in ranges for w in r.split(",") if w.strip()]
+    if not windows:
+        raise ValueError(f"datetime_range must contain at least one interval, got: {datetime_range!r}")
+    return windows
+
+
+def should_fan_out(
+    datetime_range: Union[str, list[str]],
+    sort_supported: bool = False,
+    requested: Optional[bool] = None,
+) -> bool:
+    """
+    True if a search should go through ``fanout_search`` rather than one request.
+
+    Several intervals always fan out (one STAC request can carry only one).
+    A single interval spanning at least ``FANOUT_MIN_MONTHS`` calendar months
+    fans out only when asked for (``requested=True`` or CAPSTONE_FANOUT=1)
+    or when the endpoint lacks the ``sort`` extension: with ``sortby`` one
+    request already returns the exact top ``limit``. CAPSTONE_FANOUT=0 and
+    ``requested=False`` never split a single interval.
+    """
+    windows = datetime_windows(datetime_range)
+    if len(windows) > 1:
+        return True
+    setting = os.environ.get("CAPSTONE_FANOUT")
+    if requested is False or (requested is None and setting == "0"):
+        return False
+    if len(split_monthly(windows[0])) < FANOUT_MIN_MONTHS:
+        return False
+    return bool(requested) or setting == "1" or not sort_supported
+
+
+def plan_subqueries(
+    bbox: list[float],
+    datetime_range: Union[str, list[str]],
+    collections: Optional[list[str]] = None,
+    tile_deg: float = DEFAULT_TILE_DEG,
+    split_months: bool = True,
+    intersects: Optional[dict] = None,
+    max_subqueries: int = MAX_SUBQUERIES,
+) -> list[dict]:
+    """
+    Split one wide search into sub-queries by collection, bbox tile and time window.
+
+    Each interval of ``datetime_range`` (see ``datetime_windows``) is split
+    into calendar months. If that would exceed ``max_subqueries``, the plan is
+    coarsened step by step instead: the tile size or the number of months per
+    window (whichever axis currently has more pieces) is doubled until it fits.
+    With ``intersects``, every tile carries its clip of the polygon and tiles
+    outside the polygon are skipped.
+
+    Returns:
+        List of dicts with "bbox", "datetime_range", "collections" and
+        "intersects" (GeoJSON or None) keys.
+
+    Raises:
+        ValueError: if even one tile and one window per interval exceed
+            ``max_subqueries`` (too many intervals or collections).
+    """
+    # stac_footprint は shapely を読むので、ポリゴンを切り出すときだけ import する
+    from .stac_footprint import clip_geometry
+
+    collections = list(collections or DEFAULT_COLLECTIONS)
+    ranges = datetime_windows(datetime_range)
+    months = 1 if split_months else 0
+    while True:
+        tiles = split_bbox(bbox, tile_deg)
+        windows = [w for r in ranges for w in (split_monthly(r, months) if months else [r])]
+        total = len(collections) * len(tiles) * len(windows)
+        if total <= max_subqueries:
+            break
+        can_grow_tiles = len(tiles) > 1
+        can_merge_months = months > 0 and len(windows) > len(ranges)
+        if not (can_grow_tiles or can_merge_months):
+            raise ValueError(
+                f"fan-out needs at least {total} sub-queries (max {max_subqueries}); "
+                "search fewer intervals or collections at once"
+            )
+        # 分割数の多い軸から粗くする（上限に収まるまでタイルか期間の幅を倍にする）
+        if can_grow_tiles and (not can_merge_months or len(tiles) >= len(windows) / len(ranges)):
+            tile_deg *= 2
+        else:
+            months *= 2
+
+    if intersects is None:
+        clips = [(tile, None) for tile in tiles]
+    else:
+        clips = [(tile, clip) for tile in tiles if (clip := clip_geometry(intersects, tile)) is not None]
+    return [
+        {"bbox": tile, "datetime_range": window, "collections": [collection], "intersects": clip}
+        for collection in collections
+        for tile, clip in clips
+        for window in windows
+    ]
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=DEFAULT_MAX_WORKERS, thread_name_prefix="stac-fanout"
+                )
+    return _executor
+
+
+def fanout_search(
+    bbox: list[float],
+    datetime_range: Union[str, list[str]],
+    cloud_cover_max: float,
+    limit: int = 10,
+    collections: Optional[list[str]] = None,
+    tile_deg: float = DEFAULT_TILE_DEG,
+    split_months: bool = True,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    intersects: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Run a wide search as concurrent sub-queries and merge the results.
+
+    The request is split by collection, bbox tile and time window (see
+    ``plan_subqueries``). Sub-queries run on a shared, bounded worker
+    pool, with at most ``max_concurrency`` of them in flight for this call so
+    that one wide request cannot flood the upstream API. Each sub-query goes
+    through ``search_satellite_scenes`` and therefore reuses the pooled client
+    and the response cache.
+
+    Results are deduplicated by item id (tiles overlap at their edges) and
+    sorted by lowest cloud cover, then most recent datetime.
+
+    Every sub-query asks for ``limit`` scenes. The merge is the exact global
+    top ``limit`` when the endpoint supports the STAC ``sort`` extension
+    (``search_satellite_scenes`` then requests ``sortby`` cloud cover, so
+    each sub-query returns its own lowest-cloud scenes). Against an endpoint
+    without it, each sub-query returns an arbitrary ``limit`` of its matches
+    and the merged result is only approximately the best.
+
+    Args:
+        bbox, cloud_cover_max, collections:
+            Same as ``search_satellite_scenes``.
+        datetime_range:
+            One STAC interval, several joined by commas, or a list of intervals
+            (e.g. the same season in several years).
+        limit:
+            Number of merged scenes to return; also used as the per-sub-query limit.
+        tile_deg:
+            Starting tile size in degrees for the spatial split.
+        split_months:
+            Whether to split the intervals into calendar months.
+        max_concurrency:
+            Maximum sub-queries in flight for this request.
+        intersects:
+            AOI polygon; defaults to the catalog polygon for ``bbox`` (see
+            ``aoi_catalog.geometry_for_bbox``). Each tile is searched with its clip.
+
+    Returns:
+        Up to ``limit`` scene records in the format of ``search_satellite_scenes``.
+    """
+    _check_fanout_args(limit, max_concurrency)
+    if intersects is None:
+        intersects = geometry_for_bbox(bbox)
+    subqueries = plan_subqueries(bbox, datetime_range, collections, tile_deg, split_months, intersects)
+    executor = _get_executor()
+
+    merged: dict[str, dict] = {}
+    pending: set[Future] = set()
+    queue = iter(subqueries)
+
+    def submit_next() -> bool:
+        sub = next(queue, None)
+        if sub is None:
+            return False
+        pending.add(
+            executor.submit(
+                search_satellite_scenes,
+                sub["bbox"],
+                sub["datetime_range"],
+                cloud_cover_max,
+                limit,
+                sub["collections"],
+                sub["intersects"],
+                fanout=False,
+            )
+        )
+        return True
+
+    try:
+        # 同時実行数を max_concurrency に抑えたスライディングウィンドウ
+        for _ in range(max_concurrency):
+            if not submit_next():
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for row in future.result():
+                    merged.setdefault(row["id"], row)
+                submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return sort_scenes(merged.values())[:limit]
+
+
+async def fanout_search_async(
+    bbox: list[float],
+    datetime_range: Union[str, list[str]],
+    cloud_cover_max: float,
+    limit: int = 10,
+    collections: Optional[list[str]] = None,
+    tile_deg: float = DEFAULT_TILE_DEG,
+    split_months: bool = True,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    intersects: Optional[dict] = None,
+) -> list[dict]:
+    """
+    Non-blocking ``fanout_search``: sub-queries run as ``search_satellite_scenes_async`` calls.
+
+    Same planning, merge and ``limit`` semantics as ``fanout_search``; at most
+    ``max_concurrency`` sub-queries of this call are awaited at a time.
+    """
+    # stac_async は stac_fanout を import するので、ここで遅延 import する
+    from .stac_async import search_satellite_scenes_async
+
+    _check_fanout_args(limit, max_concurrency)
+    if intersects is None:
+        intersects = geometry_for_bbox(bbox)
+    subqueries = plan_subqueries(bbox, datetime_range, collections, tile_deg, split_months, intersects)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def one(sub: dict) -> list[dict]:
+        async with semaphore:
+            return await search_satellite_scenes_async(
+                sub["bbox"], sub["datetime_range"], cloud_cover_max, limit,
+                sub["collections"], sub["intersects"], fanout=False,
+            )
+
+    tasks = [asyncio.create_task(one(sub)) for sub in subqueries]
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        # 1 つでも失敗したら、まだ待っているサブクエリは投げずに取り消す（同期版と同じ）
+        for task in tasks:
+            task.cancel()
+
+    merged: dict[str, dict] = {}
+    for rows in results:
+        for row in rows:
+            merged.setdefault(row["id"], row)
+    return sort_scenes(merged.values())[:limit]
+
+
+def _check_fanout_args(limit: int, max_concurrency: int) -> None:
+    if limit <= 0:
+        raise ValueError(f"limit must be positive, got: {limit}")
+    if max_concurrency <= 0:
+        raise ValueError(f"max_concurrency must be positive, got: {max_concurrency}")
@@ -0,0 +1,76 @@
+# src/capstone/tools/stac_footprint.py
+
+from typing import Optional
+
+import numpy as np
+import shapely
+from shapely.geometry import box, mapping, shape
+
+
+def prepare_footprint(geometry: dict) -> shapely.Geometry:
+    """
+    Convert a GeoJSON geometry into a prepared shapely geometry for repeated tests.
+    """
+    geom = shape(geometry)
+    if geom.is_empty or not geom.is_valid:
+        raise ValueError(f"intersects geometry must be a valid, non-empty GeoJSON geometry, got: {geometry}")
+    shapely.prepare(geom)
+    return geom
+
+
+def _bbox_2d(bbox: list[float]) -> list[float]:
+    # 3 次元 bbox [minx, miny, minz, maxx, maxy, maxz] にも対応する
+    half = len(bbox) // 2
+    return [bbox[0], bbox[1], bbox[half], bbox[half + 1]]
+
+
+def footprint_mask(features: list[dict], footprint: shapely.Geometry) -> np.ndarray:
+    """
+    Return a boolean mask of the STAC items whose footprint intersects ``footprint``.
+
+    Items are tested in one vectorized call. An item's GeoJSON ``geometry``
+    is used when present, otherwise its ``bbox`` (the only footprint left
+    when the ``fields`` extension drops geometry). Items with neither are kept.
+    """
+    geoms = np.empty(len(features), dtype=object)
+    known = np.zeros(len(features), dtype=bool)
+
+    # bbox だけの item はまとめて shapely.box で作る
+    bbox_idx = [i for i, f in enumerate(features) if not f.get("geometry") and f.get("bbox")]
+    if bbox_idx:
+        bounds = np.array([_bbox_2d(features[i]["bbox"]) for i in bbox_idx], dtype=float)
+        geoms[bbox_idx] = shapely.box(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+        known[bbox_idx] = True
+    for i, f in enumerate(features):
+        if f.get("geometry"):
+            geoms[i] = shape(f["geometry"])
+            known[i] = True
+
+    mask = np.ones(len(features), dtype=bool)
+    if known.any():
+        mask[known] = shapely.intersects(footprint, geoms[known])
+    return mask
+
+
+def filter_features(features: list[dict], footprint: Optional[shapely.Geometry]) -> list[dict]:
+    """
+    Drop STAC items that do not intersect ``footprint`` (no-op when it is None).
+    """
+    if footprint is None or not features:
+        return features
+    mask = footprint_mask(features, footprint)
+    return [f for f, keep in zip(features, mask) if keep]
+
+
+def clip_geometry(geometry: dict, bbox: list[float]) -> Optional[dict]:
+    """
+    Return the polygonal part of ``geometry`` inside ``bbox`` as GeoJSON, or None if there is none.
+
+    Used to give each fan-out tile its share of an AOI polygon; edges and
+    corners merely touching the tile are dropped.
+    """
+    clipped = shape(geometry).intersection(box(*_bbox_2d(bbox)))
+    polygons = [p for p in shapely.get_parts(clipped) if p.geom_type in ("Polygon", "MultiPolygon") and p.area > 0]
+    if not polygons:
+        return None
+    return mapping(polygons[0] if len(polygons) == 1 else shapely.MultiPolygon(polygons))
@@ -0,0 +1,413 @@
+# src/capstone/tools/stac_mirror.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import shapely
+
+from .stac_cache import is_historical
+from .stac_client import get_default_client
+from .stac_fanout import split_monthly
+from .stac_footprint import footprint_mask, prepare_footprint
+from .stac_search import (
+    DEFAULT_COLLECTIONS,
+    DEFAULT_PAGE_SIZE,
+    SEARCH_FIELDS,
+    normalize_feature,
+    sort_scenes,
+)
+
+
+# 終了していない月（まだ新しい item が増える）の同期結果を信用する時間（秒）
+DEFAULT_MAX_STALENESS = 24 * 60 * 60
+
+# 同期時に fields 拡張で取り寄せる項目（検索結果の列 + フットプリント）
+HARVEST_FIELDS = {
+    "include": [*SEARCH_FIELDS["include"], "collection", "bbox", "geometry"],
+    "exclude": ["links"],
+}
+
+
+def _epoch(text: str) -> float:
+    dt = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _interval(datetime_range: str) -> Optional[tuple[float, float]]:
+    # 閉区間だけ扱う（".." の開区間や単一時刻はミラーでは答えない）
+    parts = datetime_range.split("/")
+    if len(parts) != 2 or ".." in parts:
+        return None
+    try:
+        return _epoch(parts[0]), _epoch(parts[1])
+    except ValueError:
+        return None
+
+
+def _feature_bbox(feat: dict, fallback: list[float]) -> list[float]:
+    bbox = feat.get("bbox")
+    if bbox and len(bbox) >= 4:
+        half = len(bbox) // 2
+        return [bbox[0], bbox[1], bbox[half], bbox[half + 1]]
+    geometry = feat.get("geometry")
+    if geometry:
+        coords = np.array(_flatten_coords(geometry["coordinates"]), dtype=float)
+        return [*coords.min(axis=0)[:2].tolist(), *coords.max(axis=0)[:2].tolist()]
+    return list(fallback)
+
+
+def _flatten_coords(coords) -> list:
+    if coords and isinstance(coords[0], (int, float)):
+        return [coords]
+    return [p for c in coords for p in _flatten_coords(c)]
+
+
+@dataclass
+class SyncStats:
+    """Outcome of one ``StacMirror.sync`` call."""
+
+    windows_synced: int = 0
+    windows_skipped: int = 0
+    items_upserted: int = 0
+    pages: int = 0
+
+
+class StacMirror:
+    """
+    Local SQLite mirror of STAC item metadata with an offline query engine.
+
+    ``sync`` harvests every item (any cloud cover) for a collection, bbox
+    and date range, one calendar month at a time, and records which
+    (collection, bbox, month) windows are present. Months that ended long
+    ago (see ``stac_cache.is_historical``) are harvested once; recent months
+    are re-harvested when their last sync is older than ``max_staleness``.
+
+    ``search`` answers the same parameters as ``search_satellite_scenes``
+    from the local tables (B-tree indexes on collection/datetime and cloud
+    cover, an R*Tree on item footprints) and returns None when the mirror
+    does not fully cover the request, so the caller can fall back to the
+    remote API.
+
+    Args:
+        path: SQLite file (created if missing). ":memory:" also works.
+        max_staleness: Seconds a sync of a not-yet-historical month stays valid.
+            None trusts every synced window indefinitely.
+    """
+
+    def __init__(self, path: str | Path, max_staleness: Optional[float] = DEFAULT_MAX_STALENESS):
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                rowid INTEGER PRIMARY KEY,
+                collection TEXT NOT NULL,
+                id TEXT NOT NULL,
+                datetime TEXT,
+                ts REAL,
+                cloud_cover REAL,
+                preview_url TEXT,
+                geometry TEXT,
+                UNIQUE (collection, id)
+            );
+            CREATE INDEX IF NOT EXISTS items_collection_ts ON items (collection, ts);
+            CREATE INDEX IF NOT EXISTS items_cloud ON items (cloud_cover);
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_rtree USING rtree (
+                rowid, min_lon, max_lon, min_lat, max_lat
+            );
+            CREATE TABLE IF NOT EXISTS coverage (
+                collection TEXT NOT NULL,
+                min_lon REAL NOT NULL,
+                min_lat REAL NOT NULL,
+                max_lon REAL NOT NULL,
+                max_lat REAL NOT NULL,
+                start_ts REAL NOT NULL,
+                end_ts REAL NOT NULL,
+                datetime_range TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (collection, min_lon, min_lat, max_lon, max_lat, start_ts)
+            );
+            """
+        )
+
+    # ---- harvesting -------------------------------------------------------
+
+    def _window_is_fresh(self, collection: str, bbox: list[float], datetime_range: str) -> bool:
+        start, _ = _interval(datetime_range)
+        row = self._conn.execute(
+            "SELECT synced_at, datetime_range FROM coverage WHERE collection = ? AND min_lon = ? "
+            "AND min_lat = ? AND max_lon = ? AND max_lat = ? AND start_ts = ?",
+            (collection, *bbox, start),
+        ).fetchone()
+        if row is None or row[1] != datetime_range:
+            return False
+        return self._trusted(row[0], row[1])
+
+    def _trusted(self, synced_at: float, datetime_range: str) -> bool:
+        if is_historical(datetime_range) or self.max_staleness is None:
+            return True
+        return time.time() - synced_at <= self.max_staleness
+
+    def _upsert(self, feat: dict, collection: str, harvest_bbox: list[float]) -> None:
+        row = normalize_feature(feat)
+        try:
+            ts = _epoch(row["datetime"]) if row["datetime"] else None
+        except ValueError:
+            ts = None
+        geometry = feat.get("geometry")
+        (rowid,) = self._conn.execute(
+            "INSERT INTO items (collection, id, datetime, ts, cloud_cover, preview_url, geometry) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (collection, id) DO UPDATE SET datetime = excluded.datetime, ts = excluded.ts, "
+            "cloud_cover = excluded.cloud_cover, preview_url = excluded.preview_url, "
+            "geometry = excluded.geometry "
+            "RETURNING rowid",
+            (
+                feat.get("collection") or collection, row["id"], row["datetime"], ts,
+                row["cloud_cover"], row["preview_url"],
+                json.dumps(geometry, separators=(",", ":")) if geometry else None,
+            ),
+        ).fetchone()
+        min_lon, min_lat, max_lon, max_lat = _feature_bbox(feat, harvest_bbox)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO items_rtree (rowid, min_lon, max_lon, min_lat, max_lat) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (rowid, min_lon, max_lon, min_lat, max_lat),
+        )
+
+    def sync(
+        self,
+        bbox: list[float],
+        datetime_range: str,
+        collections: Optional[list[str]] = None,
+        client=None,
+        force: bool = False,
+    ) -> SyncStats:
+        """
+        Harvest item metadata for ``bbox`` / ``datetime_range`` into the mirror.
+
+        Only months that are missing, or recent and stale, are requested
+        (``force`` re-harvests everything). Each month is written in one
+        transaction together with its coverage record, so an interrupted
+        sync never leaves a window marked complete with items missing.
+
+        Args:
+            bbox: [min_lon, min_lat, max_lon, max_lat] to harvest.
+            datetime_range: Closed STAC interval "start/end".
+            collections: Collections to harvest (default ``DEFAULT_COLLECTIONS``).
+            client: ``StacClient`` to use (default: the shared client).
+        """
+        if len(bbox) != 4:
+            raise ValueError(f"bbox must be a sequence of 4 numbers, got: {bbox}")
+        if _interval(datetime_range) is None:
+            raise ValueError(f"datetime_range must be a closed interval 'start/end', got: {datetime_range}")
+
+        bbox = [float(v) for v in bbox]
+        client = client or get_default_client()
+        fields = "fields" in client.search_extensions()
+        stats = SyncStats()
+        for collection in collections or DEFAULT_COLLECTIONS:
+            for window in split_monthly(datetime_range):
+                with self._lock:
+                    fresh = not force and self._window_is_fresh(collection, bbox, window)
+                if fresh:
+                    stats.windows_skipped += 1
+                    continue
+
+                payload = {
+                    "collections": [collection],
+                    "bbox": bbox,
+                    "datetime": window,
+                    "limit": DEFAULT_PAGE_SIZE,
+                }
+                if fields:
+                    payload["fields"] = {key: list(value) for key, value in HARVEST_FIELDS.items()}
+                # ネットワーク待ちの間はロックを持たない。書き込みは月ごとにまとめて行う
+                features = []
+                for page in client.iter_pages(payload):
+                    stats.pages += 1
+                    features.extend(page.get("features", []))
+
+                start, end = _interval(window)
+                with self._lock:
+                    self._conn.execute("BEGIN")
+                    try:
+                        for feat in features:
+                            self._upsert(feat, collection, bbox)
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (collection, *bbox, start, end, window, time.time()),
+                        )
+                        self._conn.execute("COMMIT")
+                    except BaseException:
+                        self._conn.execute("ROLLBACK")
+                        raise
+                stats.windows_synced += 1
+                stats.items_upserted += len(features)
+        return stats
+
+    # ---- querying ---------------------------------------------------------
+
+    def covers(self, bbox: list[float], datetime_range: str, collections: Optional[list[str]] = None) -> bool:
+        """
+        Return True if synced, trusted windows cover the whole request.
+        """
+        interval = _interval(datetime_range)
+        if interval is None or len(bbox) != 4:
+            return False
+        start, end = interval
+        with self._lock:
+            for collection in collections or DEFAULT_COLLECTIONS:
+                rows = self._conn.execute(
+                    "SELECT start_ts, end_ts, synced_at, datetime_range FROM coverage "
+                    "WHERE collection = ? AND min_lon <= ? AND min_lat <= ? AND max_lon >= ? AND max_lat >= ? "
+                    "AND end_ts >= ? AND start_ts <= ? ORDER BY start_ts",
+                    (collection, *bbox, start, end),
+                ).fetchall()
+                # 月ウィンドウが隙間なく [start, end] を覆っているか（ウィンドウ端は 1 秒刻み）
+                cursor = start
+                for w_start, w_end, synced_at, window in rows:
+                    if not self._trusted(synced_at, window):
+                        continue
+                    if w_start > cursor + 1:
+                        break
+                    cursor = max(cursor, w_end)
+                    if cursor >= end:
+                        break
+                if cursor < end:
+                    return False
+        return True
+
+    def search(
+        self,
+        bbox: list[float],
+        datetime_range: str,
+        cloud_cover_max: float,
+        limit: int = 10,
+        collections: Optional[list[str]] = None,
+        intersects: Optional[dict] = None,
+    ) -> Optional[list[dict]]:
+        """
+        Answer a ``search_satellite_scenes`` request from the mirror.
+
+        Returns rows in the same format and order as the remote search, or
+        None when the mirror does not cover the request. Like the remote
+        ``/search``, items match by their footprint geometry (against
+        ``intersects``, or the ``bbox`` rectangle without it); the R*Tree
+        on item bboxes is only the prefilter.
+        """
+        collections = list(collections or DEFAULT_COLLECTIONS)
+        if limit <= 0:
+            raise ValueError(f"limit must be positive, got: {limit}")
+        if not self.covers(bbox, datetime_range, collections):
+            return None
+
+        start, end = _interval(datetime_range)
+        placeholders = ",".join("?" * len(collections))
+        query = (
+            "SELECT i.id, i.datetime, i.cloud_cover, i.preview_url, i.geometry, "
+            "r.min_lon, r.min_lat, r.max_lon, r.max_lat "
+            "FROM items_rtree r JOIN items i ON i.rowid = r.rowid "
+            "WHERE r.min_lon <= ? AND r.max_lon >= ? AND r.min_lat <= ? AND r.max_lat >= ? "
+            f"AND i.collection IN ({placeholders}) AND i.ts BETWEEN ? AND ? AND i.cloud_cover <= ? "
+            "ORDER BY i.cloud_cover ASC, i.ts DESC"
+        )
+        params: list[Any] = [bbox[2], bbox[0], bbox[3], bbox[1], *collections, start, end, cloud_cover_max]
+        if intersects is not None:
+            footprint = prepare_footprint(intersects)
+        else:
+            footprint = shapely.box(*bbox)
+            shapely.prepare(footprint)
+
+        # R*Tree は item の bbox での絞り込みまで。フットプリントとの交差はリモート検索と同じく
+        # geometry で判定し、並び順のまま limit 件そろうまで読み進める
+        records: list[tuple] = []
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            while len(records) < limit and (batch := cursor.fetchmany(max(limit, 100))):
+                features = [
+                    {"geometry": json.loads(geom) if geom else None, "bbox": [x0, y0, x1, y1]}
+                    for _, _, _, _, geom, x0, y0, x1, y1 in batch
+                ]
+                mask = footprint_mask(features, footprint)
+                records.extend(rec for rec, keep in zip(batch, mask) if keep)
+        records = records[:limit]
+
+        return sort_scenes(
+            {"id": rid, "datetime": dt, "cloud_cover": cloud, "preview_url": url}
+            for rid, dt, cloud, url, *_ in records
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# 検索ツールが最初に参照するミラー（未設定なら初回アクセス時に環境変数から作る）
+_mirror: Optional[StacMirror] = None
+_mirror_configured = False
+_mirror_lock = threading.Lock()
+
+
+def get_mirror() -> Optional[StacMirror]:
+    """
+    Return the mirror consulted by ``search_satellite_scenes`` (None if disabled).
+
+    CAPSTONE_STAC_MIRROR_PATH opens a ``StacMirror`` at that path; without
+    it no mirror is used.
+    """
+    global _mirror, _mirror_configured
+    if not _mirror_configured:
+        with _mirror_lock:
+            if not _mirror_configured:
+                path = os.environ.get("CAPSTONE_STAC_MIRROR_PATH")
+                _mirror = StacMirror(path) if path else None
+                _mirror_configured = True
+    return _mirror
+
+
+def set_mirror(mirror: Optional[StacMirror]) -> None:
+    """
+    Plug in the mirror consulted before the remote API. Pass None to disable it.
+    """
+    global _mirror, _mirror_configured
+    with _mirror_lock:
+        _mirror = mirror
+        _mirror_configured = True
+
+
+def lookup_mirror(
+    bbox: list[float],
+    datetime_range: str,
+    cloud_cover_max: float,
+    limit: int,
+    collections: Optional[Iterable[str]],
+    intersects: Optional[dict],
+) -> Optional[list[dict]]:
+    """
+    Answer a search from the configured mirror, or None to query the remote API.
+    """
+    mirror = get_mirror()
+    if mirror is None:
+        return None
+    return mirror.search(
+        bbox, datetime_range, cloud_cover_max, limit,
+        list(collections) if collections is not None else None, intersects,
+    )
@@ -0,0 +1,223 @@
+# src/capstone/tools/stac_resilience.py
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0  # seconds
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling an endpoint whose circuit breaker is open.
+
+    Subclass of RuntimeError so callers that already handle failed searches
+    keep working; ``retry_after`` is the number of seconds until a probe
+    request will be allowed again.
+    """
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"STAC endpoint {endpoint} is unavailable (circuit open, retry in {retry_after:.1f}s)")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    ``reserve()`` takes a token immediately and returns how long the caller
+    must wait before using it; the bucket may go into debt, so concurrent
+    callers are spaced out in arrival order. Threads sleep with
+    ``acquire()``, coroutines ``await asyncio.sleep(bucket.reserve())``,
+    and both draw from the same bucket.
+
+    Args:
+        rate: Tokens added per second (sustained requests per second).
+        burst: Bucket capacity (requests allowed back to back). Defaults to
+            ``max(1, rate)``.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got: {rate}")
+        burst = max(1.0, rate) if burst is None else burst
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got: {burst}")
+        self.rate = rate
+        self.burst = burst
+        self.waited = 0.0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            self.waited += wait
+            return wait
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+@dataclass
+class BreakerStats:
+    failures: int = 0
+    successes: int = 0
+    opened: int = 0
+    rejected: int = 0
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker shared by threads and coroutines.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    fail fast with ``CircuitOpenError``. Once ``reset_timeout`` has passed,
+    one probe call is let through (half-open): success closes the circuit,
+    failure opens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "",
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError(f"failure_threshold must be positive, got: {failure_threshold}")
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats = BreakerStats()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go to the endpoint now."""
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if remaining <= 0 and not self._probing:
+                # 半開: 1 件だけ試しに通し、残りは結果が出るまで即失敗させる
+                self._probing = True
+                return
+            self.stats.rejected += 1
+            raise CircuitOpenError(self.endpoint, max(0.0, remaining))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.stats.successes += 1
+            self._consecutive_failures = 0
+            self._state = CLOSED
+            self._probing = False
+
+    def release(self) -> None:
+        """Give back a half-open probe slot when the call ended without a verdict (e.g. cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.stats.failures += 1
+            self._consecutive_failures += 1
+            if self._probing or self._consecutive_failures >= self.failure_threshold:
+                if self._state == CLOSED or self._probing:
+                    self.stats.opened += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+class EndpointGuard:
+    """
+    Rate limiter and circuit breaker for one STAC endpoint.
+
+    Shared by every ``StacClient`` / ``AsyncStacClient`` with the same base
+    URL (see ``endpoint_guard``), so the limits hold process-wide.
+    """
+
+    def __init__(self, breaker: CircuitBreaker, limiter: Optional[TokenBucket] = None):
+        self.breaker = breaker
+        self.limiter = limiter
+
+
+# base_url -> EndpointGuard（同期・非同期クライアントで共有）
+_guards: dict[str, EndpointGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def _default_rate() -> Optional[float]:
+    """CAPSTONE_STAC_RATE_LIMIT: requests per second for endpoints not configured explicitly."""
+    value = os.environ.get("CAPSTONE_STAC_RATE_LIMIT")
+    return float(value) if value else None
+
+
+def configure_endpoint(
+    base_url: str,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+    reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+) -> EndpointGuard:
+    """
+    Set the rate limit and breaker settings for an endpoint.
+
+    Replaces any guard already registered for ``base_url``; clients pick up
+    the new one on their next request. ``rate=None`` disables rate limiting.
+    """
+    key = base_url.rstrip("/")
+    guard = EndpointGuard(
+        CircuitBreaker(key, failure_threshold, reset_timeout),
+        TokenBucket(rate, burst) if rate is not None else None,
+    )
+    with _guards_lock:
+        _guards[key] = guard
+    return guard
+
+
+def endpoint_guard(base_url: str) -> EndpointGuard:
+    """
+    Return the guard for an endpoint, creating one with default settings on first use.
+    """
+    key = base_url.rstrip("/")
+    with _guards_lock:
+        guard = _guards.get(key)
+        if guard is None:
+            rate = _default_rate()
+            guard = _guards[key] = EndpointGuard(
+                CircuitBreaker(key), TokenBucket(rate) if rate is not None else None
+            )
+        return guard
+
+
+def reset_endpoint_guards() -> None:
+    """Forget all endpoint settings and breaker state."""
+    with _guards_lock:
+        _guards.clear()
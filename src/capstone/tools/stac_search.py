@@ -1,10 +1,198 @@
 # src/capstone/tools/stac_search.py
 
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
 import requests
-from typing import Optional
+
+from capstone.aoi.aoi_catalog import geometry_for_bbox
+
+from .stac_cache import lookup_search, store_search
+from .stac_client import BASE_URL, get_default_client
+from .stac_footprint import filter_features, prepare_footprint
+from .stac_resilience import CircuitOpenError
+
+
+DEFAULT_COLLECTIONS = ["sentinel-2-l2a"]
+DEFAULT_PAGE_SIZE = 100
+THUMBNAIL_ASSET_KEYS = ["thumbnail", "overview", "true_color", "preview"]
+
+# fields 拡張で要求する項目（normalize_feature が読むものだけ）
+SEARCH_FIELDS = {
+    "include": [
+        "id",
+        "properties.datetime",
+        "properties.eo:cloud_cover",
+        *[f"assets.{key}.href" for key in THUMBNAIL_ASSET_KEYS],
+    ],
+    "exclude": ["geometry", "links"],
+}
+
+# sort 拡張での並び順（プロンプトの「雲量の少ない順 → 新しい順」と同じ）
+SEARCH_SORTBY = [
+    {"field": "properties.eo:cloud_cover", "direction": "asc"},
+    {"field": "properties.datetime", "direction": "desc"},
+]
+EXTENSION_KEYS = ("fields", "sortby")
+
+
+def normalize_feature(feat: dict) -> dict:
+    """
+    Reduce a STAC Item (GeoJSON Feature) to the compact record returned by the tool.
+    """
+    props = feat.get("properties", {})
+    assets = feat.get("assets", {})
+
+    thumb: Optional[str] = None
+    for key in THUMBNAIL_ASSET_KEYS:
+        if key in assets:
+            thumb = assets[key].get("href")
+            break
+
+    return {
+        "id": feat.get("id"),
+        "datetime": props.get("datetime"),
+        "cloud_cover": props.get("eo:cloud_cover"),
+        "preview_url": thumb,
+    }
 
 
-BASE_URL = "https://earth-search.aws.element84.com/v1"
+def build_search_payload(
+    bbox: list[float],
+    datetime_range: str,
+    cloud_cover_max: float,
+    limit: int,
+    collections: Optional[list[str]] = None,
+    intersects: Optional[dict] = None,
+) -> dict:
+    """
+    Validate search arguments and build the STAC /search request body.
+
+    When ``intersects`` (a GeoJSON geometry) is given it replaces ``bbox``
+    in the request, since STAC does not allow both.
+    """
+    if len(bbox) != 4:
+        raise ValueError(f"bbox must be a sequence of 4 numbers, got: {bbox}")
+
+    if limit <= 0:
+        raise ValueError(f"limit must be positive, got: {limit}")
+
+    if collections is None:
+        collections = list(DEFAULT_COLLECTIONS)
+
+    payload = {
+        "collections": list(collections),
+        "bbox": list(bbox),
+        "datetime": datetime_range,
+        "limit": limit,
+        "query": {
+            "eo:cloud_cover": {
+                "lte": cloud_cover_max
+            }
+        },
+    }
+    if intersects is not None:
+        del payload["bbox"]
+        payload["intersects"] = intersects
+    return payload
+
+
+def iter_satellite_scenes(
+    bbox: list[float],
+    datetime_range: str,
+    cloud_cover_max: float,
+    collections: Optional[list[str]] = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_items: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Lazily iterate over all scenes matching a search, page by page.
+
+    Pages are fetched on demand by following the STAC ``next`` link, so at
+    most one page of raw features is held in memory at a time. Iteration
+    stops after ``max_items`` rows (if given) without requesting further
+    pages, and breaking out of the loop early has the same effect.
+
+    Args:
+        bbox, datetime_range, cloud_cover_max, collections:
+            Same as ``search_satellite_scenes``.
+        page_size:
+            Number of items requested per page.
+        max_items:
+            Overall cap on the number of rows yielded. None means no cap.
+
+    Yields:
+        Normalized scene records (see ``normalize_feature``).
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    if max_items is not None:
+        page_size = min(page_size, max_items)
+
+    # 接続プール付きの共有クライアントを使う（呼び出しごとの TCP/TLS ハンドシェイクを避ける）
+    client = get_default_client()
+    payload = apply_search_extensions(
+        build_search_payload(bbox, datetime_range, cloud_cover_max, page_size, collections),
+        client.search_extensions(),
+    )
+    yield from _iter_rows(client, payload, max_items)
+
+
+def apply_search_extensions(payload: dict, extensions: frozenset[str]) -> dict:
+    """
+    Add STAC ``fields`` / ``sortby`` parameters supported by the endpoint.
+
+    ``fields`` trims each item down to what ``normalize_feature`` reads,
+    which shrinks responses by roughly an order of magnitude, and ``sortby``
+    makes the first ``limit`` items the lowest-cloud, most recent ones.
+    """
+    payload = dict(payload)
+    if "fields" in extensions:
+        payload["fields"] = {key: list(value) for key, value in SEARCH_FIELDS.items()}
+        if "intersects" in payload:
+            # ポリゴンでの後段フィルタ用に item の bbox だけは返してもらう
+            payload["fields"]["include"].append("bbox")
+    if "sort" in extensions:
+        payload["sortby"] = [dict(rule) for rule in SEARCH_SORTBY]
+    return payload
+
+
+def _rejected_extensions(error: requests.RequestException, payload: dict) -> bool:
+    response = getattr(error, "response", None)
+    return (
+        response is not None
+        and response.status_code == 400
+        and any(key in payload for key in EXTENSION_KEYS)
+    )
+
+
+def _iter_rows(client, payload: dict, max_items: Optional[int], footprint=None) -> Iterator[dict]:
+    pages = client.iter_pages(payload)
+    yielded = 0
+    try:
+        while True:
+            try:
+                page = next(pages)
+            except StopIteration:
+                return
+            except requests.RequestException as e:
+                if yielded == 0 and _rejected_extensions(e, payload):
+                    # 拡張を宣言しているのに受け付けないエンドポイント -> 素の検索でやり直す
+                    client.disable_search_extensions()
+                    payload = {k: v for k, v in payload.items() if k not in EXTENSION_KEYS}
+                    pages.close()
+                    pages = client.iter_pages(payload)
+                    continue
+                raise RuntimeError(f"STAC search request failed: {e}, payload={payload}") from e
+
+            for feat in filter_features(page.get("features", []), footprint):
+                yield normalize_feature(feat)
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+    finally:
+        pages.close()
 
 
 def search_satellite_scenes(
@@ -13,20 +201,64 @@ def search_satellite_scenes(
     cloud_cover_max: float,
     limit: int = 10,
     collections: Optional[list[str]] = None,
+    intersects: Optional[dict] = None,
+    fanout: Optional[bool] = None,
 ) -> list[dict]:
     """
     Search satellite scenes via the Element84 Earth Search v1 STAC API.
 
-    This function queries the STAC endpoint and returns a list of scene
-    metadata records. It is intended to be used as the core logic for
+    This function queries the STAC endpoint through the shared, pooled
+    ``StacClient`` (see ``capstone.tools.stac_client``) and returns a list of
+    scene metadata records. It is intended to be used as the core logic for
     an agent tool.
 
+    Results are fetched in pages of at most ``DEFAULT_PAGE_SIZE`` items, so a
+    large ``limit`` is served by following the STAC ``next`` link instead of
+    one huge response, and scenes beyond the first page are no longer dropped.
+
+    When the endpoint advertises the STAC ``fields`` and ``sort`` extensions,
+    only the returned fields are downloaded and the server sorts by cloud
+    cover, so the first ``limit`` scenes are exactly the lowest-cloud ones.
+    Otherwise a plain search is sent, as before. Either way the returned rows
+    are ordered by lowest cloud cover, then most recent datetime.
+
+    Results are cached by canonicalized payload (see ``capstone.tools.stac_cache``).
+    Searches whose date range ended long ago never change upstream and are
+    cached without expiry.
+
+    If a local mirror is configured (see ``capstone.tools.stac_mirror``) and
+    it fully covers the request, the rows are answered from it without
+    contacting the STAC API.
+
+    Requests go through the endpoint's rate limiter and circuit breaker (see
+    ``capstone.tools.stac_resilience``). While the circuit is open, the last
+    cached rows for the same search are returned even if expired; without
+    them ``CircuitOpenError`` (a RuntimeError) is raised immediately instead
+    of waiting for a timeout.
+
+    Wide requests are split into concurrent sub-queries (see
+    ``capstone.tools.stac_fanout``): ``datetime_range`` may list several
+    intervals separated by commas. A single interval spanning
+    ``FANOUT_MIN_MONTHS`` or more calendar months is split by month and tile
+    only if the endpoint lacks the ``sort`` extension or fan-out is asked for
+    (``fanout=True`` or CAPSTONE_FANOUT=1); with ``sortby`` one request
+    already returns the exact top ``limit``.
+
+    If ``intersects`` is given, or ``bbox`` is exactly the bbox of a catalog
+    AOI that has a polygon (see ``aoi_catalog.geometry_for_bbox``), the search
+    uses the STAC ``intersects`` parameter instead of ``bbox``. Returned item
+    footprints are also checked against the polygon locally, so ocean or
+    neighbouring-country tiles inside the bbox are dropped even if the
+    endpoint only filters by bounding box.
+
     Args:
         bbox:
             Spatial search extent as [min_lon, min_lat, max_lon, max_lat].
         datetime_range:
             Temporal filter in STAC "interval" format:
-            "YYYY-MM-DDTHH:MM:SSZ/YYYY-MM-DDTHH:MM:SSZ".
+            "YYYY-MM-DDTHH:MM:SSZ/YYYY-MM-DDTHH:MM:SSZ". Several separate
+            intervals (e.g. the same season in several years) may be joined
+            with commas.
         cloud_cover_max:
             Maximum allowed cloud cover (percent, inclusive).
         limit:
@@ -34,6 +266,12 @@ def search_satellite_scenes(
         collections:
             List of STAC collection IDs to search.
             If None, defaults to ["sentinel-2-l2a"].
+        intersects:
+            Optional GeoJSON geometry to search instead of ``bbox``.
+        fanout:
+            True to split a long single interval even when the endpoint
+            sorts, False to always send a single request (used by the
+            fan-out sub-queries themselves), None to decide automatically.
 
     Returns:
         List[Dict]: A list of records, each with at least:
@@ -42,63 +280,69 @@ def search_satellite_scenes(
             - "cloud_cover" (float | None): Cloud cover percentage.
             - "preview_url" (str | None): URL of a quick-look/thumbnail image.
     """
-    if len(bbox) != 4:
-        raise ValueError(f"bbox must be a sequence of 4 numbers, got: {bbox}")
+    # stac_fanout は stac_search を import するので、ここで遅延 import する
+    from .stac_fanout import fanout_search, should_fan_out
 
-    if limit <= 0:
-        raise ValueError(f"limit must be positive, got: {limit}")
+    client = get_default_client()
+    if should_fan_out(datetime_range, "sort" in client.search_extensions(), fanout):
+        return fanout_search(bbox, datetime_range, cloud_cover_max, limit, collections, intersects=intersects)
 
-    if collections is None:
-        collections = ["sentinel-2-l2a"]
+    if intersects is None:
+        intersects = geometry_for_bbox(bbox)
+    payload = apply_search_extensions(
+        build_search_payload(bbox, datetime_range, cloud_cover_max, limit, collections, intersects),
+        client.search_extensions(),
+    )
 
-    search_url = f"{BASE_URL}/search"
+    cached = lookup_search(payload)
+    if cached is not None:
+        return cached
 
-    payload = {
-        "collections": list(collections),
-        "bbox": list(bbox),
-        "datetime": datetime_range,
-        "limit": limit,
-        "query": {
-            "eo:cloud_cover": {
-                "lte": cloud_cover_max
-            }
-        },
-    }
+    # stac_mirror は stac_search を import するので、ここで遅延 import する
+    from .stac_mirror import lookup_mirror
+
+    mirrored = lookup_mirror(bbox, datetime_range, cloud_cover_max, limit, collections, intersects)
+    if mirrored is not None:
+        return mirrored
 
+    footprint = prepare_footprint(intersects) if intersects is not None else None
+    page_payload = dict(payload, limit=min(limit, DEFAULT_PAGE_SIZE))
     try:
-        response = requests.post(search_url, json=payload)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        raise RuntimeError(f"STAC search request failed: {e}, payload={payload}") from e
-
-    data = response.json()
-    features = data.get("features", [])
-
-    rows: List[Dict] = []
-    for feat in features:
-        props = feat.get("properties", {})
-        assets = feat.get("assets", {})
-
-        scene_id = feat.get("id")
-        dt = props.get("datetime")
-        cloud = props.get("eo:cloud_cover")
-
-        thumb: Optional[str] = None
-        for key in ["thumbnail", "overview", "true_color", "preview"]:
-            if key in assets:
-                thumb = assets[key].get("href")
-                break
-
-        rows.append(
-            {
-                "id": scene_id,
-                "datetime": dt,
-                "cloud_cover": cloud,
-                "preview_url": thumb,
-            }
-        )
+        rows = sort_scenes(_iter_rows(client, page_payload, limit, footprint))
+    except CircuitOpenError:
+        # エンドポイント停止中は期限切れでもキャッシュ済みの結果を返す
+        stale = lookup_search(payload, stale=True)
+        if stale is None:
+            raise
+        return stale
+    return store_search(payload, rows)
+
+
+def _scene_sort_key(row: dict) -> tuple[float, float]:
+    cloud = row.get("cloud_cover")
+    dt = row.get("datetime")
+    try:
+        ts = datetime.fromisoformat(dt).timestamp() if dt else 0.0
+    except ValueError:
+        ts = 0.0
+    return (float("inf") if cloud is None else float(cloud), -ts)
+
+
+def sort_scenes(rows: Iterable[dict]) -> list[dict]:
+    """
+    Sort scenes by lowest cloud cover first, then most recent datetime.
+    """
+    return sorted(rows, key=_scene_sort_key)
+
 
-    return rows
+def top_scenes(rows: Iterable[dict], k: int = 5) -> list[dict]:
+    """
+    Select the ``k`` best scenes: lowest cloud cover first, then most recent.
+
+    Accepts any iterable (including ``iter_satellite_scenes``) and keeps only
+    ``k`` rows in memory while consuming it.
+    """
+    return heapq.nsmallest(k, rows, key=_scene_sort_key)
 
 
 SEARCH_STAC_SCENES_TOOL_SPEC = {
@@ -124,7 +368,8 @@ SEARCH_STAC_SCENES_TOOL_SPEC = {
                 "type": "string",
                 "description": (
                     'Temporal filter in STAC interval format: '
-                    '"YYYY-MM-DDTHH:MM:SSZ/YYYY-MM-DDTHH:MM:SSZ".'
+                    '"YYYY-MM-DDTHH:MM:SSZ/YYYY-MM-DDTHH:MM:SSZ". '
+                    'Separate intervals (e.g. the same season in several years) may be joined with commas.'
                 ),
             },
             "cloud_cover_max": {
@@ -0,0 +1,121 @@
+# src/capstone/tools/stac_singleflight.py
+
+import asyncio
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from .stac_cache import canonical_cache_key
+
+
+@dataclass
+class SingleFlightStats:
+    calls: int = 0
+    upstream_calls: int = 0
+    coalesced: int = 0
+
+    @property
+    def saved_rate(self) -> float:
+        """Fraction of calls that were served by another caller's in-flight request."""
+        return self.coalesced / self.calls if self.calls else 0.0
+
+
+def request_key(method: str, url: str, body: Optional[dict] = None) -> str:
+    """
+    Key identifying duplicate requests: method, URL and the canonical body.
+
+    The body is canonicalized like search cache keys (``canonical_cache_key``),
+    so the same AOI / range / collections in a different order coalesce.
+    """
+    body_key = canonical_cache_key(body) if body is not None else ""
+    text = json.dumps([method.upper(), url, body_key])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Thread-side request coalescing: one in-flight call per key.
+
+    The first caller of a key runs the function; callers arriving with the
+    same key while it runs wait for it and get the same result (or the same
+    exception). Nothing is kept once the call finishes, so this never serves
+    stale data; it only collapses bursts of identical concurrent requests.
+    Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats.upstream_calls += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of ``SingleFlight``.
+
+    The shared request runs as its own task, so cancelling the caller that
+    started it does not cancel the request for the others waiting on it.
+    One instance belongs to one event loop (like ``AsyncStacClient``).
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _, key=key: self._tasks.pop(key, None))
+            self.stats.upstream_calls += 1
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
@@ -0,0 +1,392 @@
+# src/capstone/tools/stac_subscriptions.py
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+import shapely
+from shapely.geometry import mapping, shape
+
+from capstone.aoi.aoi_catalog import geometry_for_bbox
+
+from .stac_client import get_default_client
+from .stac_search import (
+    DEFAULT_COLLECTIONS,
+    DEFAULT_PAGE_SIZE,
+    SEARCH_FIELDS,
+    build_search_payload,
+    normalize_feature,
+    sort_scenes,
+)
+
+
+WATERMARK_FIELDS = ("updated", "datetime")
+
+
+def _epoch(text: Optional[str]) -> Optional[float]:
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@dataclass
+class Subscription:
+    """
+    A saved search whose new results are reported on every check.
+
+    Attributes:
+        subscription_id: Unique id.
+        bbox: [min_lon, min_lat, max_lon, max_lat] to watch. A catalog AOI's
+            bbox is matched against its polygon, as in ``search_satellite_scenes``.
+        cloud_cover_max: Maximum cloud cover (percent, inclusive).
+        collections: STAC collections to watch.
+        datetime_range: Acquisition-time filter (STAC interval, may be open).
+        watermark_field: "updated" (item publication/update time, default) or
+            "datetime" (acquisition time) for endpoints without ``updated``.
+        high_water_mark: Largest watermark value already reported (ISO 8601);
+            None reports everything currently matching on the first check.
+        boundary_ids: Ids already reported whose watermark equals
+            ``high_water_mark`` (the query is ``>=`` so late ties are not lost).
+    """
+
+    bbox: list[float]
+    cloud_cover_max: float
+    collections: list[str] = field(default_factory=lambda: list(DEFAULT_COLLECTIONS))
+    datetime_range: str = "../.."
+    watermark_field: str = "updated"
+    high_water_mark: Optional[str] = None
+    boundary_ids: list[str] = field(default_factory=list)
+    subscription_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+
+    def matches(self, row: dict, item_bbox: Optional[list[float]]) -> bool:
+        """Return True if a fetched row is new and inside this subscription."""
+        cloud = row.get("cloud_cover")
+        if cloud is None or cloud > self.cloud_cover_max:
+            return False
+        if item_bbox is not None and not (
+            item_bbox[0] <= self.bbox[2] and item_bbox[2] >= self.bbox[0]
+            and item_bbox[1] <= self.bbox[3] and item_bbox[3] >= self.bbox[1]
+        ):
+            return False
+        mark = _epoch(row.get(self.watermark_field))
+        hwm = _epoch(self.high_water_mark)
+        if hwm is not None and (mark is None or mark < hwm or (mark == hwm and row["id"] in self.boundary_ids)):
+            return False
+        start, _, end = self.datetime_range.partition("/")
+        acquired = _epoch(row.get("datetime"))
+        if start not in ("", "..") and (acquired is None or acquired < _epoch(start)):
+            return False
+        if end not in ("", "..") and (acquired is None or acquired > _epoch(end)):
+            return False
+        return True
+
+
+class SubscriptionStore:
+    """
+    Subscriptions and their high-water marks persisted in SQLite.
+
+    Args:
+        path: SQLite file (created if missing). ":memory:" also works.
+    """
+
+    def __init__(self, path: str | Path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS subscriptions (
+                subscription_id TEXT PRIMARY KEY,
+                spec TEXT NOT NULL,
+                high_water_mark TEXT,
+                boundary_ids TEXT NOT NULL,
+                last_checked REAL
+            )
+            """
+        )
+
+    def add(self, subscription: Subscription) -> Subscription:
+        if len(subscription.bbox) != 4:
+            raise ValueError(f"bbox must be a sequence of 4 numbers, got: {subscription.bbox}")
+        if subscription.watermark_field not in WATERMARK_FIELDS:
+            raise ValueError(
+                f"watermark_field must be one of {WATERMARK_FIELDS}, got: {subscription.watermark_field}"
+            )
+        spec = {
+            "bbox": list(subscription.bbox),
+            "cloud_cover_max": subscription.cloud_cover_max,
+            "collections": list(subscription.collections),
+            "datetime_range": subscription.datetime_range,
+            "watermark_field": subscription.watermark_field,
+        }
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO subscriptions (subscription_id, spec, high_water_mark, boundary_ids) "
+                    "VALUES (?, ?, ?, ?)",
+                    (subscription.subscription_id, json.dumps(spec), subscription.high_water_mark,
+                     json.dumps(subscription.boundary_ids)),
+                )
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"subscription already exists: {subscription.subscription_id}") from e
+        return subscription
+
+    def subscribe(
+        self,
+        bbox: list[float],
+        cloud_cover_max: float,
+        collections: Optional[list[str]] = None,
+        datetime_range: str = "../..",
+        since: Optional[str] = "now",
+        watermark_field: str = "updated",
+        subscription_id: Optional[str] = None,
+    ) -> Subscription:
+        """
+        Create a subscription.
+
+        Args:
+            since: Initial high-water mark. "now" (default) reports only items
+                published from now on; None reports everything that matches
+                on the first check.
+        """
+        subscription = Subscription(
+            bbox=list(bbox),
+            cloud_cover_max=cloud_cover_max,
+            collections=list(collections or DEFAULT_COLLECTIONS),
+            datetime_range=datetime_range,
+            watermark_field=watermark_field,
+            high_water_mark=_utc_now() if since == "now" else since,
+        )
+        if subscription_id is not None:
+            subscription.subscription_id = subscription_id
+        return self.add(subscription)
+
+    def get(self, subscription_id: str) -> Optional[Subscription]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT subscription_id, spec, high_water_mark, boundary_ids FROM subscriptions "
+                "WHERE subscription_id = ?",
+                (subscription_id,),
+            ).fetchone()
+        return None if row is None else self._from_row(row)
+
+    def all(self) -> list[Subscription]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT subscription_id, spec, high_water_mark, boundary_ids FROM subscriptions "
+                "ORDER BY subscription_id"
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _from_row(row) -> Subscription:
+        subscription_id, spec, hwm, boundary_ids = row
+        return Subscription(
+            subscription_id=subscription_id,
+            high_water_mark=hwm,
+            boundary_ids=json.loads(boundary_ids),
+            **json.loads(spec),
+        )
+
+    def remove(self, subscription_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM subscriptions WHERE subscription_id = ?", (subscription_id,))
+
+    def advance(self, subscriptions: Iterable[Subscription]) -> None:
+        """Persist the high-water marks of checked subscriptions in one transaction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE subscriptions SET high_water_mark = ?, boundary_ids = ?, last_checked = ? "
+                "WHERE subscription_id = ?",
+                [
+                    (s.high_water_mark, json.dumps(s.boundary_ids), now, s.subscription_id)
+                    for s in subscriptions
+                ],
+            )
+            self._conn.execute("COMMIT")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM subscriptions").fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _group_key(subscription: Subscription) -> tuple:
+    return (tuple(sorted(subscription.collections)), subscription.watermark_field)
+
+
+def _subscription_area(subscription: Subscription) -> shapely.Geometry:
+    # 検索ツールと同じく、カタログ AOI の bbox ならポリゴンで照合する
+    geometry = geometry_for_bbox(subscription.bbox)
+    return shape(geometry) if geometry is not None else shapely.box(*subscription.bbox)
+
+
+def _bound(text: str) -> Optional[str]:
+    text = text.strip()
+    return None if text in ("", "..") else text
+
+
+def _group_datetime(group: list[Subscription]) -> Optional[str]:
+    """
+    Union of the group's acquisition-time ranges as one STAC interval (None if unbounded).
+
+    With the ``datetime`` watermark each range starts no earlier than its
+    subscription's high-water mark.
+    """
+    starts, ends = [], []
+    for subscription in group:
+        start, _, end = subscription.datetime_range.partition("/")
+        start, end = _bound(start), _bound(end)
+        if subscription.watermark_field == "datetime" and subscription.high_water_mark:
+            # ``gte`` で取り、境界と同じ時刻の既報告分だけ手元で除く
+            if start is None or _epoch(subscription.high_water_mark) > _epoch(start):
+                start = subscription.high_water_mark
+        starts.append(start)
+        ends.append(end)
+    # どれか 1 つでも開いていれば和も開いている
+    start = None if None in starts else min(starts, key=_epoch)
+    end = None if None in ends else max(ends, key=_epoch)
+    if start is None and end is None:
+        return None
+    return f"{start or '..'}/{end or '..'}"
+
+
+def _group_payload(group: list[Subscription], areas: list[shapely.Geometry], extensions: frozenset[str]) -> dict:
+    """One search covering every subscription of a group (union of areas and time ranges, loosest filters)."""
+    first = group[0]
+    area = shapely.union_all(areas)
+    datetime_range = _group_datetime(group)
+    payload = build_search_payload(
+        list(area.bounds), datetime_range or "../..", max(s.cloud_cover_max for s in group), DEFAULT_PAGE_SIZE,
+        list(first.collections),
+    )
+    if datetime_range is None:
+        del payload["datetime"]
+    if not area.equals(shapely.box(*area.bounds)):
+        # 離れた AOI をまとめても外接矩形全体を検索しないよう、領域の和をそのまま渡す
+        del payload["bbox"]
+        payload["intersects"] = mapping(area)
+
+    field_name = first.watermark_field
+    marks = [s.high_water_mark for s in group]
+    if field_name == "updated" and all(marks):
+        # ``gte`` で取り、境界と同じ時刻の既報告分だけ手元で除く
+        payload["query"]["updated"] = {"gte": min(marks, key=_epoch)}
+    if "fields" in extensions:
+        payload["fields"] = {
+            "include": [*SEARCH_FIELDS["include"], "bbox", "properties.updated"],
+            "exclude": ["geometry", "links"],
+        }
+    if "sort" in extensions:
+        payload["sortby"] = [{"field": f"properties.{field_name}", "direction": "asc"}]
+    return payload
+
+
+def _candidate_pairs(features: list[dict], tree: shapely.STRtree, n_subscriptions: int):
+    """Yield (item index, subscription index) pairs whose areas intersect."""
+    with_bbox = [i for i, f in enumerate(features) if f.get("bbox")]
+    if with_bbox:
+        bounds = np.array([features[i]["bbox"][:2] + features[i]["bbox"][-2:] for i in with_bbox], dtype=float)
+        boxes = shapely.box(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+        items, subs = tree.query(boxes, predicate="intersects")
+        yield from zip(np.asarray(with_bbox)[items].tolist(), subs.tolist())
+    # フットプリントの無い item は全サブスクリプションの候補にする
+    for i, f in enumerate(features):
+        if not f.get("bbox"):
+            yield from ((i, j) for j in range(n_subscriptions))
+
+
+def _advance(subscription: Subscription, reported: list[dict], top: tuple[float, str]) -> None:
+    # グループの検索は各サブスクリプションの high-water mark 以降をすべて含むので、
+    # 何も報告しなかったサブスクリプションもグループの最大値まで進めてよい
+    hwm = _epoch(subscription.high_water_mark)
+    if hwm is not None and top[0] < hwm:
+        return
+    name = subscription.watermark_field
+    ids = [r["id"] for r in reported if _epoch(r.get(name)) == top[0]]
+    if hwm == top[0]:
+        ids = subscription.boundary_ids + ids
+    subscription.high_water_mark, subscription.boundary_ids = top[1], ids
+
+
+def check_subscriptions(
+    store: SubscriptionStore,
+    subscription_ids: Optional[Iterable[str]] = None,
+    client=None,
+) -> dict[str, list[dict]]:
+    """
+    Check many subscriptions in one batched pass and return only the new scenes.
+
+    Subscriptions watching the same collections are served by a single
+    paged search over the union of their areas, filtered by the lowest
+    high-water mark of the group; each returned item is then assigned to the
+    subscriptions it matches. High-water marks are advanced only after every
+    group was fetched successfully, so a failed pass is simply repeated.
+
+    Returns:
+        Mapping of subscription id to its new scenes (``search_satellite_scenes``
+        row format plus ``updated``), ordered by lowest cloud cover, then most
+        recent. Subscriptions without news map to an empty list.
+    """
+    subscriptions = store.all()
+    if subscription_ids is not None:
+        wanted = set(subscription_ids)
+        subscriptions = [s for s in subscriptions if s.subscription_id in wanted]
+
+    client = client or get_default_client()
+    extensions = client.search_extensions()
+    groups: dict[tuple, list[Subscription]] = {}
+    for subscription in subscriptions:
+        groups.setdefault(_group_key(subscription), []).append(subscription)
+
+    news: dict[str, list[dict]] = {s.subscription_id: [] for s in subscriptions}
+    for group in groups.values():
+        areas = [_subscription_area(s) for s in group]
+        payload = _group_payload(group, areas, extensions)
+        name = group[0].watermark_field
+        top: Optional[tuple[float, str]] = None
+        # item とサブスクリプションの空間的な対応は STRtree でまとめて引く
+        tree = shapely.STRtree(areas)
+        for page in client.iter_pages(payload):
+            features = page.get("features", [])
+            rows = [normalize_feature(feat) for feat in features]
+            for feat, row in zip(features, rows):
+                row["updated"] = feat.get("properties", {}).get("updated")
+                mark = _epoch(row.get(name))
+                if mark is not None and (top is None or mark > top[0]):
+                    top = (mark, row[name])
+            for i, j in _candidate_pairs(features, tree, len(group)):
+                if group[j].matches(rows[i], None):
+                    news[group[j].subscription_id].append(dict(rows[i]))
+        if top is not None:
+            for subscription in group:
+                _advance(subscription, news[subscription.subscription_id], top)
+
+    for subscription in subscriptions:
+        news[subscription.subscription_id] = sort_scenes(news[subscription.subscription_id])
+
+    store.advance(subscriptions)
+    return news
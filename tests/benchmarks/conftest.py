@@ -0,0 +1,166 @@
+"""
+Micro-benchmarks for the tool and catalog hot paths, with stored baselines.
+
+Skipped unless CAPSTONE_BENCH=1, so a plain ``pytest`` run is unaffected:
+
+    CAPSTONE_BENCH=1 python -m pytest tests/benchmarks -q
+
+Each test calls the ``benchmark`` fixture (same call style as
+pytest-benchmark: ``benchmark(func, *args)`` returns ``func``'s result).
+The fixture sizes a round so that it takes at least ``MIN_ROUND_TIME``
+seconds, then runs ``ROUNDS`` rounds alternating with a fixed calibration
+workload. The median ratio of adjacent rounds is the benchmark's cost in
+"calibration units": it cancels CPU-speed drift and keeps baselines
+roughly comparable across machines. GC is off while measuring, as in
+``timeit``.
+
+A test fails when its cost stays more than CAPSTONE_BENCH_THRESHOLD
+(default 0.5, i.e. +50%) above its entry in ``baselines.json`` after
+``RETRIES`` re-measurements. On a quiet dedicated machine a lower
+threshold (0.2) works; shared CI runners need the default. After a
+deliberate change, rewrite the baselines with CAPSTONE_BENCH_SAVE=1 (no
+test fails while saving). CAPSTONE_BENCH_BASELINES points at another
+baseline file.
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+
+BENCH_DIR = Path(__file__).parent
+BASELINE_PATH = Path(os.environ.get("CAPSTONE_BENCH_BASELINES") or BENCH_DIR / "baselines.json")
+ENABLED = os.environ.get("CAPSTONE_BENCH") == "1"
+SAVE = os.environ.get("CAPSTONE_BENCH_SAVE") == "1"
+THRESHOLD = float(os.environ.get("CAPSTONE_BENCH_THRESHOLD", "0.5"))
+
+MIN_ROUND_TIME = 0.005  # seconds
+ROUNDS = 25
+RETRIES = 2
+
+# ベンチマーク名 -> (1 回あたりの時間 us, 較正単位でのコスト)。セッション終了時に表示・保存する
+_results: dict[str, tuple[float, float]] = {}
+_baselines: dict[str, float] | None = None
+
+
+def _load_baselines() -> dict[str, float]:
+    global _baselines
+    if _baselines is None:
+        if BASELINE_PATH.exists():
+            _baselines = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))["benchmarks"]
+        else:
+            _baselines = {}
+    return _baselines
+
+
+def pytest_collection_modifyitems(config, items):
+    if ENABLED:
+        return
+    skip = pytest.mark.skip(reason="benchmarks run only with CAPSTONE_BENCH=1")
+    for item in items:
+        if BENCH_DIR in Path(item.path).parents:
+            item.add_marker(skip)
+
+
+def _autorange(func, args, kwargs):
+    # 1 ラウンドが MIN_ROUND_TIME を超えるまで回数を倍にしていく（timeit.autorange と同じ考え方）
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            result = func(*args, **kwargs)
+        if time.perf_counter() - t0 >= MIN_ROUND_TIME:
+            return result, loops
+        loops *= 2
+
+
+def _round(func, args, kwargs, loops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        func(*args, **kwargs)
+    return (time.perf_counter() - t0) / loops
+
+
+def _calibration_workload() -> int:
+    # 辞書・文字列・ソートを一通り使う、コードの変更に左右されない固定の処理
+    words = [f"aoi_{i % 97}_{i}" for i in range(300)]
+    index = {w.upper(): len(w) for w in words}
+    return sum(index.values()) + len(sorted(words, key=lambda w: w[::-1]))
+
+
+def _measure(func, args, kwargs):
+    """Return (result, fastest seconds per call, median cost in calibration units)."""
+    # timeit と同じく計測中は GC を止める（大きなカタログが生きているかどうかで GC の重さが変わるため）
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        result, loops = _autorange(func, args, kwargs)
+        _, calibration_loops = _autorange(_calibration_workload, (), {})
+        # 対象と較正処理を交互に測り、隣り合うラウンドの比を取る（CPU 速度の揺らぎが打ち消される）
+        times, ratios = [], []
+        for _ in range(ROUNDS):
+            t = _round(func, args, kwargs, loops)
+            times.append(t)
+            ratios.append(t / _round(_calibration_workload, (), {}, calibration_loops))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return result, min(times), statistics.median(ratios)
+
+
+@pytest.fixture
+def benchmark(request):
+    name = f"{Path(request.node.path).stem}::{request.node.name}"
+
+    def run(func, *args, **kwargs):
+        result, per_call, cost = _measure(func, args, kwargs)
+        baseline = _load_baselines().get(name)
+        limit = None if baseline is None or SAVE else baseline * (1 + THRESHOLD)
+        for _ in range(RETRIES):
+            if limit is None or cost <= limit:
+                break
+            # 一時的な揺らぎで落ちないよう、測り直して良い方を採る（本当の劣化なら何度測っても超える）
+            _, retry_per_call, retry_cost = _measure(func, args, kwargs)
+            per_call, cost = min(per_call, retry_per_call), min(cost, retry_cost)
+        _results[name] = (per_call * 1e6, cost)
+        if limit is not None and cost > limit:
+            pytest.fail(
+                f"{name} regressed: {cost:.3f} vs baseline {baseline:.3f} calibration units "
+                f"(+{cost / baseline - 1:.0%}, threshold +{THRESHOLD:.0%}; {per_call * 1e6:.2f} us/call)"
+            )
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    baselines = _load_baselines()
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'name':<60} {'us/call':>12} {'units':>10} {'change':>7}")
+    for name, (us, cost) in sorted(_results.items()):
+        baseline = baselines.get(name)
+        change = f"{cost / baseline - 1:+.0%}" if baseline else "new"
+        terminalreporter.write_line(f"{name:<60} {us:12.2f} {cost:10.3f} {change:>7}")
+    if SAVE:
+        terminalreporter.write_line(f"baselines written to {BASELINE_PATH}")
+
+
+def pytest_sessionfinish(session):
+    if not (SAVE and _results):
+        return
+    merged = {**_load_baselines(), **{name: float(f"{cost:.4g}") for name, (_, cost) in _results.items()}}
+    data = {
+        "unit": "calibration_units",
+        "machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+        "benchmarks": dict(sorted(merged.items())),
+    }
+    BASELINE_PATH.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.aoi import aoi_catalog
+from capstone.aoi.aoi_fuzzy import NgramIndex
+from capstone.scripts.synthetic import make_aoi_catalog
+
+CATALOG_SIZES = [100, 1_000, 10_000]
+
+
+@pytest.fixture(params=CATALOG_SIZES, ids=lambda n: f"{n}aois")
+def catalog(request, monkeypatch):
+    # resolve_aoi / format_known_aois_for_prompt が参照するモジュール変数を合成カタログに差し替える
+    entries = make_aoi_catalog(request.param)
+    monkeypatch.setattr(aoi_catalog, "AOI_CATALOG", entries)
+    monkeypatch.setattr(aoi_catalog, "ALIAS_INDEX", aoi_catalog.build_alias_index(entries))
+    monkeypatch.setattr(aoi_catalog, "_fuzzy_index", NgramIndex(entries))
+    return entries
+
+
+def test_resolve_aoi_exact(benchmark, catalog):
+    hint = catalog[len(catalog) // 2]["aliases"][1]
+    assert benchmark(aoi_catalog.resolve_aoi, hint)["matched"]
+
+
+def test_resolve_aoi_fuzzy(benchmark, catalog):
+    # 埋め草語の付いた別名: 完全一致に失敗して n-gram 検索で採用される
+    # （語の欠けたヒントは語単位の照合で自動採用されないので使わない）
+    entry = catalog[len(catalog) // 2]
+    hint = f"the {entry['aliases'][1]} region"
+    assert benchmark(aoi_catalog.resolve_aoi, hint)["aoi_id"] == entry["id"]
+
+
+def test_resolve_aoi_unknown(benchmark, catalog):
+    assert not benchmark(aoi_catalog.resolve_aoi, "somewhere over the rainbow")["matched"]
+
+
+def test_format_known_aois_for_prompt(benchmark, catalog):
+    text = benchmark(aoi_catalog.format_known_aois_for_prompt)
+    assert text.count("\n") == len(catalog) - 1
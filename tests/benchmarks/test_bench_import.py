@@ -0,0 +1,22 @@
+import statistics
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts import bench_import_time
+
+# 較正単位のベースラインではなく、bench_import_time の目標予算 (ms) と比べる
+REPEAT = 5
+
+
+@pytest.mark.parametrize("module", list(bench_import_time.IMPORT_BUDGETS_MS))
+def test_cold_import_within_budget(module):
+    runs = bench_import_time.measure([module], REPEAT)[module]
+    median_ms = statistics.median(p.total_ms for p in runs)
+    problems = bench_import_time.check(module, median_ms, runs[-1].heavy_modules())
+    assert not problems, f"{module}: {'; '.join(problems)}"
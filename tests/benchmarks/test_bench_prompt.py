@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.agent import prompts, stac_agent_adk
+from capstone.aoi import aoi_catalog
+from capstone.scripts.stub_llm import StubLlm
+from capstone.scripts.synthetic import make_aoi_catalog
+
+CATALOG_SIZES = [10, 100, 1_000]
+
+
+@pytest.fixture(params=CATALOG_SIZES, ids=lambda n: f"{n}aois")
+def catalog(request, monkeypatch):
+    entries = make_aoi_catalog(request.param)
+    monkeypatch.setattr(aoi_catalog, "AOI_CATALOG", entries)
+    monkeypatch.setattr(prompts, "AOI_CATALOG", entries)
+    return entries
+
+
+@pytest.mark.parametrize("mode", ["inline", "discover"])
+def test_build_system_prompt(benchmark, catalog, mode):
+    assert benchmark(prompts.build_system_prompt, mode)
+
+
+@pytest.mark.parametrize("mode", ["inline", "discover"])
+def test_create_agent(benchmark, catalog, mode):
+    model = StubLlm()
+    agent = benchmark(stac_agent_adk.create_agent, mode, model)
+    assert (len(catalog) > 100 or mode == "discover") or catalog[-1]["id"] in agent.instruction
@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.synthetic import make_feature_collection
+from capstone.tools.stac_search import normalize_feature, sort_scenes, top_scenes
+
+RESULT_SIZES = [10, 100, 1_000, 10_000]
+
+
+@pytest.fixture(scope="module", params=RESULT_SIZES, ids=lambda n: f"{n}items")
+def features(request):
+    return make_feature_collection(request.param)["features"]
+
+
+@pytest.fixture(scope="module")
+def rows(features):
+    return [normalize_feature(f) for f in features]
+
+
+def test_normalize_features(benchmark, features):
+    rows = benchmark(lambda: [normalize_feature(f) for f in features])
+    assert len(rows) == len(features)
+
+
+def test_sort_scenes(benchmark, rows):
+    assert len(benchmark(sort_scenes, rows)) == len(rows)
+
+
+def test_top_scenes(benchmark, rows):
+    assert len(benchmark(top_scenes, rows, 5)) == min(5, len(rows))
+
+
+def test_normalize_and_top_k(benchmark, features):
+    # 検索ツールが 1 ページ分に対して行う処理（正規化しながら上位 k 件を選ぶ）
+    assert len(benchmark(lambda: top_scenes(map(normalize_feature, features), 5))) == min(5, len(features))
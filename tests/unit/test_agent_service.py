@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.agent import stac_agent_adk
+from capstone.agent.agent_service import AgentService
+from capstone.scripts.stub_llm import StubLlm
+from capstone.tools import stac_async
+
+
+class _CountingLlm(StubLlm):
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+        finally:
+            self.in_flight -= 1
+
+
+def _service(model=None, **kwargs) -> AgentService:
+    agent = stac_agent_adk.create_agent(model=model or StubLlm())
+    return AgentService(agent, stac_agent_adk.APP_NAME, **kwargs)
+
+
+class TestAgentService(unittest.TestCase):
+    def test_session_history_is_kept_across_calls_and_loops(self):
+        service = _service()
+        self.assertEqual(asyncio.run(service.ask("hi", "u1", "s1")), "ok (turn 1)")
+        self.assertEqual(asyncio.run(service.ask("again", "u1", "s1")), "ok (turn 2)")
+        self.assertEqual(asyncio.run(service.ask("other", "u2", "s1")), "ok (turn 1)")
+
+    def test_ask_many_is_bounded_and_ordered(self):
+        model = _CountingLlm(latency=0.02)
+        service = _service(model, max_concurrency=3)
+        replies = asyncio.run(service.ask_many([f"q{i}" for i in range(10)], "u1"))
+        self.assertEqual(replies, ["ok (turn 1)"] * 10)
+        self.assertEqual(model.max_in_flight, 3)
+
+    def test_call_agent_reuses_shared_service(self):
+        service = _service()
+        stac_agent_adk.set_agent_service(service)
+        try:
+            self.assertEqual(stac_agent_adk.call_agent("hi", session_id="fixed"), "ok (turn 1)")
+            self.assertEqual(stac_agent_adk.call_agent("hi", session_id="fixed"), "ok (turn 2)")
+            self.assertEqual(stac_agent_adk.call_agents(["a", "b"]), ["ok (turn 1)", "ok (turn 1)"])
+            self.assertIs(stac_agent_adk.get_agent_service(), service)
+        finally:
+            stac_agent_adk.set_agent_service(None)
+
+    def test_call_agent_closes_the_loop_stac_client(self):
+        clients = []
+
+        async def fast_path(query):
+            # 検索ツールと同じく、そのループ用の共有クライアントを使う
+            clients.append(stac_async.get_default_async_client())
+            return "table"
+
+        stac_agent_adk.set_agent_service(_service(fast_path=fast_path))
+        try:
+            self.assertEqual(stac_agent_adk.call_agent("fast"), "table")
+            self.assertEqual(stac_agent_adk.call_agents(["fast", "fast"]), ["table", "table"])
+        finally:
+            stac_agent_adk.set_agent_service(None)
+        self.assertEqual(len({id(c) for c in clients}), 2)
+        self.assertTrue(all(c._client.is_closed for c in clients))
+
+    def test_invalid_concurrency(self):
+        with self.assertRaises(ValueError):
+            _service(max_concurrency=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
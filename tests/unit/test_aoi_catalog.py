@@ -6,7 +6,7 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(PROJECT_ROOT / "src"))
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from capstone.aoi import aoi_catalog
+from capstone.aoi import aoi_catalog, aoi_fuzzy
 
 
 class TestAoiCatalog(unittest.TestCase):
@@ -52,6 +52,101 @@ class TestAoiCatalog(unittest.TestCase):
         self.assertIsNone(result["bbox"])
         self.assertIsNone(result["aoi_id"])
 
+    def test_resolve_aois_bulk(self):
+        results = aoi_catalog.resolve_aois(["Tokyo Area", "unknown place", "大阪"])
+        self.assertEqual([r["aoi_id"] for r in results], ["tokyo_area", None, "osaka_area"])
+        self.assertEqual([r["matched"] for r in results], [True, False, True])
+
+    def test_alias_index_is_read_only(self):
+        self.assertIs(aoi_catalog.ALIAS_INDEX["hokkaido_east"], aoi_catalog.KNOWN_AOIS["hokkaido_east"])
+        with self.assertRaises(TypeError):
+            aoi_catalog.ALIAS_INDEX["new_alias"] = {}  # type: ignore[index]
+
+    def test_alias_index_first_entry_wins(self):
+        index = aoi_catalog.build_alias_index(
+            [{"id": "a", "bbox": [0, 0, 1, 1], "aliases": ["Same Name"]},
+             {"id": "b", "bbox": [0, 0, 2, 2], "aliases": ["same-name"]}]
+        )
+        self.assertEqual(index["same_name"]["id"], "a")
+
+
+class TestFuzzyAoi(unittest.TestCase):
+    def test_fold_japanese_variants(self):
+        self.assertEqual(aoi_fuzzy.fold("東京都"), "東京")
+        self.assertEqual(aoi_fuzzy.fold("トウキョウ"), "とうきょう")
+        self.assertEqual(aoi_fuzzy.fold("ＴＯＫＹＯ"), "tokyo")
+        self.assertEqual(aoi_fuzzy.fold("京都"), "京都")
+
+    def test_fuzzy_matches(self):
+        for hint, expected in [
+            ("Eastern Hokkaido region", "hokkaido_east"),
+            ("hokaido east", "hokkaido_east"),
+            ("東京都", "tokyo_area"),
+            ("トウキョウ", "tokyo_area"),
+            ("Osaka-fu", "osaka_area"),
+        ]:
+            with self.subTest(hint=hint):
+                result = aoi_catalog.resolve_aoi(hint)
+                self.assertTrue(result["matched"])
+                self.assertEqual(result["aoi_id"], expected)
+
+    def test_qualified_region_is_not_auto_matched(self):
+        # "northern Japan" は japan の一部なので、確認なしに japan へ寄せてはいけない
+        result = aoi_catalog.resolve_aoi("northern Japan")
+        self.assertFalse(result["matched"])
+        self.assertEqual(result["candidates"][0]["aoi_id"], "japan")
+
+    def test_changed_or_dropped_words_are_not_auto_matched(self):
+        # 全体のスコアが閾値を超えても、修飾語が違う・語が足りないなら候補として返すだけにする
+        for hint, candidate in [
+            ("western hokkaido", "hokkaido_east"),
+            ("japan cloud", "japan_cloud_free_focused"),
+        ]:
+            with self.subTest(hint=hint):
+                result = aoi_catalog.resolve_aoi(hint)
+                self.assertFalse(result["matched"])
+                self.assertIsNone(result["default_cloud_cover"])
+                self.assertEqual(result["candidates"][0]["aoi_id"], candidate)
+
+    def test_typo_returns_ranked_candidates(self):
+        result = aoi_catalog.resolve_aoi("hokaido")
+        self.assertFalse(result["matched"])
+        self.assertEqual(result["candidates"][0]["aoi_id"], "hokkaido_east")
+        scores = [c["score"] for c in result["candidates"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_search_aois(self):
+        hits = aoi_catalog.search_aois("Germny", top_k=3)
+        self.assertEqual(hits[0]["aoi_id"], "germany")
+        self.assertIn("bbox", hits[0])
+
+
+class TestAoiSpatial(unittest.TestCase):
+    def test_containing_smallest_first(self):
+        ids = [a["aoi_id"] for a in aoi_catalog.aois_containing(139.7, 35.7)]
+        self.assertEqual(ids[0], "tokyo_area")
+        self.assertIn("japan", ids)
+
+    def test_smallest_enclosing(self):
+        result = aoi_catalog.smallest_enclosing_aoi(144.5, 43.5)
+        self.assertTrue(result["matched"])
+        self.assertEqual(result["aoi_id"], "hokkaido_east")
+        self.assertFalse(aoi_catalog.smallest_enclosing_aoi(0.0, -60.0)["matched"])
+
+    def test_boundary_counts_as_inside(self):
+        ids = [a["aoi_id"] for a in aoi_catalog.aois_containing(138.8, 34.8)]
+        self.assertIn("tokyo_area", ids)
+
+    def test_intersecting(self):
+        ids = {a["aoi_id"] for a in aoi_catalog.aois_intersecting([2.0, 50.0, 6.0, 52.0])}
+        self.assertEqual(ids, {"united_kingdom", "france", "germany"})
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            aoi_catalog.aois_containing(200.0, 0.0)
+        with self.assertRaises(ValueError):
+            aoi_catalog.aois_intersecting([0.0, 0.0, 1.0])
+
 
 if __name__ == "__main__":
     unittest.main()
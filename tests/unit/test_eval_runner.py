@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts import run_eval_parallel as runner
+from capstone.scripts.run_eval import EVAL_DIR
+
+
+class FakeEvaluator:
+    """Records calls and concurrency instead of running ADK."""
+
+    def __init__(self, fail: set[str] = frozenset()):
+        self.fail = fail
+        self.calls: list[tuple[str, int]] = []
+        self.active = self.max_active = 0
+
+    async def __call__(self, job: runner.EvalJob, agent_module: str) -> runner.EvalOutcome:
+        self.calls.append((job.eval_id, job.run))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        passed = job.eval_id not in self.fail
+        return runner.EvalOutcome(job.eval_set_id, job.eval_id, job.run, passed)
+
+
+class TestEvalRunner(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.eval_dir = Path(self.tmp.name) / "eval"
+        shutil.copytree(EVAL_DIR, self.eval_dir, ignore=shutil.ignore_patterns("__pycache__", "*.py"))
+        self.cache = runner.EvalResultCache(":memory:")
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def _jobs(self, num_runs: int = 1, fingerprint: str = "code-v1") -> list[runner.EvalJob]:
+        return runner.load_jobs(self.eval_dir, num_runs, fingerprint=fingerprint)
+
+    def test_jobs_cover_every_case_and_run(self):
+        n_cases = sum(
+            len(json.loads(p.read_text())["eval_cases"]) for p in self.eval_dir.glob("*.evalset.json")
+        )
+        jobs = self._jobs(num_runs=3)
+        self.assertEqual(len(jobs), 3 * n_cases)
+        self.assertEqual(len({j.key for j in jobs}), len(jobs))
+        self.assertEqual({j.eval_set_id for j in self._jobs()}, {"normal", "clarification", "boundary"})
+        self.assertTrue(all(j.eval_set_id == "boundary" for j in runner.load_jobs(
+            self.eval_dir, only=["boundary"], fingerprint="x")))
+
+    def test_concurrency_is_bounded(self):
+        evaluate = FakeEvaluator()
+        jobs = self._jobs(num_runs=2)
+        outcomes = runner.run_evaluation(jobs, concurrency=3, evaluate=evaluate)
+        self.assertEqual(evaluate.max_active, 3)
+        self.assertEqual([(o.eval_id, o.run) for o in outcomes], [(j.eval_id, j.run) for j in jobs])
+
+    def test_only_changed_cases_rerun(self):
+        evaluate = FakeEvaluator()
+        runner.run_evaluation(self._jobs(), cache=self.cache, evaluate=evaluate)
+        first = len(evaluate.calls)
+
+        evaluate.calls.clear()
+        outcomes = runner.run_evaluation(self._jobs(), cache=self.cache, evaluate=evaluate)
+        self.assertEqual(evaluate.calls, [])
+        self.assertTrue(all(o.cached for o in outcomes))
+
+        path = self.eval_dir / "clarification.evalset.json"
+        data = json.loads(path.read_text())
+        data["eval_cases"][0]["conversation"][0]["user_content"]["parts"][0]["text"] += "?"
+        path.write_text(json.dumps(data))
+        runner.run_evaluation(self._jobs(), cache=self.cache, evaluate=evaluate)
+        self.assertEqual(evaluate.calls, [(data["eval_cases"][0]["eval_id"], 0)])
+
+        # コード（プロンプト・ツール）が変わったら全部やり直す
+        evaluate.calls.clear()
+        runner.run_evaluation(self._jobs(fingerprint="code-v2"), cache=self.cache, evaluate=evaluate)
+        self.assertEqual(len(evaluate.calls), first)
+
+    def test_failures_and_errors(self):
+        jobs = self._jobs(num_runs=2)
+        failing = jobs[0].eval_id
+        outcomes = runner.run_evaluation(jobs, cache=self.cache, evaluate=FakeEvaluator({failing}))
+        cases = runner.summarize(outcomes)
+        self.assertEqual([case for case, passed in cases.items() if not passed], [(jobs[0].eval_set_id, failing)])
+
+        # 失敗は既定ではキャッシュせず、次の実行でもう一度評価する
+        evaluate = FakeEvaluator({failing})
+        runner.run_evaluation(jobs, cache=self.cache, evaluate=evaluate)
+        self.assertEqual(evaluate.calls, [(failing, 0), (failing, 1)])
+
+        # cache_failures で残した失敗はキャッシュから返し、rerun_failed で再実行する
+        evaluate = FakeEvaluator({failing})
+        runner.run_evaluation(jobs, cache=self.cache, cache_failures=True, evaluate=evaluate)
+        runner.run_evaluation(jobs, cache=self.cache, evaluate=evaluate)
+        self.assertEqual(len(evaluate.calls), 2)
+        runner.run_evaluation(jobs, cache=self.cache, rerun_failed=True, evaluate=evaluate)
+        self.assertEqual(evaluate.calls[2:], [(failing, 0), (failing, 1)])
+
+        async def broken(job, agent_module):
+            return runner.EvalOutcome(job.eval_set_id, job.eval_id, job.run, False, "no API key", error=True)
+
+        cache = runner.EvalResultCache(":memory:")
+        runner.run_evaluation(jobs[:1], cache=cache, evaluate=broken)
+        self.assertIsNone(cache.get(jobs[0]))
+        cache.close()
+
+    def test_code_fingerprint_tracks_files(self):
+        src = Path(self.tmp.name) / "pkg"
+        src.mkdir()
+        (src / "prompts.py").write_text("PROMPT = 'a'\n")
+        before = runner.code_fingerprint([src])
+        self.assertEqual(runner.code_fingerprint([src]), before)
+        (src / "prompts.py").write_text("PROMPT = 'b'\n")
+        self.assertNotEqual(runner.code_fingerprint([src]), before)
+
+    def test_code_fingerprint_tracks_cassettes(self):
+        src = Path(self.tmp.name) / "pkg"
+        src.mkdir()
+        cassettes = Path(self.tmp.name) / "cassettes"
+        cassettes.mkdir()
+        (cassettes / "llm.json.gz").write_bytes(b"v1")
+        with mock.patch.dict(os.environ, {"CAPSTONE_CASSETTE_DIR": str(cassettes)}):
+            os.environ.pop("CAPSTONE_CASSETTES", None)
+            live = runner.code_fingerprint([src])
+            (cassettes / "llm.json.gz").write_bytes(b"v2")
+            self.assertEqual(runner.code_fingerprint([src]), live)
+
+            os.environ["CAPSTONE_CASSETTES"] = "replay"
+            before = runner.code_fingerprint([src])
+            self.assertNotEqual(before, live)
+            (cassettes / "llm.json.gz").write_bytes(b"v3")
+            self.assertNotEqual(runner.code_fingerprint([src]), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.agent import stac_agent_adk
+from capstone.agent.agent_service import AgentService
+from capstone.agent.fast_path import (
+    format_fast_path_answer,
+    parse_structured_query,
+)
+from capstone.scripts.stub_llm import StubLlm
+
+
+class TestParseStructuredQuery(unittest.TestCase):
+    def test_iso_range_and_numeric_cloud(self):
+        plan = parse_structured_query(
+            "Find Sentinel-2 images over eastern Hokkaido between 2023-06-15 and 2023-06-30 "
+            "with less than 20% cloud cover"
+        )
+        self.assertEqual(plan.aoi_id, "hokkaido_east")
+        self.assertEqual(plan.bbox, [143.0, 42.5, 146.0, 45.5])
+        self.assertEqual(plan.datetime_range, "2023-06-15T00:00:00Z/2023-06-30T23:59:59Z")
+        self.assertEqual(plan.cloud_cover_max, 20.0)
+        self.assertEqual(plan.limit, 5)
+        self.assertEqual(plan.collections, ["sentinel-2-l2a"])
+
+    def test_compact_form(self):
+        plan = parse_structured_query("Sentinel-2, tokyo_area, 2023-08-01..2023-08-31, <10% cloud, top 3")
+        self.assertEqual(plan.aoi_id, "tokyo_area")
+        self.assertEqual(plan.datetime_range, "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z")
+        self.assertEqual(plan.cloud_cover_max, 10.0)
+        self.assertEqual(plan.limit, 3)
+
+    def test_prompt_mappings(self):
+        cases = {
+            "Show me almost cloud-free Sentinel-2 images over Japan in 2023.":
+                ("2023-01-01T00:00:00Z/2023-12-31T23:59:59Z", 15.0),
+            "Show me Sentinel-2 images over the Tokyo area from Aug 10–20 2023 without any cloud constraint.":
+                ("2023-08-10T00:00:00Z/2023-08-20T23:59:59Z", 100.0),
+            "Find cloud-free images around Sapporo in September 2023.":
+                ("2023-09-01T00:00:00Z/2023-09-30T23:59:59Z", 10.0),
+            "Images over eastern Hokkaido in summer 2023":
+                ("2023-06-01T00:00:00Z/2023-08-31T23:59:59Z", 50.0),
+            "Images over tokyo in February 2024":
+                ("2024-02-01T00:00:00Z/2024-02-29T23:59:59Z", 30.0),
+        }
+        for query, (datetime_range, cloud) in cases.items():
+            with self.subTest(query=query):
+                plan = parse_structured_query(query)
+                self.assertEqual((plan.datetime_range, plan.cloud_cover_max), (datetime_range, cloud))
+
+    def test_aoi_default_cloud_cover(self):
+        plan = parse_structured_query("japan_cloud_free_focused 2023-05-01/2023-05-31")
+        self.assertEqual(plan.cloud_cover_max, 10.0)
+
+    def test_ambiguous_queries_fall_back(self):
+        for query in [
+            "I need low-cloud Sentinel-2 images of tokyo in late May 2021.",
+            "Show me low-cloud Sentinel-2 images over northern Japan in autumn 2023.",
+            "Show me cloud-free Sentinel-2 images over Japan last summer.",
+            "Show me cloud-free Sentinel-2 images over eastern Hokkaido.",
+            "Show me cloud-free Sentinel-2 images from August 2023.",
+            "Find Sentinel-1 radar images over eastern Hokkaido in January 2023.",
+            "Images over tokyo and sapporo in May 2023",
+            "Images over tokyo in May 2023 or June 2023",
+            "Images over tokyo in May 2023 below 5% and cloud-free",
+            "Images over tokyo 2023-08-31..2023-08-01",
+            "Images over Kyoto in May 2023",
+        ]:
+            with self.subTest(query=query):
+                self.assertIsNone(parse_structured_query(query))
+
+    def test_unconsumed_constraints_fall_back(self):
+        # 規則で解釈しきれない条件を黙って落として答えてはいけない
+        for query in [
+            "Sentinel-2 images over tokyo in August 2023 with more than 50% cloud",
+            "Sentinel-2 images over tokyo in August 2023 with cloud cover above 20%",
+            "Sentinel-2 images over tokyo in August 2023 with less than 10 percent",
+            "Sentinel-2 images over tokyo in August 2023, cloud 10%",
+            "Find the 3 least cloudy scenes over tokyo in August 2023",
+            "Sentinel-2 L1C images over tokyo in August 2023",
+            "Images over tokyo 2023-08-01..2023-08-31 but not 2023-08-15",
+            # 別名の前後に残る語は場所の限定や追加条件
+            "Sentinel-2 scenes of Greater Tokyo in August 2023 under 20% cloud",
+            "Sentinel-2 scenes of Tokyo Bay in August 2023 under 20% cloud",
+            "Sentinel-2 scenes of Tokyo in August 2023 under 20% cloud, only at night",
+        ]:
+            with self.subTest(query=query):
+                self.assertIsNone(parse_structured_query(query))
+
+    def test_cloud_words_around_a_threshold_are_consumed(self):
+        plan = parse_structured_query("Sentinel-2-l2a images over tokyo in August 2023 with cloud cover below 10%")
+        self.assertEqual(plan.cloud_cover_max, 10.0)
+
+
+class TestFormatting(unittest.TestCase):
+    def test_answer_sorts_and_truncates(self):
+        plan = parse_structured_query("tokyo 2023-08-01..2023-08-31 top 2")
+        rows = [
+            {"id": f"s{i}", "datetime": f"2023-08-0{i + 1}T00:00:00Z", "cloud_cover": c, "preview_url": None}
+            for i, c in enumerate([30.0, 5.0, 10.0])
+        ]
+        answer = format_fast_path_answer(plan, rows)
+        self.assertIn("| s1 |", answer)
+        self.assertIn("| s2 |", answer)
+        self.assertNotIn("| s0 |", answer)
+        self.assertIn("scene-level metadata", answer)
+        self.assertIn("No scenes were found", format_fast_path_answer(plan, []))
+
+
+class TestAgentServiceFastPath(unittest.TestCase):
+    def test_fast_path_answer_is_recorded_in_session(self):
+        async def fast_path(query):
+            return "table" if query.startswith("fast") else None
+
+        agent = stac_agent_adk.create_agent(model=StubLlm())
+        service = AgentService(agent, stac_agent_adk.APP_NAME, fast_path=fast_path)
+        self.assertEqual(asyncio.run(service.ask("fast query", "u1", "s1")), "table")
+        # 2 ターン目は LLM に渡り、1 ターン目のユーザー発話が履歴に入っている
+        self.assertEqual(asyncio.run(service.ask("vague query", "u1", "s1")), "ok (turn 2)")
+        self.assertEqual(service.fast_path_answers, 1)
+
+        session = asyncio.run(service.session_service.get_session(
+            app_name=stac_agent_adk.APP_NAME, user_id="u1", session_id="s1"
+        ))
+        self.assertEqual(
+            [e.author for e in session.events],
+            ["user", agent.name, "user", agent.name],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
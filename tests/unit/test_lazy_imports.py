@@ -0,0 +1,64 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone import tools
+from capstone.agent import prompts
+from capstone.scripts import bench_import_time
+from capstone.tools import stac_client, stac_search
+
+SAMPLE_IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:       300 |        420 | json
+import time:       900 |       1500 |     numpy.core
+import time:      2000 |       3500 |   numpy
+import time:       500 |       4000 | capstone.example
+"""
+
+
+class TestLazyPackage(unittest.TestCase):
+    def test_lazy_names_resolve_to_the_submodule_objects(self):
+        self.assertIs(tools.StacClient, stac_client.StacClient)
+        self.assertIs(tools.search_satellite_scenes, stac_search.search_satellite_scenes)
+        self.assertEqual(tools.stac_footprint.__name__, "capstone.tools.stac_footprint")
+        self.assertIn("SceneTable", dir(tools))
+        with self.assertRaises(AttributeError):
+            tools.no_such_tool
+
+    def test_builtin_search_tool_is_registered_on_first_access(self):
+        name = stac_search.SEARCH_STAC_SCENES_TOOL_SPEC["name"]
+        self.assertIs(tools.get_tool_callable(name), stac_search.search_satellite_scenes)
+        self.assertIs(tools.TOOL_SPECS, tools.get_tool_specs())
+        self.assertIn(name, tools.TOOL_REGISTRY)
+
+    def test_system_prompt_is_built_on_first_access(self):
+        self.assertEqual(prompts.SYSTEM_PROMPT, prompts.build_system_prompt())
+
+
+class TestImportTime(unittest.TestCase):
+    def test_parse_importtime_keeps_nesting_depth(self):
+        entries = bench_import_time.parse_importtime(SAMPLE_IMPORTTIME)
+        self.assertEqual([(e.name, e.depth) for e in entries][-3:], [("numpy.core", 2), ("numpy", 1), ("capstone.example", 0)])
+        profile = bench_import_time.ImportProfile("capstone.example", 4.0, entries)
+        self.assertEqual(profile.heavy_modules(), ["numpy"])
+        self.assertEqual(profile.slowest(1)[0].name, "numpy")
+
+    def test_check_reports_budget_and_heavy_imports(self):
+        self.assertEqual(bench_import_time.check("capstone.tools", 1.0, []), [])
+        problems = bench_import_time.check("capstone.tools", 1e6, ["pandas"])
+        self.assertEqual(len(problems), 2)
+
+    def test_entry_modules_do_not_load_heavy_dependencies(self):
+        # 別プロセスで import して、ADK や pandas などを読んでいないことを確かめる（時間は見ない）
+        for module in ("capstone.tools", "capstone.agent.stac_agent_adk", "capstone.scripts.eval.agent"):
+            with self.subTest(module=module):
+                self.assertEqual(bench_import_time.profile_import(module).heavy_modules(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts import load_gen
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache
+
+
+class TestLoadTest(unittest.TestCase):
+    def setUp(self):
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_async.configure_default_async_client()
+        stac_cache.set_search_cache(None)
+
+    def test_percentile_is_nearest_rank(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(load_gen.percentile(values, 50), 50.0)
+        self.assertEqual(load_gen.percentile(values, 99), 99.0)
+        self.assertEqual(load_gen.percentile([7.0], 95), 7.0)
+        self.assertEqual(load_gen.percentile([], 50), 0.0)
+
+    def test_open_loop_keeps_the_offered_rate_and_counts_errors(self):
+        async def call(i):
+            # 遅いリクエストがあっても、次のリクエストの開始は遅れない
+            await asyncio.sleep(0.2)
+            if i % 4 == 0:
+                raise TimeoutError("slow upstream")
+
+        result = asyncio.run(load_gen.run_load(call, qps=100, duration=0.2))
+        report = load_gen.summarize(result, qps=100)
+        self.assertEqual(report["requests"], 20)
+        self.assertEqual((report["ok"], report["errors"]), (15, 5))
+        self.assertEqual(report["errors_by_type"], {"TimeoutError": 5})
+        self.assertAlmostEqual(report["error_rate"], 0.25)
+        self.assertLess(result.elapsed, 1.0)  # 逐次なら 4 秒かかる
+        self.assertGreaterEqual(report["latency_ms"]["p50"], 190)
+        json.dumps(report)
+
+    def test_agent_target_runs_the_search_tool_per_turn(self):
+        with StubStacServer(n_items=50) as server:
+            stac_async.configure_default_async_client(base_url=server.url)
+
+            async def drive():
+                call = load_gen._agent_call(model_latency=0.0, max_in_flight=8)
+                return await load_gen.run_load(call, qps=50, duration=0.1)
+
+            result = asyncio.run(drive())
+        self.assertEqual((len(result.latencies), sum(result.errors.values())), (5, 0))
+        self.assertGreaterEqual(server.request_count, 1)
+
+
+class TestStubServerFaults(unittest.TestCase):
+    def test_faults_carry_retry_after_and_jitter_adds_delay(self):
+        with StubStacServer(n_items=5, fault_rate=1.0, fault_status=429, retry_after=2, jitter=0.01) as server:
+            response = requests.post(f"{server.url}/search", json={"limit": 1})
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.headers["Retry-After"], "2")
+            delays = [server.delay() for _ in range(200)]
+        self.assertTrue(all(d >= 0 for d in delays))
+        self.assertAlmostEqual(sum(delays) / len(delays), 0.01, delta=0.005)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.agent import prompts
+from capstone.scripts.synthetic import make_aoi_catalog
+
+
+class TestPromptModes(unittest.TestCase):
+    def test_inline_lists_catalog(self):
+        prompt = prompts.build_system_prompt("inline")
+        self.assertIn("- hokkaido_east: [143.0, 42.5, 146.0, 45.5]", prompt)
+
+    def test_discover_has_no_per_aoi_data(self):
+        prompt = prompts.build_system_prompt("discover")
+        self.assertNotIn("143.0, 42.5", prompt)
+        self.assertIn("search_aois", prompt)
+        big = prompts.build_system_prompt("discover", make_aoi_catalog(1000))
+        self.assertEqual(prompt, big)
+
+    def test_tools_and_aoi_ids_match_the_mode(self):
+        inline = prompts.build_system_prompt("inline")
+        self.assertIn("two tools", inline)
+        self.assertNotIn("search_aois", inline)
+        self.assertIn("exactly as listed below", inline)
+        discover = prompts.build_system_prompt("discover")
+        self.assertIn("three tools", discover)
+        self.assertNotIn("listed below", discover)
+
+    def test_auto_switches_on_catalog_size(self):
+        self.assertEqual(prompts.resolve_prompt_mode("auto"), "inline")
+        self.assertEqual(prompts.resolve_prompt_mode("auto", make_aoi_catalog(1000)), "discover")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            prompts.build_system_prompt("compact")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.tools.scene_table import SceneTable
+from capstone.tools.stac_search import sort_scenes, top_scenes
+
+
+def _random_rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"s{i}",
+            "datetime": rng.choice([
+                None,
+                "not-a-date",
+                f"2023-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}T01:02:03.5Z",
+                "2023-05-01T09:00:00+09:00",
+            ]),
+            "cloud_cover": rng.choice([None, 1.5, 20.0, rng.random() * 100]),
+            "preview_url": rng.choice([None, f"https://example.com/s{i}.jpg"]),
+        }
+        for i in range(n)
+    ]
+
+
+class TestSceneTable(unittest.TestCase):
+    def test_rows_round_trip(self):
+        rows = _random_rows(50)
+        table = SceneTable.from_rows(rows)
+        self.assertEqual(len(table), 50)
+        self.assertEqual(table.to_rows(), rows)
+        self.assertEqual(table[-1], rows[-1])
+        self.assertEqual(SceneTable.from_rows([]).to_rows(), [])
+
+    def test_sort_and_top_k_match_list_helpers(self):
+        rows = _random_rows(500)
+        table = SceneTable.from_rows(rows)
+        self.assertEqual(table.sort().to_rows(), sort_scenes(rows))
+        for k in (0, 1, 5, 499, 1000):
+            with self.subTest(k=k):
+                self.assertEqual(table.top_k(k).to_rows(), top_scenes(rows, k))
+
+    def test_filter(self):
+        rows = _random_rows(300)
+        table = SceneTable.from_rows(rows)
+        filtered = table.filter(max_cloud_cover=20.0, start="2023-05-01", end="2023-06-30T23:59:59Z")
+        self.assertGreater(len(filtered), 0)
+        for row, ts in zip(filtered, filtered.timestamps):
+            self.assertLessEqual(row["cloud_cover"], 20.0)
+            self.assertTrue(np.datetime64("2023-05-01") <= ts <= np.datetime64("2023-06-30T23:59:59"))
+        # +09:00 の時刻は UTC に直してから比較される
+        self.assertIn(
+            "2023-05-01T09:00:00+09:00",
+            [r["datetime"] for r in table.filter(start="2023-05-01T00:00:00Z", end="2023-05-01T00:00:00Z")],
+        )
+        mask = np.arange(len(table)) % 2 == 0
+        self.assertEqual(len(table.filter(mask)), 150)
+
+    def test_dataframe_shares_numeric_columns(self):
+        table = SceneTable.from_rows(_random_rows(20))
+        df = table.to_dataframe()
+        self.assertEqual(list(df.columns), ["id", "datetime", "cloud_cover", "preview_url"])
+        self.assertTrue(np.shares_memory(df["cloud_cover"].to_numpy(), table.cloud_cover))
+        self.assertTrue(np.shares_memory(df["datetime"].to_numpy(), table.timestamps))
+
+    def test_markdown_matches_prompt_format(self):
+        table = SceneTable.from_rows([
+            {"id": "a", "datetime": "2023-01-01T00:00:00Z", "cloud_cover": 1.5, "preview_url": None},
+            {"id": "b|c", "datetime": None, "cloud_cover": None, "preview_url": "https://x/b.jpg"},
+        ])
+        self.assertEqual(table.to_markdown().splitlines(), [
+            "| id | datetime (UTC) | cloud_cover (%) | preview_url |",
+            "| --- | --- | --- | --- |",
+            "| a | 2023-01-01T00:00:00Z | 1.5 | - |",
+            "| b\\|c | - | - | https://x/b.jpg |",
+        ])
+        self.assertEqual(len(table.to_markdown(limit=1).splitlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.agent import stac_agent_adk
+from capstone.agent.agent_service import AgentService
+from capstone.agent.session_store import SqliteSessionService
+from capstone.scripts.stub_llm import StubLlm
+
+APP = stac_agent_adk.APP_NAME
+
+
+def _service(store: SqliteSessionService) -> AgentService:
+    return AgentService(stac_agent_adk.create_agent(model=StubLlm()), APP, store)
+
+
+class TestSqliteSessionService(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sessions.db"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_sessions_survive_restart(self):
+        store = SqliteSessionService(self.path)
+        asyncio.run(_service(store).ask("hi", "u1", "s1"))
+        store.close()
+
+        reopened = SqliteSessionService(self.path)
+        self.assertEqual(asyncio.run(_service(reopened).ask("again", "u1", "s1")), "ok (turn 2)")
+        session = asyncio.run(reopened.get_session(app_name=APP, user_id="u1", session_id="s1"))
+        self.assertEqual([e.author for e in session.events if e.author == "user"], ["user", "user"])
+        reopened.close()
+
+    def test_warm_cache_is_bounded(self):
+        store = SqliteSessionService(self.path, max_cached_sessions=3)
+        service = _service(store)
+        for i in range(10):
+            asyncio.run(service.ask("hi", "u1", f"s{i}"))
+        self.assertEqual(store.warm_sessions, 3)
+        self.assertEqual(len(asyncio.run(store.list_sessions(app_name=APP)).sessions), 10)
+        # 追い出されたセッションもディスクから再開できる
+        self.assertEqual(asyncio.run(service.ask("again", "u1", "s0")), "ok (turn 2)")
+        store.close()
+
+    def test_idle_sessions_are_evicted(self):
+        store = SqliteSessionService(self.path, idle_timeout=0.0)
+        asyncio.run(store.create_session(app_name=APP, user_id="u1", session_id="s1"))
+        asyncio.run(store.create_session(app_name=APP, user_id="u1", session_id="s2"))
+        self.assertLessEqual(store.warm_sessions, 1)
+        store.close()
+
+    def test_long_histories_are_compacted_at_user_turns(self):
+        store = SqliteSessionService(self.path, max_events=5)
+        service = _service(store)
+        for _ in range(6):
+            asyncio.run(service.ask("hi", "u1", "s1"))
+        session = asyncio.run(store.get_session(app_name=APP, user_id="u1", session_id="s1"))
+        self.assertLessEqual(len(session.events), 5)
+        self.assertEqual(session.events[0].author, "user")
+        self.assertGreater(store.stats.compacted_events, 0)
+        store.close()
+
+        reopened = SqliteSessionService(self.path, max_events=5)
+        on_disk = asyncio.run(reopened.get_session(app_name=APP, user_id="u1", session_id="s1"))
+        self.assertEqual([e.id for e in on_disk.events], [e.id for e in session.events])
+        reopened.close()
+
+    def test_delete_and_purge(self):
+        store = SqliteSessionService(self.path)
+        asyncio.run(store.create_session(app_name=APP, user_id="u1", session_id="s1"))
+        asyncio.run(store.create_session(app_name=APP, user_id="u1", session_id="s2"))
+        asyncio.run(store.delete_session(app_name=APP, user_id="u1", session_id="s1"))
+        self.assertIsNone(asyncio.run(store.get_session(app_name=APP, user_id="u1", session_id="s1")))
+        self.assertEqual(store.purge_idle(older_than=-1.0), 1)
+        self.assertEqual(asyncio.run(store.list_sessions(app_name=APP)).sessions, [])
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import inspect
+import sys
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestAsyncSearch(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=30).start()
+        stac_async.configure_default_async_client(base_url=self.server.url)
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_async.configure_default_async_client()
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.server.stop()
+
+    def test_tool_keeps_sync_tool_name_and_signature(self):
+        tool = stac_async.search_satellite_scenes_tool
+        self.assertEqual(tool.__name__, "search_satellite_scenes")
+        self.assertTrue(inspect.iscoroutinefunction(tool))
+        self.assertEqual(
+            list(inspect.signature(tool).parameters),
+            ["bbox", "datetime_range", "cloud_cover_max", "limit", "collections"],
+        )
+
+    def test_async_search_pages_and_normalizes(self):
+        rows = asyncio.run(
+            stac_async.search_satellite_scenes_async(TOKYO_BBOX, AUGUST_2023, 100.0, limit=25)
+        )
+        self.assertEqual(len(rows), 25)
+        self.assertSetEqual(set(rows[0]), {"id", "datetime", "cloud_cover", "preview_url"})
+
+    def test_concurrent_sessions_overlap(self):
+        self.server.latency = 0.2
+
+        async def run():
+            t0 = time.perf_counter()
+            await asyncio.gather(*(
+                # 同一検索はまとめられてしまうので、条件を少しずつ変える
+                stac_async.search_satellite_scenes_tool(TOKYO_BBOX, AUGUST_2023, 50.0 + i, limit=3)
+                for i in range(8)
+            ))
+            return time.perf_counter() - t0
+
+        self.assertLess(asyncio.run(run()), 8 * 0.2 / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone import tools
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_backends, stac_cache, stac_client, stac_resilience
+from capstone.tools.stac_backends import BackendRegistry, RoutedStacClient, StacBackend
+from capstone.tools.stac_search import search_satellite_scenes
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestBackendRegistry(unittest.TestCase):
+    def setUp(self):
+        self.fast = StubStacServer(n_items=30, latency=0.01).start()
+        self.slow = StubStacServer(n_items=30, latency=0.3).start()
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        stac_backends.set_backend_registry(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        stac_resilience.reset_endpoint_guards()
+        self.fast.stop()
+        self.slow.stop()
+
+    def _registry(self, **kwargs) -> BackendRegistry:
+        return BackendRegistry(
+            [StacBackend("slow", self.slow.url), StacBackend("fast", self.fast.url)], **kwargs
+        )
+
+    def _search(self, cloud: float = 50.0, collections=None) -> list[dict]:
+        return search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, cloud, limit=5, collections=collections)
+
+    def test_routes_to_lowest_ewma(self):
+        registry = self._registry()
+        stac_client.set_default_client(RoutedStacClient(registry, max_retries=0))
+        for i in range(6):
+            self.assertTrue(self._search(10.0 + i))
+        self.assertLess(registry.latency.estimate("fast"), registry.latency.estimate("slow"))
+        self.assertEqual([b.name for b in registry.route()], ["fast", "slow"])
+        # 両方を 1 回ずつ測ったあとは速い方だけに送る
+        self.assertEqual(self.slow.request_count, 1)
+
+    def test_hedged_request_cuts_tail_latency(self):
+        client = RoutedStacClient(self._registry(hedge_after=0.05), max_retries=0)
+        stac_client.set_default_client(client)
+        t0 = time.perf_counter()
+        self.assertTrue(self._search())
+        self.assertLess(time.perf_counter() - t0, 0.25)
+        self.assertEqual((client.stats.hedged, client.stats.hedge_wins), (1, 1))
+        self.assertEqual(client.stats.wins, {"fast": 1})
+
+    def test_failover_and_collection_routing(self):
+        registry = BackendRegistry([
+            StacBackend("landsat-only", self.slow.url, ["landsat-c2-l2"]),
+            StacBackend("primary", self.fast.url, ["sentinel-2-l2a"]),
+        ])
+        client = RoutedStacClient(registry, max_retries=0)
+        stac_client.set_default_client(client)
+        self._search(collections=["landsat-c2-l2"])
+        self.assertEqual((self.slow.request_count, self.fast.request_count), (1, 0))
+        with self.assertRaises(ValueError):
+            registry.route(["landsat-c2-l2", "sentinel-2-l2a"])
+
+        both = BackendRegistry([StacBackend("a", self.fast.url), StacBackend("b", self.slow.url)])
+        client = RoutedStacClient(both, max_retries=0)
+        stac_client.set_default_client(client)
+        self.fast.fault_rate = 1.0
+        self.assertTrue(self._search())
+        self.assertEqual((client.stats.failovers, client.stats.wins), (1, {"b": 1}))
+
+    def test_async_hedging_cancels_the_loser(self):
+        stac_backends.set_backend_registry(self._registry(hedge_after=0.05))
+        stac_async.configure_default_async_client(max_retries=0)
+
+        async def run():
+            t0 = time.perf_counter()
+            rows = await stac_async.search_satellite_scenes_async(TOKYO_BBOX, AUGUST_2023, 50.0, limit=5)
+            return rows, time.perf_counter() - t0, stac_async.get_default_async_client()
+
+        rows, elapsed, client = asyncio.run(run())
+        self.assertTrue(rows)
+        self.assertLess(elapsed, 0.25)
+        self.assertIsInstance(client, stac_backends.AsyncRoutedStacClient)
+        self.assertEqual(client.stats.hedge_wins, 1)
+
+    def test_registry_from_env_config(self):
+        config = {
+            "hedge_after": 0.2,
+            "backends": [
+                {"name": "earth-search", "url": self.fast.url + "/", "collections": ["sentinel-2-l2a"],
+                 "rate": 50, "failure_threshold": 2},
+                {"name": "mirror", "url": self.slow.url},
+            ],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "backends.json"
+            path.write_text(json.dumps(config))
+            with mock.patch.dict(os.environ, {"CAPSTONE_STAC_BACKENDS": str(path)}):
+                stac_backends._registry_configured = False
+                registry = stac_backends.get_backend_registry()
+                stac_client.set_default_client(None)
+                self.assertIsInstance(stac_client.get_default_client(), RoutedStacClient)
+        self.assertEqual([b.url for b in registry.backends], [self.fast.url, self.slow.url])
+        self.assertEqual(registry.hedge_after, 0.2)
+        guard = stac_resilience.endpoint_guard(self.fast.url)
+        self.assertEqual((guard.limiter.rate, guard.breaker.failure_threshold), (50, 2))
+        with self.assertRaises(ValueError):
+            BackendRegistry.from_config({"backends": [{"name": "no-url"}]})
+
+
+class TestToolRegistry(unittest.TestCase):
+    def test_register_multiple_tools(self):
+        spec = dict(tools.SEARCH_STAC_SCENES_TOOL_SPEC, name="search_internal_stac")
+        tools.register_tool(spec, search_satellite_scenes)
+        self.addCleanup(lambda: (tools.TOOL_REGISTRY.pop("search_internal_stac"), tools.TOOL_SPECS.remove(spec)))
+        self.assertEqual(
+            [s["name"] for s in tools.get_tool_specs()], ["search_stac_scenes", "search_internal_stac"]
+        )
+        self.assertIs(tools.get_tool_callable("search_internal_stac"), search_satellite_scenes)
+        with self.assertRaises(ValueError):
+            tools.register_tool(spec, search_satellite_scenes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_search import build_search_payload, search_satellite_scenes
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestCacheKey(unittest.TestCase):
+    def test_key_ignores_order_and_float_noise(self):
+        a = build_search_payload(TOKYO_BBOX, AUGUST_2023, 10.0, 10, ["b", "a"])
+        b = build_search_payload(
+            [138.80000001, 34.8, 140.0, 36.2], AUGUST_2023, 10.0, 10, ["a", "b"]
+        )
+        self.assertEqual(stac_cache.canonical_cache_key(a), stac_cache.canonical_cache_key(b))
+
+    def test_key_depends_on_limit_and_cloud(self):
+        a = build_search_payload(TOKYO_BBOX, AUGUST_2023, 10.0, 10)
+        b = build_search_payload(TOKYO_BBOX, AUGUST_2023, 10.0, 5)
+        c = build_search_payload(TOKYO_BBOX, AUGUST_2023, 20.0, 10)
+        keys = {stac_cache.canonical_cache_key(p) for p in (a, b, c)}
+        self.assertEqual(len(keys), 3)
+
+    def test_is_historical(self):
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.assertTrue(stac_cache.is_historical(AUGUST_2023, now=now))
+        self.assertFalse(stac_cache.is_historical("2023-12-01T00:00:00Z/2023-12-31T23:59:59Z", now=now))
+        self.assertFalse(stac_cache.is_historical("2023-01-01T00:00:00Z/..", now=now))
+
+
+class TestBackends(unittest.TestCase):
+    def _check_lru_and_ttl(self, cache):
+        cache.set("a", [1])
+        cache.set("b", [2])
+        self.assertEqual(cache.get("a"), [1])
+        cache.set("c", [3])  # evicts "b" (least recently used)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), [3])
+        cache.set("short", [4], ttl=0.01)
+        cache.set("forever", [5], ttl=None)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get_stale("short"), [4])
+        self.assertEqual(cache.get("forever"), [5])
+        self.assertGreaterEqual(cache.stats.evictions, 1)
+        self.assertGreaterEqual(cache.stats.expirations, 1)
+        self.assertEqual(cache.stats.hits, 3)
+
+    def test_memory_cache(self):
+        self._check_lru_and_ttl(stac_cache.MemoryCache(max_entries=2))
+
+    def test_sqlite_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = stac_cache.SQLiteCache(Path(tmp) / "cache.sqlite", max_entries=2)
+            self._check_lru_and_ttl(cache)
+            cache.close()
+            # 再オープンしても残っている
+            reopened = stac_cache.SQLiteCache(Path(tmp) / "cache.sqlite", max_entries=2)
+            self.assertEqual(reopened.get("forever"), [5])
+            reopened.close()
+
+
+class TestSearchCaching(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=20).start()
+        stac_client.set_default_client(stac_client.StacClient(base_url=self.server.url))
+        self.cache = stac_cache.MemoryCache()
+        stac_cache.set_search_cache(self.cache)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.server.stop()
+
+    def test_identical_queries_hit_cache(self):
+        first = search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 50.0, limit=5)
+        first[0]["id"] = "mutated"
+        second = search_satellite_scenes(list(TOKYO_BBOX), AUGUST_2023, 50.0, limit=5)
+        self.assertEqual(self.server.request_count, 1)
+        self.assertNotEqual(second[0]["id"], "mutated")
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(self.cache.stats.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
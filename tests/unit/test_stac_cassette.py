@@ -0,0 +1,194 @@
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+from capstone.agent import stac_agent_adk
+from capstone.agent.agent_service import AgentService
+from capstone.agent.llm_cassette import (
+    CassetteLlm,
+    install_cassettes,
+    llm_request_key,
+    set_llm_cassette,
+)
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client
+from capstone.tools.stac_cassette import (
+    AUTO,
+    RECORD,
+    REPLAY,
+    AsyncCassetteStacClient,
+    Cassette,
+    CassetteMissError,
+    CassetteStacClient,
+)
+from capstone.tools.stac_search import search_satellite_scenes
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class _ScriptedLlm(BaseLlm):
+    """Calls the search tool once, then reports how many scenes came back."""
+
+    model: str = "scripted"
+    latency: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        last = llm_request.contents[-1].parts[0]
+        if last.function_response is not None:
+            n = len(last.function_response.response["result"])
+            part = types.Part(text=f"found {n} scenes")
+        else:
+            part = types.Part(function_call=types.FunctionCall(
+                name="search_satellite_scenes",
+                args={"bbox": TOKYO_BBOX, "datetime_range": AUGUST_2023, "cloud_cover_max": 20.0, "limit": 5},
+            ))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]), turn_complete=True)
+
+
+class TestCassette(unittest.TestCase):
+    def setUp(self):
+        stac_cache.set_search_cache(None)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "stac.json.gz"
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        set_llm_cassette(None)
+        stac_cache.set_search_cache(None)
+        self.tmp.cleanup()
+
+    def test_replays_recorded_searches_without_the_server(self):
+        with StubStacServer(n_items=50) as server:
+            stac_client.set_default_client(CassetteStacClient(Cassette(self.path, RECORD), base_url=server.url))
+            recorded = search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 20.0, limit=5)
+            stac_client.get_default_client().cassette.save()
+
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["meta"]["base_url"], server.url)
+
+        # サーバー停止後も、記録時の base_url を使って同じ結果を返す
+        cassette = Cassette(self.path, REPLAY)
+        stac_client.set_default_client(CassetteStacClient(cassette))
+        self.assertEqual(search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 20.0, limit=5), recorded)
+        self.assertEqual(cassette.stats.misses, 0)
+
+        with self.assertRaises(CassetteMissError):
+            search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 5.0, limit=5)
+
+    def test_async_client_shares_keys_with_sync_client(self):
+        with StubStacServer(n_items=50) as server:
+            cassette = Cassette(self.path, RECORD)
+            with CassetteStacClient(cassette, base_url=server.url) as client:
+                page = client.post_search({"bbox": TOKYO_BBOX, "limit": 3})
+            cassette.save()
+
+        async def replay():
+            client = AsyncCassetteStacClient(Cassette(self.path, REPLAY), base_url="http://other.invalid")
+            try:
+                return await client.post_search({"limit": 3, "bbox": TOKYO_BBOX})
+            finally:
+                await client.aclose()
+
+        self.assertEqual(asyncio.run(replay()), page)
+
+    def test_auto_mode_records_only_misses_and_save_merges(self):
+        with StubStacServer(n_items=50) as server:
+            first = Cassette(self.path, AUTO)
+            CassetteStacClient(first, base_url=server.url).post_search({"limit": 1})
+            second = Cassette(self.path, AUTO)  # 別プロセス相当: first の保存前に読み込む
+            CassetteStacClient(second, base_url=server.url).post_search({"limit": 2})
+            first.save()
+            second.save()
+
+            merged = Cassette(self.path, AUTO)
+            self.assertEqual(len(merged), 2)
+            before = server.request_count
+            CassetteStacClient(merged, base_url=server.url).post_search({"limit": 1})
+            self.assertEqual(server.request_count, before)
+            self.assertEqual((merged.stats.hits, merged.stats.recorded), (1, 0))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Cassette(self.path, "live")
+
+
+class TestLlmCassette(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        set_llm_cassette(None)
+        stac_cache.set_search_cache(None)
+        self.tmp.cleanup()
+
+    def _ask(self, model: BaseLlm) -> str:
+        agent = stac_agent_adk.create_agent(model=model)
+        return asyncio.run(AgentService(agent, stac_agent_adk.APP_NAME).ask("tokyo, august 2023", "u", "s"))
+
+    def test_agent_turn_replays_model_and_stac_offline(self):
+        with StubStacServer(n_items=50) as server:
+            llm, stac = install_cassettes(self.tmp.name, RECORD)
+            stac_async.configure_default_async_client(
+                client_factory=lambda **s: AsyncCassetteStacClient(stac, base_url=server.url, **s)
+            )
+            live = _ScriptedLlm(latency=0.5)
+            answer = self._ask(CassetteLlm(model="scripted", inner=live))
+            llm.save()
+            stac.save()
+        self.assertEqual(answer, "found 5 scenes")
+        self.assertEqual(live.calls, 2)
+
+        # モデルも STAC サーバーも無しで、同じ応答を即座に返す
+        llm, stac = install_cassettes(self.tmp.name, REPLAY)
+        t0 = time.perf_counter()
+        self.assertEqual(self._ask(CassetteLlm(model="scripted")), answer)
+        self.assertLess(time.perf_counter() - t0, 0.5)
+        self.assertEqual((llm.stats.misses, stac.stats.misses), (0, 0))
+
+    def test_gemini_names_resolve_to_cassette_llm(self):
+        install_cassettes(self.tmp.name, REPLAY)
+        llm = LLMRegistry.new_llm("gemini-2.0-flash")
+        self.assertIsInstance(llm, CassetteLlm)
+        request = LlmRequest(model="gemini-2.0-flash", contents=[types.Content(role="user", parts=[types.Part(text="hi")])])
+
+        async def first():
+            return [r async for r in llm.generate_content_async(request)]
+
+        with self.assertRaises(CassetteMissError):
+            asyncio.run(first())
+
+    def test_request_key_ignores_generated_call_ids(self):
+        def request(call_id: str) -> LlmRequest:
+            return LlmRequest(model="m", contents=[
+                types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(id=call_id, name="f", args={}))]),
+                types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+                    id=call_id, name="f", response={"result": []}
+                ))]),
+            ])
+
+        self.assertEqual(llm_request_key(request("adk-1")), llm_request_key(request("adk-2")))
+        self.assertNotEqual(llm_request_key(request("adk-1")), llm_request_key(request("adk-1"), stream=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
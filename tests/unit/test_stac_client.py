@@ -0,0 +1,143 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_search import (
+    iter_satellite_scenes,
+    search_satellite_scenes,
+    top_scenes,
+)
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestStacClient(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=30).start()
+        self.client = stac_client.StacClient(base_url=self.server.url, pool_size=2)
+        stac_client.set_default_client(self.client)
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.server.stop()
+
+    def test_search_returns_normalized_rows(self):
+        rows = search_satellite_scenes(
+            bbox=[138.8, 34.8, 140.0, 36.2],
+            datetime_range="2023-08-01T00:00:00Z/2023-08-31T23:59:59Z",
+            cloud_cover_max=50.0,
+            limit=5,
+        )
+        self.assertLessEqual(len(rows), 5)
+        self.assertTrue(rows)
+        self.assertSetEqual(set(rows[0]), {"id", "datetime", "cloud_cover", "preview_url"})
+        self.assertTrue(all(r["cloud_cover"] <= 50.0 for r in rows))
+        self.assertTrue(rows[0]["preview_url"].endswith("thumbnail.jpg"))
+
+    def test_connections_are_reused(self):
+        for _ in range(5):
+            search_satellite_scenes(
+                bbox=[138.8, 34.8, 140.0, 36.2],
+                datetime_range="2023-08-01T00:00:00Z/2023-08-31T23:59:59Z",
+                cloud_cover_max=100.0,
+            )
+        self.assertEqual(self.server.request_count, 5)
+        self.assertEqual(self.server.connection_count, 1)
+
+    def test_request_error_is_wrapped(self):
+        client = stac_client.StacClient(base_url=self.server.url + "/missing", max_retries=0)
+        stac_client.set_default_client(client)
+        with self.assertRaises(RuntimeError):
+            search_satellite_scenes(
+                bbox=[138.8, 34.8, 140.0, 36.2],
+                datetime_range="2023-08-01T00:00:00Z/2023-08-31T23:59:59Z",
+                cloud_cover_max=10.0,
+            )
+
+    def test_iter_follows_next_links(self):
+        rows = list(iter_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 100.0, page_size=7))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(len({r["id"] for r in rows}), 30)
+        # 30 件 / 7 件ずつ -> 5 ページ
+        self.assertEqual(self.server.request_count, 5)
+
+    def test_iter_stops_at_max_items_without_extra_pages(self):
+        rows = list(iter_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 100.0, page_size=4, max_items=6))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_iter_early_break_is_lazy(self):
+        for _ in iter_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 100.0, page_size=5):
+            break
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_search_limit_spans_pages(self):
+        rows = search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 100.0, limit=25)
+        self.assertEqual(len(rows), 25)
+
+    def test_top_scenes_orders_by_cloud_then_recency(self):
+        rows = [
+            {"id": "a", "datetime": "2023-08-01T00:00:00Z", "cloud_cover": 5.0},
+            {"id": "b", "datetime": "2023-08-20T00:00:00Z", "cloud_cover": 5.0},
+            {"id": "c", "datetime": "2023-08-10T00:00:00Z", "cloud_cover": 1.0},
+            {"id": "d", "datetime": "2023-08-11T00:00:00Z", "cloud_cover": None},
+        ]
+        self.assertEqual([r["id"] for r in top_scenes(iter(rows), k=3)], ["c", "b", "a"])
+
+    def test_invalid_pool_size(self):
+        with self.assertRaises(ValueError):
+            stac_client.StacClient(pool_size=0)
+
+
+class TestSearchExtensions(unittest.TestCase):
+    def setUp(self):
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+
+    def _search(self, extensions: bool, limit: int = 5):
+        with StubStacServer(n_items=60, extensions=extensions) as server:
+            stac_client.set_default_client(stac_client.StacClient(base_url=server.url))
+            rows = search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 100.0, limit=limit)
+            all_clouds = sorted(item["properties"]["eo:cloud_cover"] for item in server.items)
+            return rows, all_clouds, server.bytes_sent
+
+    def test_parse_conformance(self):
+        found = stac_client.parse_search_extensions([
+            "https://api.stacspec.org/v1.0.0/item-search",
+            "https://api.stacspec.org/v1.0.0-rc.1/item-search#fields",
+            "https://api.stacspec.org/v1.0.0/item-search#sort",
+            "https://api.stacspec.org/v1.0.0/ogcapi-features#sort",
+        ])
+        self.assertEqual(found, frozenset({"fields", "sort"}))
+
+    def test_server_side_sort_returns_exact_top_k(self):
+        rows, all_clouds, _ = self._search(extensions=True)
+        self.assertEqual([r["cloud_cover"] for r in rows], all_clouds[:5])
+        self.assertTrue(rows[0]["preview_url"].endswith("thumbnail.jpg"))
+
+    def test_fields_shrink_payload(self):
+        _, _, projected = self._search(extensions=True, limit=50)
+        _, _, full = self._search(extensions=False, limit=50)
+        self.assertLess(projected * 10, full)
+
+    def test_fallback_without_extensions_keeps_limit_and_order(self):
+        rows, _, _ = self._search(extensions=False)
+        self.assertEqual(len(rows), 5)
+        clouds = [r["cloud_cover"] for r in rows]
+        self.assertEqual(clouds, sorted(clouds))
+
+
+if __name__ == "__main__":
+    unittest.main()
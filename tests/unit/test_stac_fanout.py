@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client, stac_fanout
+from capstone.tools.stac_search import search_satellite_scenes
+
+JAPAN_BBOX = [122.0, 24.0, 153.0, 46.0]
+# カタログのポリゴンを持たない範囲（タイルの分割数をそのまま数えられる）
+OPEN_SEA_BBOX = [160.0, -30.0, 190.0, -6.0]
+TOKYO_TILE = [139.0, 35.0, 140.0, 36.0]
+FIRST_HALF_2023 = "2023-01-01T00:00:00Z/2023-06-30T23:59:59Z"
+
+
+class TestPlanning(unittest.TestCase):
+    def test_split_bbox_covers_extent(self):
+        tiles = stac_fanout.split_bbox([122.0, 24.0, 153.0, 46.0], tile_deg=10.0)
+        self.assertEqual(len(tiles), 4 * 3)
+        self.assertEqual(min(t[0] for t in tiles), 122.0)
+        self.assertEqual(max(t[2] for t in tiles), 153.0)
+        self.assertEqual(max(t[3] for t in tiles), 46.0)
+
+    def test_split_monthly_crosses_year(self):
+        windows = stac_fanout.split_monthly("2022-11-15T00:00:00Z/2023-01-10T12:00:00Z")
+        self.assertEqual(windows, [
+            "2022-11-15T00:00:00Z/2022-11-30T23:59:59Z",
+            "2022-12-01T00:00:00Z/2022-12-31T23:59:59Z",
+            "2023-01-01T00:00:00Z/2023-01-10T12:00:00Z",
+        ])
+
+    def test_split_monthly_open_interval_unchanged(self):
+        self.assertEqual(stac_fanout.split_monthly("2023-01-01T00:00:00Z/.."), ["2023-01-01T00:00:00Z/.."])
+
+    def test_headline_query_is_coarsened_to_fit(self):
+        # 日本全体 x 27 か月は 12 タイル x 27 = 324 件になるので、上限に収まるまで粗くする
+        plan = stac_fanout.plan_subqueries(JAPAN_BBOX, "2021-06-01T00:00:00Z/2023-08-31T23:59:59Z")
+        self.assertLessEqual(len(plan), stac_fanout.MAX_SUBQUERIES)
+        windows = sorted({sub["datetime_range"] for sub in plan})
+        self.assertEqual(windows[0][:10], "2021-06-01")
+        self.assertEqual(windows[-1][-20:], "2023-08-31T23:59:59Z")
+
+    def test_separate_windows(self):
+        summers = ",".join(f"{y}-06-01T00:00:00Z/{y}-08-31T23:59:59Z" for y in (2021, 2022, 2023))
+        plan = stac_fanout.plan_subqueries(JAPAN_BBOX, summers)
+        windows = {sub["datetime_range"] for sub in plan}
+        self.assertEqual(len(windows), 9)
+        self.assertFalse(any(w.startswith("2021-09") or w.startswith("2022-01") for w in windows))
+        self.assertTrue(stac_fanout.should_fan_out(summers))
+        self.assertFalse(stac_fanout.should_fan_out("2023-06-01T00:00:00Z/2023-08-31T23:59:59Z"))
+
+    def test_long_single_range_fans_out_only_without_sort_or_on_request(self):
+        year = "2023-01-01T00:00:00Z/2023-12-31T23:59:59Z"
+        with mock.patch.dict(os.environ):
+            os.environ.pop("CAPSTONE_FANOUT", None)
+            self.assertTrue(stac_fanout.should_fan_out(year, sort_supported=False))
+            self.assertFalse(stac_fanout.should_fan_out(year, sort_supported=True))
+            self.assertTrue(stac_fanout.should_fan_out(year, sort_supported=True, requested=True))
+            self.assertFalse(stac_fanout.should_fan_out(year, sort_supported=False, requested=False))
+            os.environ["CAPSTONE_FANOUT"] = "1"
+            self.assertTrue(stac_fanout.should_fan_out(year, sort_supported=True))
+            os.environ["CAPSTONE_FANOUT"] = "0"
+            self.assertFalse(stac_fanout.should_fan_out(year, sort_supported=False))
+
+    def test_plan_is_bounded(self):
+        days = ",".join(f"2023-01-{d:02d}T00:00:00Z/2023-01-{d:02d}T23:59:59Z" for d in range(1, 32))
+        with self.assertRaises(ValueError):
+            stac_fanout.plan_subqueries(JAPAN_BBOX, days, max_subqueries=30)
+
+    def test_tiles_outside_the_polygon_are_skipped(self):
+        corner = {"type": "Polygon", "coordinates": [[[123, 25], [126, 25], [126, 27], [123, 27], [123, 25]]]}
+        plan = stac_fanout.plan_subqueries(
+            JAPAN_BBOX, "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z", intersects=corner
+        )
+        self.assertEqual(len(plan), 1)
+        self.assertEqual(plan[0]["intersects"]["type"], "Polygon")
+
+
+class TestFanoutSearch(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=40, latency=0.02).start()
+        stac_client.set_default_client(stac_client.StacClient(base_url=self.server.url))
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.server.stop()
+
+    def test_merges_dedupes_and_sorts(self):
+        rows = stac_fanout.fanout_search(
+            OPEN_SEA_BBOX,
+            "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z",
+            cloud_cover_max=60.0,
+            limit=8,
+            tile_deg=16.0,
+            max_concurrency=3,
+        )
+        # 2 x 2 タイル x 3 か月 = 12 サブクエリ（スタブは同じ候補を返すので id で重複排除される）
+        self.assertEqual(self.server.request_count, 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(len({r["id"] for r in rows}), 8)
+        clouds = [r["cloud_cover"] for r in rows]
+        self.assertEqual(clouds, sorted(clouds))
+
+    def test_search_tool_fans_out_separate_windows(self):
+        summers = ",".join(f"{y}-06-01T00:00:00Z/{y}-08-31T23:59:59Z" for y in (2021, 2022))
+        rows = search_satellite_scenes([139.0, 35.0, 140.0, 36.0], summers, 60.0, limit=5)
+        self.assertEqual(self.server.request_count, 6)  # 1 タイル x 6 か月
+        self.assertEqual(len(rows), 5)
+
+    def test_long_range_is_one_sorted_request_when_the_endpoint_sorts(self):
+        rows = search_satellite_scenes(TOKYO_TILE, FIRST_HALF_2023, 60.0, limit=5)
+        self.assertEqual(self.server.request_count, 1)
+        self.assertEqual(len(rows), 5)
+
+    def test_long_range_fans_out_without_sort(self):
+        self.server.extensions = False
+        stac_client.set_default_client(stac_client.StacClient(base_url=self.server.url))
+        rows = search_satellite_scenes(TOKYO_TILE, FIRST_HALF_2023, 60.0, limit=5)
+        self.assertEqual(self.server.request_count, 6)
+        self.assertEqual(len(rows), 5)
+
+    def test_async_search_tool_fans_out_long_ranges_on_request(self):
+        stac_async.configure_default_async_client(base_url=self.server.url)
+        rows = asyncio.run(stac_async.search_satellite_scenes_async(
+            TOKYO_TILE, FIRST_HALF_2023, 60.0, limit=5, fanout=True
+        ))
+        self.assertEqual(self.server.request_count, 6)
+        self.assertEqual(len(rows), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import shapely
+from shapely.geometry import shape
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS, aoi_geometry, geometry_for_bbox
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_footprint import filter_features, footprint_mask, prepare_footprint
+from capstone.tools.stac_search import build_search_payload, search_satellite_scenes
+
+JAPAN_BBOX = KNOWN_AOIS["japan"]["bbox"]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+SQUARE = {"type": "Polygon", "coordinates": [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]]}
+
+
+class TestFootprintFilter(unittest.TestCase):
+    def test_mask_uses_geometry_then_bbox(self):
+        features = [
+            {"id": "inside-bbox", "bbox": [1, 1, 2, 2]},
+            {"id": "outside-bbox", "bbox": [20, 20, 21, 21]},
+            {"id": "inside-geom", "geometry": {"type": "Point", "coordinates": [5, 5]}},
+            {"id": "outside-geom", "bbox": [1, 1, 2, 2], "geometry": {"type": "Point", "coordinates": [50, 5]}},
+            {"id": "unknown"},
+            {"id": "inside-3d", "bbox": [1, 1, 0, 2, 2, 100]},
+        ]
+        mask = footprint_mask(features, prepare_footprint(SQUARE))
+        self.assertEqual(mask.tolist(), [True, False, True, False, True, True])
+
+    def test_filter_without_footprint_is_noop(self):
+        features = [{"id": "a", "bbox": [50, 50, 51, 51]}]
+        self.assertIs(filter_features(features, None), features)
+
+    def test_invalid_geometry(self):
+        bowtie = {"type": "Polygon", "coordinates": [[[0, 0], [1, 1], [1, 0], [0, 1], [0, 0]]]}
+        with self.assertRaises(ValueError):
+            prepare_footprint(bowtie)
+
+    def test_payload_uses_intersects_instead_of_bbox(self):
+        payload = build_search_payload(JAPAN_BBOX, AUGUST_2023, 20.0, 10, intersects=SQUARE)
+        self.assertNotIn("bbox", payload)
+        self.assertEqual(payload["intersects"], SQUARE)
+
+    def test_catalog_polygons(self):
+        self.assertIsNotNone(geometry_for_bbox(JAPAN_BBOX))
+        self.assertIsNone(geometry_for_bbox([0.0, 0.0, 1.0, 1.0]))
+        self.assertIsNone(aoi_geometry("tokyo_area"))
+        japan = shape(aoi_geometry("japan"))
+        self.assertTrue(japan.is_valid)
+        self.assertTrue(japan.contains(shapely.Point(139.7, 35.7)))  # 東京
+        self.assertFalse(japan.contains(shapely.Point(127.0, 37.5)))  # ソウル
+
+    def test_japan_polygon_keeps_outlying_islands(self):
+        # 旧 bbox に入っていた離島を多角形化で落とさない（bbox 指定の検索は自動でこの多角形に絞られる）
+        islands = {
+            "Tsushima": (129.3, 34.4),
+            "Goto": (128.84, 32.7),
+            "Rishiri": (141.24, 45.18),
+            "Oki": (133.3, 36.2),
+            "Ogasawara": (142.19, 27.09),
+            "Minami-Daito": (131.24, 25.84),
+        }
+        for aoi_id in ("japan", "japan_cloud_free_focused"):
+            geometry = shape(aoi_geometry(aoi_id))
+            for name, point in islands.items():
+                with self.subTest(aoi_id=aoi_id, island=name):
+                    self.assertTrue(geometry.contains(shapely.Point(*point)))
+
+
+class TestPolygonSearch(unittest.TestCase):
+    def setUp(self):
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+
+    def _search_japan(self, **server_kwargs):
+        with StubStacServer(n_items=200, **server_kwargs) as server:
+            stac_client.set_default_client(stac_client.StacClient(base_url=server.url))
+            return search_satellite_scenes(JAPAN_BBOX, AUGUST_2023, 100.0, limit=200)
+
+    def test_catalog_bbox_is_refined_to_polygon(self):
+        japan = shape(aoi_geometry("japan"))
+        with StubStacServer(n_items=200) as server:
+            by_id = {item["id"]: item for item in server.items}
+        rows = self._search_japan(spatial_filter=True)
+        self.assertGreater(len(rows), 0)
+        self.assertLess(len(rows), 200)
+        for row in rows:
+            self.assertTrue(japan.intersects(shape(by_id[row["id"]]["geometry"])))
+
+    def test_local_filter_when_endpoint_ignores_intersects(self):
+        server_side = {r["id"] for r in self._search_japan(spatial_filter=True)}
+        local_only = {r["id"] for r in self._search_japan(spatial_filter=False)}
+        local_only_plain = {r["id"] for r in self._search_japan(spatial_filter=False, extensions=False)}
+        self.assertEqual(local_only, server_side)
+        self.assertEqual(local_only_plain, server_side)
+
+
+if __name__ == "__main__":
+    unittest.main()
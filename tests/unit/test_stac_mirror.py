@@ -0,0 +1,122 @@
+import sys
+import time
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS, aoi_geometry
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.scripts.synthetic import make_stac_item
+from capstone.tools import stac_cache, stac_client, stac_mirror
+from capstone.tools.stac_search import search_satellite_scenes
+
+JAPAN_BBOX = KNOWN_AOIS["japan"]["bbox"]
+TOKYO_BBOX = KNOWN_AOIS["tokyo_area"]["bbox"]
+H1_2023 = "2023-01-01T00:00:00Z/2023-06-30T23:59:59Z"
+
+
+class TestStacMirror(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(
+            n_items=600, spatial_filter=True, temporal_filter=True, bbox=JAPAN_BBOX
+        ).start()
+        self.client = stac_client.StacClient(base_url=self.server.url)
+        stac_client.set_default_client(self.client)
+        stac_cache.set_search_cache(None)
+        self.mirror = stac_mirror.StacMirror(":memory:")
+
+    def tearDown(self):
+        stac_mirror.set_mirror(None)
+        stac_client.set_default_client(None)
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.mirror.close()
+        self.client.close()
+        self.server.stop()
+
+    def test_sync_is_incremental(self):
+        stats = self.mirror.sync(JAPAN_BBOX, H1_2023, client=self.client)
+        self.assertEqual(stats.windows_synced, 6)
+        self.assertGreater(len(self.mirror), 0)
+
+        requests_before = self.server.request_count
+        stats = self.mirror.sync(JAPAN_BBOX, H1_2023, client=self.client)
+        self.assertEqual((stats.windows_synced, stats.windows_skipped), (0, 6))
+        self.assertEqual(self.server.request_count, requests_before)
+
+        # 範囲を延ばすと、足りない月だけ取りに行く
+        stats = self.mirror.sync(JAPAN_BBOX, "2023-01-01T00:00:00Z/2023-07-31T23:59:59Z", client=self.client)
+        self.assertEqual((stats.windows_synced, stats.windows_skipped), (1, 6))
+
+    def test_recent_windows_expire(self):
+        self.mirror.max_staleness = 0.0
+        now = time.strftime("%Y-%m-01T00:00:00Z/%Y-%m-%dT23:59:59Z", time.gmtime())
+        self.mirror.sync(JAPAN_BBOX, now, client=self.client)
+        self.assertFalse(self.mirror.covers(JAPAN_BBOX, now))
+        self.assertEqual(self.mirror.sync(JAPAN_BBOX, now, client=self.client).windows_synced, 1)
+
+    def test_search_matches_remote(self):
+        self.mirror.sync(JAPAN_BBOX, H1_2023, client=self.client)
+        for bbox, datetime_range, cloud, limit in [
+            (JAPAN_BBOX, H1_2023, 40.0, 20),
+            (TOKYO_BBOX, "2023-02-01T00:00:00Z/2023-05-15T23:59:59Z", 100.0, 50),
+            ([130.0, 30.0, 140.0, 40.0], "2023-03-10T00:00:00Z/2023-03-20T23:59:59Z", 60.0, 5),
+        ]:
+            with self.subTest(bbox=bbox, datetime_range=datetime_range):
+                remote = search_satellite_scenes(bbox, datetime_range, cloud, limit)
+                intersects = aoi_geometry("japan") if bbox == JAPAN_BBOX else None
+                local = self.mirror.search(bbox, datetime_range, cloud, limit, intersects=intersects)
+                self.assertEqual(local, remote)
+
+    def test_bbox_search_matches_footprints_not_item_bboxes(self):
+        # bbox は検索範囲と重なるが、斜めのフットプリント自体は重ならない item
+        item = make_stac_item(0, start=datetime(2023, 3, 1, tzinfo=timezone.utc))
+        item["bbox"] = [138.5, 34.5, 142.0, 38.0]
+        item["geometry"] = {
+            "type": "Polygon",
+            "coordinates": [[[138.5, 38.0], [142.0, 38.0], [142.0, 34.5], [138.5, 38.0]]],
+        }
+        item["properties"]["eo:cloud_cover"] = 0.0
+        self.server.items.append(item)
+        self.mirror.sync(JAPAN_BBOX, H1_2023, client=self.client)
+
+        bbox = [139.0, 35.0, 140.0, 36.0]
+        remote = search_satellite_scenes(bbox, H1_2023, 100.0, 5)
+        local = self.mirror.search(bbox, H1_2023, 100.0, 5)
+        self.assertNotIn(item["id"], [r["id"] for r in local])
+        self.assertEqual(local, remote)
+        self.assertIn(item["id"], [r["id"] for r in self.mirror.search([141.0, 36.0, 142.0, 37.0], H1_2023, 100.0, 5)])
+
+    def test_search_outside_coverage_returns_none(self):
+        self.mirror.sync(TOKYO_BBOX, H1_2023, client=self.client)
+        self.assertIsNone(self.mirror.search(JAPAN_BBOX, H1_2023, 50.0))
+        self.assertIsNone(self.mirror.search(TOKYO_BBOX, "2023-06-01T00:00:00Z/2023-07-31T23:59:59Z", 50.0))
+        self.assertIsNone(self.mirror.search(TOKYO_BBOX, "2023-01-01T00:00:00Z/..", 50.0))
+        self.assertIsNone(self.mirror.search(TOKYO_BBOX, H1_2023, 50.0, collections=["landsat-c2-l2"]))
+        self.assertIsNotNone(self.mirror.search(TOKYO_BBOX, "2023-02-03T00:00:00Z/2023-04-20T23:59:59Z", 50.0))
+
+    def test_tool_queries_mirror_first(self):
+        self.mirror.sync(JAPAN_BBOX, H1_2023, client=self.client)
+        stac_mirror.set_mirror(self.mirror)
+
+        requests_before = self.server.request_count
+        rows = search_satellite_scenes(TOKYO_BBOX, H1_2023, 100.0, limit=5)
+        self.assertEqual(self.server.request_count, requests_before)
+        self.assertLessEqual(len(rows), 5)
+
+        # ミラーに無い期間はリモートに問い合わせる
+        search_satellite_scenes(TOKYO_BBOX, "2023-07-01T00:00:00Z/2023-07-31T23:59:59Z", 100.0, limit=5)
+        self.assertGreater(self.server.request_count, requests_before)
+
+    def test_invalid_sync_arguments(self):
+        with self.assertRaises(ValueError):
+            self.mirror.sync([1.0, 2.0], H1_2023, client=self.client)
+        with self.assertRaises(ValueError):
+            self.mirror.sync(TOKYO_BBOX, "2023-01-01T00:00:00Z/..", client=self.client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client, stac_resilience
+from capstone.tools.stac_resilience import CircuitBreaker, CircuitOpenError, TokenBucket
+from capstone.tools.stac_search import search_satellite_scenes
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestPrimitives(unittest.TestCase):
+    def test_token_bucket_spaces_requests(self):
+        bucket = TokenBucket(rate=10.0, burst=2)
+        waits = [bucket.reserve() for _ in range(5)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        for expected, wait in zip([0.1, 0.2, 0.3], waits[2:]):
+            self.assertAlmostEqual(wait, expected, delta=0.01)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_breaker_opens_probes_and_closes(self):
+        breaker = CircuitBreaker("stub", failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, stac_resilience.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, stac_resilience.HALF_OPEN)
+        breaker.before_call()  # プローブは 1 件だけ
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, stac_resilience.OPEN)
+
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(breaker.state, stac_resilience.CLOSED)
+        self.assertEqual((breaker.stats.opened, breaker.stats.rejected), (2, 2))
+
+
+class TestEndpointGuard(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=30).start()
+        self.guard = stac_resilience.configure_endpoint(self.server.url, failure_threshold=3, reset_timeout=0.3)
+        stac_client.set_default_client(stac_client.StacClient(base_url=self.server.url, max_retries=0))
+        stac_async.configure_default_async_client(base_url=self.server.url, max_retries=0)
+        # TTL 0 = すぐ期限切れになり、停止中の stale 応答だけが使える
+        stac_cache.set_search_cache(stac_cache.MemoryCache(ttl=0.0))
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        stac_resilience.reset_endpoint_guards()
+        self.server.stop()
+
+    def _search(self, cloud: float) -> list[dict]:
+        return search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, cloud, limit=5)
+
+    def test_outage_fails_fast_and_serves_stale_cache(self):
+        healthy = self._search(50.0)
+        self.server.fault_rate = 1.0
+        for cloud in (10.0, 20.0, 30.0):
+            with self.assertRaises(RuntimeError):
+                self._search(cloud)
+        self.assertEqual(self.guard.breaker.state, stac_resilience.OPEN)
+
+        requests_before = self.server.request_count
+        self.assertEqual(self._search(50.0), healthy)
+        with self.assertRaises(CircuitOpenError):
+            self._search(40.0)
+        # 非同期クライアントも同じブレーカーを見る
+        with self.assertRaises(CircuitOpenError):
+            asyncio.run(stac_async.search_satellite_scenes_async(TOKYO_BBOX, AUGUST_2023, 40.0, limit=5))
+        self.assertEqual(self.server.request_count, requests_before)
+
+        self.server.fault_rate = 0.0
+        time.sleep(0.3)
+        self.assertTrue(self._search(40.0))
+        self.assertEqual(self.guard.breaker.state, stac_resilience.CLOSED)
+
+    def test_async_failures_open_the_circuit(self):
+        self.server.fault_rate = 1.0
+
+        async def run():
+            for cloud in (10.0, 20.0, 30.0):
+                with self.assertRaises(RuntimeError):
+                    await stac_async.search_satellite_scenes_async(TOKYO_BBOX, AUGUST_2023, cloud, limit=5)
+
+        asyncio.run(run())
+        with self.assertRaises(CircuitOpenError):
+            self._search(40.0)
+
+    def test_sync_and_async_retries_count_per_attempt(self):
+        # 再試行も 1 回の失敗として数えるので、論理リクエスト 1 つでブレーカーが開く
+        self.server.fault_rate = 1.0
+        def sync_search():
+            with stac_client.StacClient(base_url=self.server.url, max_retries=2, backoff_factor=0.0) as client:
+                client.post_search({})
+
+        async def async_search():
+            client = stac_async.AsyncStacClient(base_url=self.server.url, max_retries=2, backoff_factor=0.0)
+            async with client:
+                await client.post_search({})
+
+        clients = {"sync": sync_search, "async": lambda: asyncio.run(async_search())}
+        for name, request in clients.items():
+            with self.subTest(client=name):
+                guard = stac_resilience.configure_endpoint(self.server.url, failure_threshold=3, reset_timeout=60.0)
+                requests_before = self.server.request_count
+                with self.assertRaises(Exception):
+                    request()
+                self.assertEqual(self.server.request_count - requests_before, 3)
+                self.assertEqual(guard.breaker.stats.failures, 3)
+                self.assertEqual(guard.breaker.state, stac_resilience.OPEN)
+
+    def test_client_errors_do_not_open_the_circuit(self):
+        client = stac_client.StacClient(base_url=self.server.url, max_retries=0)
+        for _ in range(5):
+            with self.assertRaises(Exception):
+                client.request_json("POST", self.server.url + "/missing", {})
+        self.assertEqual(self.guard.breaker.state, stac_resilience.CLOSED)
+
+    def test_rate_limit_is_shared_across_threads(self):
+        stac_resilience.configure_endpoint(self.server.url, rate=20.0, burst=1)
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(self._search, [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]))
+        self.assertGreaterEqual(time.perf_counter() - t0, 5 / 20.0 - 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import asyncio
+import sys
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.tools import stac_async, stac_cache, stac_client
+from capstone.tools.stac_search import search_satellite_scenes
+from capstone.tools.stac_singleflight import AsyncSingleFlight, SingleFlight, request_key
+
+TOKYO_BBOX = [138.8, 34.8, 140.0, 36.2]
+AUGUST_2023 = "2023-08-01T00:00:00Z/2023-08-31T23:59:59Z"
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_request_key_is_canonical(self):
+        a = {"collections": ["b", "a"], "bbox": [1.00001, 2.0, 3.0, 4.0], "limit": 5}
+        b = {"limit": 5, "bbox": [1.0, 2.0, 3.0, 4.0], "collections": ["a", "b"]}
+        self.assertEqual(request_key("POST", "u", a), request_key("post", "u", b))
+        self.assertNotEqual(request_key("POST", "u", a), request_key("POST", "v", a))
+        self.assertNotEqual(request_key("POST", "u", a), request_key("POST", "u", dict(a, limit=6)))
+
+    def test_errors_are_shared_and_not_remembered(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def failing():
+            started.set()
+            release.wait()
+            raise ValueError("upstream down")
+
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(flight.do, "k", failing)
+            started.wait()
+            followers = [pool.submit(flight.do, "k", lambda: "unused") for _ in range(3)]
+            while flight.stats.calls < 4:
+                time.sleep(0.001)
+            release.set()
+            for future in [leader, *followers]:
+                with self.assertRaises(ValueError):
+                    future.result()
+        self.assertEqual((flight.stats.upstream_calls, flight.stats.coalesced), (1, 3))
+        self.assertEqual(flight.in_flight(), 0)
+        self.assertEqual(flight.do("k", lambda: "fresh"), "fresh")
+
+    def test_async_leader_cancellation_does_not_cancel_followers(self):
+        async def run():
+            flight = AsyncSingleFlight()
+
+            async def slow():
+                await asyncio.sleep(0.05)
+                return "page"
+
+            leader = asyncio.ensure_future(flight.do("k", slow))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(flight.do("k", slow))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower, flight.stats
+
+        result, stats = asyncio.run(run())
+        self.assertEqual(result, "page")
+        self.assertEqual((stats.upstream_calls, stats.coalesced), (1, 1))
+
+
+class TestClientCoalescing(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=30, latency=0.2).start()
+        stac_cache.set_search_cache(None)
+
+    def tearDown(self):
+        stac_client.set_default_client(None)
+        stac_async.configure_default_async_client()
+        stac_cache.set_search_cache(stac_cache.MemoryCache())
+        self.server.stop()
+
+    def _search_concurrently(self, n: int) -> list[list[dict]]:
+        barrier = threading.Barrier(n)
+
+        def search(_):
+            barrier.wait()
+            return search_satellite_scenes(TOKYO_BBOX, AUGUST_2023, 50.0, limit=5)
+
+        with ThreadPoolExecutor(n) as pool:
+            return list(pool.map(search, range(n)))
+
+    def test_threads_share_one_upstream_request(self):
+        client = stac_client.StacClient(base_url=self.server.url)
+        stac_client.set_default_client(client)
+        client.search_extensions()
+
+        results = self._search_concurrently(10)
+        self.assertEqual(self.server.request_count, 1)
+        self.assertTrue(all(rows == results[0] for rows in results))
+        self.assertEqual(client.single_flight.stats.coalesced, 9)
+
+    def test_coalescing_can_be_disabled(self):
+        stac_client.set_default_client(stac_client.StacClient(base_url=self.server.url, coalesce=False))
+        self._search_concurrently(4)
+        self.assertEqual(self.server.request_count, 4)
+
+    def test_coroutines_share_one_upstream_request(self):
+        stac_async.configure_default_async_client(base_url=self.server.url)
+
+        async def run():
+            results = await asyncio.gather(*(
+                stac_async.search_satellite_scenes_async(TOKYO_BBOX, AUGUST_2023, 50.0, limit=5)
+                for _ in range(10)
+            ))
+            return results, stac_async.get_default_async_client().single_flight.stats
+
+        results, stats = asyncio.run(run())
+        self.assertEqual(self.server.request_count, 1)
+        self.assertTrue(all(rows == results[0] for rows in results))
+        self.assertGreaterEqual(stats.coalesced, 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
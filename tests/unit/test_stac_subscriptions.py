@@ -0,0 +1,147 @@
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from capstone.aoi.aoi_catalog import KNOWN_AOIS
+from capstone.scripts.stac_stub_server import StubStacServer
+from capstone.scripts.synthetic import make_stac_item
+from capstone.tools import stac_cache, stac_client
+from capstone.tools.stac_client import StacClient
+from capstone.tools.stac_search import search_satellite_scenes
+from capstone.tools.stac_subscriptions import SubscriptionStore, check_subscriptions
+
+JAPAN_BBOX = KNOWN_AOIS["japan"]["bbox"]
+HOKKAIDO_EAST = KNOWN_AOIS["hokkaido_east"]["bbox"]
+TOKYO_BBOX = KNOWN_AOIS["tokyo_area"]["bbox"]
+# カタログに無い矩形（ポリゴン照合されない）
+EVERYWHERE = [100.0, 10.0, 170.0, 60.0]
+EAST = [143.0, 42.0, 146.0, 44.5]
+
+
+def _publish(server: StubStacServer, n: int, year: int) -> list[dict]:
+    items = [
+        make_stac_item(i, bbox=JAPAN_BBOX, start=datetime(year, 1, 1, tzinfo=timezone.utc), seed=year)
+        for i in range(n)
+    ]
+    server.items.extend(items)
+    return items
+
+
+def _expected(items: list[dict], bbox: list[float], cloud_max: float) -> set[str]:
+    return {
+        item["id"] for item in items
+        if item["properties"]["eo:cloud_cover"] <= cloud_max
+        and item["bbox"][0] <= bbox[2] and item["bbox"][2] >= bbox[0]
+        and item["bbox"][1] <= bbox[3] and item["bbox"][3] >= bbox[1]
+    }
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.server = StubStacServer(n_items=0, spatial_filter=True).start()
+        self.client = StacClient(base_url=self.server.url)
+        self.store = SubscriptionStore(":memory:")
+
+    def tearDown(self):
+        self.store.close()
+        self.client.close()
+        self.server.stop()
+
+    def test_only_the_delta_is_returned(self):
+        old = _publish(self.server, 400, 2023)
+        self.store.subscribe(EAST, 30.0, since=None, subscription_id="east")
+        self.store.subscribe(TOKYO_BBOX, 60.0, since=None, subscription_id="tokyo")
+
+        news = check_subscriptions(self.store, client=self.client)
+        self.assertEqual({r["id"] for r in news["east"]}, _expected(old, EAST, 30.0))
+        self.assertEqual({r["id"] for r in news["tokyo"]}, _expected(old, TOKYO_BBOX, 60.0))
+        self.assertEqual(self.server.request_count, 1)
+
+        self.assertEqual(check_subscriptions(self.store, client=self.client), {"east": [], "tokyo": []})
+
+        new = _publish(self.server, 400, 2024)
+        news = check_subscriptions(self.store, client=self.client)
+        self.assertEqual({r["id"] for r in news["east"]}, _expected(new, EAST, 30.0))
+        self.assertEqual({r["id"] for r in news["tokyo"]}, _expected(new, TOKYO_BBOX, 60.0))
+
+    def test_high_water_mark_is_persisted(self):
+        items = _publish(self.server, 200, 2023)
+        self.store.subscribe(EVERYWHERE, 100.0, since=None, subscription_id="japan")
+        check_subscriptions(self.store, client=self.client)
+        latest = max(item["properties"]["updated"] for item in items)
+        self.assertEqual(self.store.get("japan").high_water_mark, latest)
+
+    def test_ties_at_the_high_water_mark_are_not_lost(self):
+        first = _publish(self.server, 1, 2023)[0]
+        self.store.subscribe(EVERYWHERE, 100.0, since=None, subscription_id="japan")
+        self.assertEqual(len(check_subscriptions(self.store, client=self.client)["japan"]), 1)
+
+        # 同じ updated を持つ別 item が後から公開される
+        late = dict(first, id="late-arrival")
+        self.server.items.append(late)
+        news = check_subscriptions(self.store, client=self.client)
+        self.assertEqual([r["id"] for r in news["japan"]], ["late-arrival"])
+
+    def test_since_now_skips_existing_items(self):
+        _publish(self.server, 100, 2023)
+        self.store.subscribe(EVERYWHERE, 100.0, subscription_id="japan")
+        self.assertEqual(check_subscriptions(self.store, client=self.client), {"japan": []})
+
+    def test_datetime_watermark(self):
+        items = _publish(self.server, 100, 2023)
+        self.store.subscribe(EVERYWHERE, 100.0, since=None, watermark_field="datetime", subscription_id="dt")
+        self.assertEqual(len(check_subscriptions(self.store, client=self.client)["dt"]), len(items))
+        self.assertEqual(check_subscriptions(self.store, client=self.client), {"dt": []})
+
+    def test_group_search_is_limited_to_the_datetime_ranges(self):
+        payloads = []
+        search = self.server.search
+        self.server.search = lambda payload: payloads.append(payload) or search(payload)
+
+        self.store.subscribe(EAST, 30.0, datetime_range="2023-06-01T00:00:00Z/2023-06-30T23:59:59Z",
+                             since=None, subscription_id="june")
+        self.store.subscribe(TOKYO_BBOX, 30.0, datetime_range="2023-08-01T00:00:00Z/2023-08-31T23:59:59Z",
+                             since=None, subscription_id="august")
+        check_subscriptions(self.store, client=self.client)
+        self.assertEqual(payloads[-1]["datetime"], "2023-06-01T00:00:00Z/2023-08-31T23:59:59Z")
+
+        # datetime を high-water mark にすると、範囲の始まりは既報告分の先に進む
+        self.store.subscribe(EAST, 30.0, datetime_range="2023-06-01T00:00:00Z/..", since="2023-07-15T00:00:00Z",
+                             watermark_field="datetime", subscription_id="dt")
+        check_subscriptions(self.store, subscription_ids=["dt"], client=self.client)
+        self.assertEqual(payloads[-1]["datetime"], "2023-07-15T00:00:00Z/..")
+
+        self.store.subscribe(EVERYWHERE, 30.0, since=None, subscription_id="open")
+        check_subscriptions(self.store, subscription_ids=["open"], client=self.client)
+        self.assertNotIn("datetime", payloads[-1])
+
+    def test_catalog_aoi_matches_search_tool(self):
+        stac_cache.set_search_cache(None)
+        stac_client.set_default_client(self.client)
+        self.addCleanup(stac_client.set_default_client, None)
+        self.addCleanup(stac_cache.set_search_cache, stac_cache.MemoryCache())
+
+        self.store.subscribe(HOKKAIDO_EAST, 50.0, since=None, subscription_id="east")
+        items = _publish(self.server, 400, 2023)
+        news = check_subscriptions(self.store, client=self.client)
+        remote = search_satellite_scenes(HOKKAIDO_EAST, "2023-01-01T00:00:00Z/..", 50.0, limit=len(items))
+        self.assertEqual({r["id"] for r in news["east"]}, {r["id"] for r in remote})
+        self.assertLess(len(news["east"]), len(_expected(items, HOKKAIDO_EAST, 50.0)))
+
+    def test_invalid_subscription(self):
+        with self.assertRaises(ValueError):
+            self.store.subscribe([1.0, 2.0, 3.0], 10.0)
+        with self.assertRaises(ValueError):
+            self.store.subscribe(TOKYO_BBOX, 10.0, watermark_field="created")
+        self.store.subscribe(TOKYO_BBOX, 10.0, subscription_id="dup")
+        with self.assertRaises(ValueError):
+            self.store.subscribe(TOKYO_BBOX, 10.0, subscription_id="dup")
+
+
+if __name__ == "__main__":
+    unittest.main()